@@ -0,0 +1,385 @@
+"""
+In-process S3-compatible stand-in for the ingestion benchmarks.
+
+Implements the subset of the S3 REST API the minio client uses against the lake:
+bucket HEAD/PUT, object PUT (with If-Match/If-None-Match)/GET (with Range)/HEAD/DELETE,
+multipart uploads and ListObjectsV2. Objects live in memory and signatures are not checked, so uploads cost
+what the client spends on them plus a local socket round trip.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+S3_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, Nagle would delay the body by an ACK
+    disable_nagle_algorithm = True
+    server: "FakeS3"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _parse(self) -> Tuple[str, str, Dict[str, str]]:
+        url = urlparse(self.path)
+        bucket, _, key = unquote(url.path).lstrip("/").partition("/")
+        params = {
+            k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()
+        }
+        return bucket, key, params
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(
+        self,
+        status: int,
+        body: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+        content_type: str = "application/xml",
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+            self.server.count_served(len(body))
+
+    def _error(self, status: int, code: str, bucket: str, key: str = "") -> None:
+        body = (
+            f"<Error><Code>{code}</Code><Message>{code}</Message>"
+            f"<BucketName>{escape(bucket)}</BucketName><Key>{escape(key)}</Key>"
+            f"<Resource>/{escape(bucket)}/{escape(key)}</Resource>"
+            f"<RequestId>fake</RequestId><HostId>fake</HostId></Error>"
+        ).encode()
+        self._send(status, body)
+
+    def do_HEAD(self) -> None:
+        bucket, key, _ = self._parse()
+        store = self.server
+        if not key:
+            if bucket in store.buckets:
+                self._send(200)
+            else:
+                self._error(404, "NoSuchBucket", bucket)
+            return
+        obj = store.get(bucket, key)
+        if obj is None:
+            self._error(404, "NoSuchKey", bucket, key)
+            return
+        data, etag, modified = obj
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("ETag", f'"{etag}"')
+        self.send_header("Last-Modified", formatdate(modified, usegmt=True))
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        bucket, key, params = self._parse()
+        store = self.server
+        if bucket not in store.buckets:
+            self._error(404, "NoSuchBucket", bucket, key)
+            return
+        if not key:
+            if "location" in params:
+                self._send(
+                    200,
+                    f'<LocationConstraint xmlns="{S3_NS}">us-east-1</LocationConstraint>'.encode(),
+                )
+            else:
+                self._list(bucket, params)
+            return
+
+        obj = store.get(bucket, key)
+        if obj is None:
+            self._error(404, "NoSuchKey", bucket, key)
+            return
+        data, etag, modified = obj
+        headers = {
+            "ETag": f'"{etag}"',
+            "Last-Modified": formatdate(modified, usegmt=True),
+        }
+        byte_range = self.headers.get("Range")
+        if byte_range and byte_range.startswith("bytes="):
+            first, _, last = byte_range[len("bytes=") :].partition("-")
+            if first:
+                start, end = int(first), int(last) if last else len(data) - 1
+            else:
+                start, end = max(len(data) - int(last), 0), len(data) - 1
+            end = min(end, len(data) - 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            self._send(206, data[start : end + 1], headers, "application/octet-stream")
+            return
+        self._send(200, data, headers, "application/octet-stream")
+
+    def _list(self, bucket: str, params: Dict[str, str]) -> None:
+        prefix = params.get("prefix", "")
+        max_keys = int(params.get("max-keys") or 1000)
+        after = params.get("continuation-token") or params.get("start-after") or ""
+        keys = self.server.keys(bucket, prefix, after)
+        page, truncated = keys[:max_keys], len(keys) > max_keys
+
+        contents = []
+        for key in page:
+            obj = self.server.get(bucket, key)
+            if obj is None:
+                continue
+            data, etag, modified = obj
+            contents.append(
+                f"<Contents><Key>{escape(key)}</Key>"
+                f"<LastModified>{_iso(modified)}</LastModified>"
+                f"<ETag>&quot;{etag}&quot;</ETag><Size>{len(data)}</Size>"
+                f"<StorageClass>STANDARD</StorageClass></Contents>"
+            )
+        token = (
+            f"<NextContinuationToken>{escape(page[-1])}</NextContinuationToken>"
+            if truncated
+            else ""
+        )
+        body = (
+            f'<ListBucketResult xmlns="{S3_NS}"><Name>{escape(bucket)}</Name>'
+            f"<Prefix>{escape(prefix)}</Prefix><KeyCount>{len(page)}</KeyCount>"
+            f"<MaxKeys>{max_keys}</MaxKeys><IsTruncated>{str(truncated).lower()}</IsTruncated>"
+            f"{token}{''.join(contents)}</ListBucketResult>"
+        ).encode()
+        self._send(200, body)
+
+    def do_PUT(self) -> None:
+        bucket, key, params = self._parse()
+        store = self.server
+        body = self._body()
+        if not key:
+            store.make_bucket(bucket)
+            self._send(200, headers={"Location": f"/{bucket}"})
+            return
+        if bucket not in store.buckets:
+            self._error(404, "NoSuchBucket", bucket, key)
+            return
+
+        if "uploadId" in params:
+            etag = store.put_part(params["uploadId"], int(params["partNumber"]), body)
+            if etag is None:
+                self._error(404, "NoSuchUpload", bucket, key)
+            else:
+                self._send(200, headers={"ETag": f'"{etag}"'})
+            return
+
+        source = self.headers.get("x-amz-copy-source")
+        if source:
+            src_bucket, _, src_key = unquote(source).lstrip("/").partition("/")
+            obj = store.get(src_bucket, src_key)
+            if obj is None:
+                self._error(404, "NoSuchKey", src_bucket, src_key)
+                return
+            etag, modified = store.put(bucket, key, obj[0])
+            self._send(
+                200,
+                (
+                    f'<CopyObjectResult xmlns="{S3_NS}"><LastModified>{_iso(modified)}'
+                    f"</LastModified><ETag>&quot;{etag}&quot;</ETag></CopyObjectResult>"
+                ).encode(),
+            )
+            return
+
+        if_match = self.headers.get("If-Match")
+        if_none_match = self.headers.get("If-None-Match")
+        if if_match or if_none_match:
+            written = store.put_if(bucket, key, body, if_match, if_none_match)
+            if written is None:
+                self._error(412, "PreconditionFailed", bucket, key)
+                return
+            etag, _ = written
+        else:
+            etag, _ = store.put(bucket, key, body)
+        self._send(200, headers={"ETag": f'"{etag}"'})
+
+    def do_POST(self) -> None:
+        bucket, key, params = self._parse()
+        store = self.server
+        body = self._body()
+        if "uploads" in params:
+            upload_id = store.create_upload(bucket, key)
+            self._send(
+                200,
+                (
+                    f'<InitiateMultipartUploadResult xmlns="{S3_NS}"><Bucket>{escape(bucket)}'
+                    f"</Bucket><Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId>"
+                    f"</InitiateMultipartUploadResult>"
+                ).encode(),
+            )
+            return
+        if "uploadId" in params:
+            root = ElementTree.fromstring(body)
+            numbers = [
+                int(el.text)
+                for el in root.iter()
+                if el.tag.rpartition("}")[2] == "PartNumber" and el.text
+            ]
+            etag = store.complete_upload(params["uploadId"], numbers)
+            if etag is None:
+                self._error(404, "NoSuchUpload", bucket, key)
+                return
+            self._send(
+                200,
+                (
+                    f'<CompleteMultipartUploadResult xmlns="{S3_NS}"><Location>/{escape(bucket)}/'
+                    f"{escape(key)}</Location><Bucket>{escape(bucket)}</Bucket>"
+                    f"<Key>{escape(key)}</Key><ETag>&quot;{etag}&quot;</ETag>"
+                    f"</CompleteMultipartUploadResult>"
+                ).encode(),
+            )
+            return
+        self._error(400, "InvalidRequest", bucket, key)
+
+    def do_DELETE(self) -> None:
+        bucket, key, params = self._parse()
+        if "uploadId" in params:
+            self.server.abort_upload(params["uploadId"])
+        else:
+            self.server.delete(bucket, key)
+        self._send(204)
+
+
+def _iso(timestamp: float) -> str:
+    return (
+        datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%S.%f"
+        )[:-3]
+        + "Z"
+    )
+
+
+class FakeS3(ThreadingHTTPServer):
+    """Threaded HTTP server holding buckets and objects in memory."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__((host, port), _Handler)
+        self.buckets: Dict[str, Dict[str, Tuple[bytes, str, float]]] = {}
+        self._uploads: Dict[str, Tuple[str, str, Dict[int, bytes]]] = {}
+        # Response body bytes sent, e.g. to measure how much of the lake a read downloads
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        """host:port as expected by the minio client and MinIOConfig.endpoint."""
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def bytes_stored(self) -> int:
+        with self._lock:
+            return sum(
+                len(data)
+                for objects in self.buckets.values()
+                for data, _, _ in objects.values()
+            )
+
+    @property
+    def object_count(self) -> int:
+        with self._lock:
+            return sum(len(objects) for objects in self.buckets.values())
+
+    def count_served(self, nbytes: int) -> None:
+        with self._lock:
+            self.bytes_served += nbytes
+
+    def start(self) -> "FakeS3":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def make_bucket(self, bucket: str) -> None:
+        with self._lock:
+            self.buckets.setdefault(bucket, {})
+
+    def get(self, bucket: str, key: str) -> Optional[Tuple[bytes, str, float]]:
+        with self._lock:
+            return self.buckets.get(bucket, {}).get(key)
+
+    def put(self, bucket: str, key: str, data: bytes) -> Tuple[str, float]:
+        etag = hashlib.md5(data).hexdigest()
+        modified = time.time()
+        with self._lock:
+            self.buckets.setdefault(bucket, {})[key] = (data, etag, modified)
+        return etag, modified
+
+    def put_if(
+        self,
+        bucket: str,
+        key: str,
+        data: bytes,
+        if_match: Optional[str],
+        if_none_match: Optional[str],
+    ) -> Optional[Tuple[str, float]]:
+        """put() when the conditional headers hold, None when they do not."""
+        with self._lock:
+            current = self.buckets.get(bucket, {}).get(key)
+            if if_none_match == "*" and current is not None:
+                return None
+            if if_match is not None and (
+                current is None or if_match.strip('"') != current[1]
+            ):
+                return None
+            etag = hashlib.md5(data).hexdigest()
+            modified = time.time()
+            self.buckets.setdefault(bucket, {})[key] = (data, etag, modified)
+        return etag, modified
+
+    def delete(self, bucket: str, key: str) -> None:
+        with self._lock:
+            self.buckets.get(bucket, {}).pop(key, None)
+
+    def keys(self, bucket: str, prefix: str, after: str = "") -> List[str]:
+        with self._lock:
+            return sorted(
+                key
+                for key in self.buckets.get(bucket, {})
+                if key.startswith(prefix) and key > after
+            )
+
+    def create_upload(self, bucket: str, key: str) -> str:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = (bucket, key, {})
+        return upload_id
+
+    def put_part(self, upload_id: str, number: int, data: bytes) -> Optional[str]:
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                return None
+            upload[2][number] = data
+        return hashlib.md5(data).hexdigest()
+
+    def complete_upload(self, upload_id: str, numbers: List[int]) -> Optional[str]:
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is None:
+            return None
+        bucket, key, parts = upload
+        data = b"".join(parts[number] for number in sorted(numbers))
+        etag = hashlib.md5(data).hexdigest()
+        self.put(bucket, key, data)
+        return f"{etag}-{len(numbers)}"
+
+    def abort_upload(self, upload_id: str) -> None:
+        with self._lock:
+            self._uploads.pop(upload_id, None)
@@ -0,0 +1,215 @@
+"""
+Fake ThetaTerminal serving synthetic CSV for the ingestion benchmarks.
+
+Serves /v2/hist/stock/{quote,eod}, /v2/bulk_hist/option/{quote,eod} and the
+/v2/list/dates probe the clients use as a health check. Response size, latency and the
+rate of 472 "no data" responses are configurable, and every response is deterministic
+for a given seed so runs are comparable.
+
+Run standalone with `python bench/fake_theta.py --port 25510` or start it from the
+benchmark runner.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+NO_DATA_BODY = b":No data for the specified timeframe & contract."
+
+QUOTE_HEADER = "ms_of_day,bid_size,bid_exchange,bid,bid_condition,ask_size,ask_exchange,ask,ask_condition,date"
+EOD_HEADER = (
+    "ms_of_day,ms_of_day_2,open,high,low,close,volume,count,bid_size,bid_exchange,"
+    "bid,bid_condition,ask_size,ask_exchange,ask,ask_condition,date"
+)
+CONTRACT_HEADER = "root,expiration,strike,right"
+
+
+@dataclass
+class ThetaProfile:
+    """Shape of the synthetic responses."""
+
+    # Contracts in every bulk option response
+    option_contracts: int = 200
+    # Rows per contract and day for quote endpoints, eod always has one
+    quote_intervals: int = 7
+    # Fixed and uniformly random extra latency per response
+    latency_ms: float = 5.0
+    latency_jitter_ms: float = 0.0
+    # Fraction of requests answered with a 472 no data response
+    no_data_rate: float = 0.0
+    seed: int = 0
+
+
+class _Bodies:
+    """
+    Builds response bodies from per (endpoint, root) row templates, so serving a
+    request only appends the date to every cached row.
+    """
+
+    def __init__(self, profile: ThetaProfile) -> None:
+        self.profile = profile
+        self._templates: Dict[Tuple[str, str, str], Tuple[bytes, List[bytes]]] = {}
+        self._lock = threading.Lock()
+
+    def body(self, kind: str, endpoint: str, root: str, date: str) -> bytes:
+        header, rows = self._template(kind, endpoint, root)
+        suffix = f"{date}\n".encode()
+        return header + b"".join(row + suffix for row in rows)
+
+    def _template(
+        self, kind: str, endpoint: str, root: str
+    ) -> Tuple[bytes, List[bytes]]:
+        key = (kind, endpoint, root)
+        with self._lock:
+            if key not in self._templates:
+                self._templates[key] = self._build(kind, endpoint, root)
+            return self._templates[key]
+
+    def _build(self, kind: str, endpoint: str, root: str) -> Tuple[bytes, List[bytes]]:
+        rng = random.Random(f"{self.profile.seed}:{kind}:{endpoint}:{root}")
+        eod = endpoint == "eod"
+        intervals = 1 if eod else self.profile.quote_intervals
+
+        def quote_row(i: int, price: float) -> str:
+            ms = 34_200_000 + i * 60_000
+            if eod:
+                return (
+                    f"{ms},{ms + 23_400_000},{price:.2f},{price * 1.01:.2f},"
+                    f"{price * 0.99:.2f},{price:.2f},{rng.randint(100, 100_000)},"
+                    f"{rng.randint(10, 1000)},{rng.randint(1, 500)},1,{price - 0.01:.2f},0,"
+                    f"{rng.randint(1, 500)},1,{price + 0.01:.2f},0,"
+                )
+            return (
+                f"{ms},{rng.randint(1, 500)},1,{price - 0.01:.2f},0,"
+                f"{rng.randint(1, 500)},1,{price + 0.01:.2f},0,"
+            )
+
+        if kind == "stock":
+            header = QUOTE_HEADER if not eod else EOD_HEADER
+            rows = [quote_row(i, 100 + rng.random()) for i in range(intervals)]
+        else:
+            header = f"{CONTRACT_HEADER},{QUOTE_HEADER if not eod else EOD_HEADER}"
+            rows = []
+            for c in range(self.profile.option_contracts):
+                strike = 80_000 + (c // 2) * 1_000
+                right = "C" if c % 2 else "P"
+                contract = f"{root},20991231,{strike},{right},"
+                rows.extend(
+                    contract + quote_row(i, 1 + rng.random() * 10)
+                    for i in range(intervals)
+                )
+        return f"{header}\n".encode(), [row.encode() for row in rows]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, Nagle would delay the body by an ACK
+    disable_nagle_algorithm = True
+    server: "FakeThetaTerminal"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        server = self.server
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        server.count_request()
+
+        if url.path.startswith("/v2/list/"):
+            self._send(200, b"date\n20240102\n")
+            return
+        if len(parts) != 4 or parts[1] not in ("hist", "bulk_hist"):
+            self._send(404, b"Not found")
+            return
+
+        kind, endpoint = parts[2], parts[3]
+        root = params.get("root", "SPY")
+        date = params.get("start_date", "20240102")
+        profile = server.profile
+
+        delay_ms = profile.latency_ms
+        if profile.latency_jitter_ms:
+            delay_ms += random.random() * profile.latency_jitter_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        if server.is_no_data(self.path):
+            self._send(472, NO_DATA_BODY)
+            return
+        self._send(200, server.bodies.body(kind, endpoint, root, date))
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeThetaTerminal(ThreadingHTTPServer):
+    """Threaded HTTP server answering like ThetaTerminal's v2 REST API."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, profile: ThetaProfile, host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.profile = profile
+        self.bodies = _Bodies(profile)
+        self.requests_served = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v2"
+
+    def count_request(self) -> None:
+        with self._count_lock:
+            self.requests_served += 1
+
+    def is_no_data(self, path: str) -> bool:
+        """Deterministic per URL, so a rerun answers the same requests with 472."""
+        if not self.profile.no_data_rate:
+            return False
+        draw = zlib.crc32(f"{self.profile.seed}:{path}".encode()) / 0xFFFFFFFF
+        return draw < self.profile.no_data_rate
+
+    def start(self) -> "FakeThetaTerminal":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25510)
+    parser.add_argument(
+        "--profile", default="{}", help="ThetaProfile fields as a JSON object"
+    )
+    args = parser.parse_args()
+
+    profile = ThetaProfile(**json.loads(args.profile))
+    server = FakeThetaTerminal(profile, args.host, args.port)
+    # The runner reads the bound address from the first line
+    print(json.dumps({"base_url": server.base_url, "profile": asdict(profile)}))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+End-to-end ingestion benchmark of BetEdgeClient.
+
+Every scenario runs in its own subprocess against a fake ThetaTerminal (fake_theta.py,
+served from a further subprocess so its CPU time does not count against the client) and
+an in-process S3 stand-in (fake_s3.py). Reported per scenario: requests/s, MB/s
+downloaded, rows/s, peak RSS of the client process and the per-stage timings of the
+pipeline metrics.
+
+Peak RSS (ru_maxrss) counts file-backed pages too, including the memory mapped spill
+files the writer encodes from, which the kernel can drop under pressure. Peak anonymous
+RSS, sampled from /proc on Linux, is the heap the pipeline actually holds, and is what
+spill_to_disk lowers.
+
+Usage:
+    python bench/run.py                      # run all scenarios, compare to baselines
+    python bench/run.py -s option_quote      # run selected scenarios
+    python bench/run.py --save-baseline      # store the results as the new baselines
+    python bench/run.py --list
+
+Comparison exits with status 1 when a throughput metric falls, or peak RSS grows, by
+more than --tolerance relative to the stored baseline. Baselines depend on the machine,
+so store them on the machine the comparisons run on.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINES = BENCH_DIR / "baselines.json"
+BUCKET = "betedge-bench"
+
+# Metrics compared against the baselines, with True where higher is better
+COMPARED_METRICS = {
+    "requests_per_second": True,
+    "mb_per_second": True,
+    "rows_per_second": True,
+    "peak_rss_mb": False,
+    "peak_anon_mb": False,
+}
+
+# Seconds between samples of the anonymous RSS of a scenario process
+ANON_SAMPLE_INTERVAL = 0.005
+
+STOCK_ROOTS = [
+    "AAPL",
+    "MSFT",
+    "AMZN",
+    "NVDA",
+    "GOOGL",
+    "META",
+    "TSLA",
+    "JPM",
+    "XOM",
+    "UNH",
+]
+OPTION_ROOTS = ["SPY", "QQQ", "IWM"]
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    # Builds the request list, called inside the scenario subprocess
+    requests: Callable[[], List[Any]]
+    # ThetaProfile fields of the fake ThetaTerminal
+    profile: Dict[str, Any] = field(default_factory=dict)
+    # GeneralConfig fields overridden for the run
+    settings: Dict[str, Any] = field(default_factory=dict)
+
+
+def _stock_requests(endpoint: str, roots: List[str], start: int, end: int) -> Callable:
+    def build() -> List[Any]:
+        from betedge_data import StockRequest
+
+        return [
+            StockRequest(root=root, start_date=start, end_date=end, endpoint=endpoint)
+            for root in roots
+        ]
+
+    return build
+
+
+def _option_requests(endpoint: str, roots: List[str], start: int, end: int) -> Callable:
+    def build() -> List[Any]:
+        from betedge_data import OptionRequest
+
+        return [
+            OptionRequest(root=root, start_date=start, end_date=end, endpoint=endpoint)
+            for root in roots
+        ]
+
+    return build
+
+
+def _mixed_requests() -> List[Any]:
+    return (
+        _stock_requests("quote", STOCK_ROOTS[:5], 20240101, 20240331)()
+        + _stock_requests("eod", STOCK_ROOTS, 20240101, 20240331)()
+        + _option_requests("quote", OPTION_ROOTS[:2], 20240101, 20240229)()
+        + _option_requests("eod", OPTION_ROOTS, 20240101, 20240331)()
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    s.name: s
+    for s in (
+        Scenario(
+            "stock_quote",
+            "10 roots of hourly stock quotes over 3 months, many small responses",
+            _stock_requests("quote", STOCK_ROOTS, 20240101, 20240331),
+            profile={"latency_ms": 2},
+        ),
+        Scenario(
+            "option_quote",
+            "3 roots of hourly bulk option quotes over 2 months, large responses",
+            _option_requests("quote", OPTION_ROOTS, 20240101, 20240229),
+            profile={"option_contracts": 1000, "latency_ms": 20},
+        ),
+        Scenario(
+            "option_eod",
+            "3 roots of bulk option eod over 6 months",
+            _option_requests("eod", OPTION_ROOTS, 20240101, 20240630),
+            profile={"option_contracts": 2000, "latency_ms": 10},
+        ),
+        Scenario(
+            "option_quote_spill",
+            "option_quote with files spilled to disk instead of buffered in memory",
+            _option_requests("quote", OPTION_ROOTS, 20240101, 20240229),
+            profile={"option_contracts": 1000, "latency_ms": 20},
+            settings={"spill_to_disk": True},
+        ),
+        Scenario(
+            "mixed",
+            "stock and option quotes and eod together, jittery latency and 5% no data",
+            _mixed_requests,
+            profile={
+                "option_contracts": 500,
+                "latency_ms": 5,
+                "latency_jitter_ms": 30,
+                "no_data_rate": 0.05,
+            },
+        ),
+    )
+}
+
+
+def _start_fake_theta(profile: Dict[str, Any]) -> "tuple[subprocess.Popen, str]":
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            str(BENCH_DIR / "fake_theta.py"),
+            "--port",
+            "0",
+            "--profile",
+            json.dumps(profile),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = proc.stdout.readline()
+    if not line:
+        proc.kill()
+        raise RuntimeError("Fake ThetaTerminal failed to start")
+    return proc, json.loads(line)["base_url"]
+
+
+def _sample_anon_rss(peak: Dict[str, int]) -> None:
+    """Keep the high-water mark of RssAnon in KiB, there is no kernel counter for it."""
+    while True:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("RssAnon:"):
+                    peak["kib"] = max(peak["kib"], int(line.split()[1]))
+                    break
+        time.sleep(ANON_SAMPLE_INTERVAL)
+
+
+def run_scenario(scenario: Scenario) -> Dict[str, Any]:
+    """Run one scenario in the current process and return its results."""
+    from fake_s3 import FakeS3
+
+    from betedge_data.client.config import get_settings
+
+    anon_peak = {"kib": 0}
+    if os.path.exists("/proc/self/status"):
+        sampler = threading.Thread(target=_sample_anon_rss, args=(anon_peak,))
+        sampler.daemon = True
+        sampler.start()
+
+    theta, base_url = _start_fake_theta(scenario.profile)
+    s3 = FakeS3().start()
+    try:
+        settings = get_settings()
+        settings.minio.endpoint = s3.endpoint
+        settings.minio.bucket = BUCKET
+        settings.minio.secure = False
+        settings.general.theta_base_url = base_url
+        # Local manifests or response caches would make runs depend on earlier runs
+        settings.general.manifest_path = None
+        settings.general.response_cache_dir = None
+        for name, value in scenario.settings.items():
+            setattr(settings.general, name, value)
+
+        from betedge_data import BetEdgeClient
+
+        # 472 responses are expected and each one logs a warning
+        client = BetEdgeClient(log_level="error")
+        requests = scenario.requests()
+
+        started = time.perf_counter()
+        summaries = client.request_many(requests)
+        wall = time.perf_counter() - started
+    finally:
+        theta.kill()
+        s3.shutdown()
+
+    metrics = summaries[0].metrics
+    http_requests = sum(s.http_jobs for s in summaries)
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / 1e6 if platform.system() == "Darwin" else rss * 1024 / 1e6
+
+    return {
+        "scenario": scenario.name,
+        "requests": len(requests),
+        "http_requests": http_requests,
+        "files_written": sum(s.files_written for s in summaries),
+        "no_data": sum(s.no_data for s in summaries),
+        "mb_downloaded": round(metrics.bytes_downloaded / 1e6, 3),
+        "mb_uploaded": round(sum(s.bytes_written for s in summaries) / 1e6, 3),
+        "rows": metrics.rows_parsed,
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(http_requests / wall, 2),
+        "mb_per_second": round(metrics.bytes_downloaded / 1e6 / wall, 3),
+        "rows_per_second": round(metrics.rows_parsed / wall, 1),
+        "peak_rss_mb": round(rss_mb, 1),
+        "peak_anon_mb": (
+            round(anon_peak["kib"] * 1024 / 1e6, 1) if anon_peak["kib"] else None
+        ),
+        "bottleneck": metrics.bottleneck,
+        "peak_queue_depths": metrics.peak_queue_depths,
+        "stages": {
+            name: {
+                key: stage[key]
+                for key in ("items", "workers", "p50_ms", "p95_ms", "utilisation")
+            }
+            for name, stage in metrics.stages.items()
+        },
+    }
+
+
+def _run_in_subprocess(name: str) -> Dict[str, Any]:
+    """Run a scenario in a fresh interpreter so peak RSS covers that scenario alone."""
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", name],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Scenario {name} failed with exit code {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(
+    result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Return a message per metric that regressed beyond the tolerance."""
+    regressions = []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        base, value = baseline.get(metric), result.get(metric)
+        if not base or value is None:
+            continue
+        change = (value - base) / base
+        if (higher_is_better and change < -tolerance) or (
+            not higher_is_better and change > tolerance
+        ):
+            regressions.append(
+                f"{result['scenario']}.{metric}: {value} vs baseline {base} ({change:+.0%})"
+            )
+    return regressions
+
+
+def _print_result(result: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    def delta(metric: str) -> str:
+        if not baseline or not baseline.get(metric) or result.get(metric) is None:
+            return ""
+        return f" ({(result[metric] - baseline[metric]) / baseline[metric]:+.0%})"
+
+    print(f"{result['scenario']}: {SCENARIOS[result['scenario']].description}")
+    print(
+        f"  {result['http_requests']} requests, {result['files_written']} files, "
+        f"{result['no_data']} no data, {result['mb_downloaded']} MB in, "
+        f"{result['mb_uploaded']} MB out in {result['wall_seconds']}s"
+    )
+    print(
+        f"  {result['requests_per_second']} req/s{delta('requests_per_second')}, "
+        f"{result['mb_per_second']} MB/s{delta('mb_per_second')}, "
+        f"{result['rows_per_second']} rows/s{delta('rows_per_second')}, "
+        f"peak RSS {result['peak_rss_mb']} MB{delta('peak_rss_mb')}"
+    )
+    if result.get("peak_anon_mb") is not None:
+        print(
+            f"  peak anonymous RSS {result['peak_anon_mb']} MB{delta('peak_anon_mb')}"
+        )
+    for name, stage in result["stages"].items():
+        if stage["items"]:
+            print(
+                f"  {name}: {stage['items']} items, p50 {stage['p50_ms']}ms, "
+                f"p95 {stage['p95_ms']}ms, {stage['workers']} workers "
+                f"{stage['utilisation']:.0%} busy"
+            )
+    print(f"  bottleneck: {result['bottleneck']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="BetEdgeClient ingestion benchmark")
+    parser.add_argument(
+        "-s",
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run, may be repeated. Default is every scenario.",
+    )
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit")
+    parser.add_argument("--baselines", type=Path, default=DEFAULT_BASELINES)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as baselines instead of comparing against them",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed relative regression before failing, default 0.2",
+    )
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_scenario(SCENARIOS[args.child])
+        print(json.dumps(result))
+        sys.stdout.flush()
+        # Skip interpreter teardown, the pipeline's daemon threads can stall it
+        os._exit(0)
+
+    if args.list:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name}: {scenario.description}")
+        return 0
+
+    baselines: Dict[str, Any] = {}
+    if args.baselines.exists():
+        baselines = json.loads(args.baselines.read_text())
+
+    results, regressions = [], []
+    for name in args.scenario or list(SCENARIOS):
+        result = _run_in_subprocess(name)
+        baseline = None if args.save_baseline else baselines.get(name)
+        _print_result(result, baseline)
+        if baseline:
+            regressions.extend(compare(result, baseline, args.tolerance))
+        results.append(result)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        for result in results:
+            baselines[result["scenario"]] = {
+                "recorded": time.strftime("%Y-%m-%d"),
+                "machine": f"{platform.system()} {platform.machine()} {os.cpu_count()} cpus",
+                **{metric: result[metric] for metric in COMPARED_METRICS},
+            }
+        args.baselines.write_text(
+            json.dumps(baselines, indent=2, sort_keys=True) + "\n"
+        )
+        print(f"Saved baselines of {len(results)} scenarios to {args.baselines}")
+        return 0
+
+    if regressions:
+        print("Regressions beyond tolerance:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
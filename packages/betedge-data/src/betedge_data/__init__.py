@@ -19,6 +19,7 @@ logging.getLogger("betedge_data").setLevel(logging.INFO)
 
 # Now import your modules
 from betedge_data.client.client import BetEdgeClient
+from betedge_data.client.async_client import AsyncBetEdgeClient
 from betedge_data.client.requests import (
     OptionRequest,
     StockRequest,
@@ -27,6 +28,7 @@ from betedge_data.client.requests import (
 
 __all__ = [
     "BetEdgeClient",
+    "AsyncBetEdgeClient",
     "OptionRequest",
     "StockRequest",
     "EarningsRequest",
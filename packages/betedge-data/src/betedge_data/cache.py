@@ -0,0 +1,199 @@
+"""
+On-disk cache of raw vendor responses.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from betedge_data.datetime import settled_date
+from betedge_data.exceptions import NoDataAvailableError
+
+logger = logging.getLogger(__name__)
+
+# First byte of every entry, marks a response body or a "no data" (472) response
+_BODY = b"B"
+_NO_DATA = b"N"
+COMPRESSION_LEVEL = 6
+
+
+def request_date(url: str) -> Optional[int]:
+    """
+    Last YYYYMMDD date a request asks for, from its end_date or date parameter. None
+    when the URL has neither.
+    """
+    params = parse_qs(urlsplit(url).query)
+    values = params.get("end_date") or params.get("date")
+    if not values:
+        return None
+    try:
+        return int(values[0].replace("-", ""))
+    except ValueError:
+        return None
+
+
+class ResponseCache:
+    """
+    Size bounded, zlib compressed cache of response bodies keyed by URL and headers.
+
+    Entries are evicted least recently used first once the cache exceeds `max_bytes`.
+    Recency survives restarts through file modification times, which are bumped on
+    every hit. With `replay` set, callers are expected to treat a miss as an error
+    so reprocessing runs purely from the cache.
+
+    Responses of requests ending within the last `settle_days` days are not stored, the
+    vendor may still be publishing those days.
+    """
+
+    def __init__(
+        self, path: str, max_bytes: int, replay: bool = False, settle_days: int = 2
+    ) -> None:
+        """
+        Args:
+            path: Cache directory, created if missing
+            max_bytes: Maximum total size of the compressed entries
+            replay: Serve only from the cache, never from the network
+            settle_days: Calendar days before a request's end date is cached
+        """
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.settle_days = settle_days
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached entries."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """Content address of a request, the sha256 of its URL and sorted headers."""
+        headers = sorted(
+            (name.lower(), value) for name, value in (headers or {}).items()
+        )
+        return hashlib.sha256(json.dumps([url, headers]).encode()).hexdigest()
+
+    def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Optional[bytes]:
+        """
+        Return the cached body of a request, or None on a miss.
+
+        Raises:
+            NoDataAvailableError: If the request is cached as a "no data" response
+        """
+        key = self.key(url, headers)
+        path = self._file(key)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                self._bytes -= self._entries.pop(key, 0)
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+        if blob[:1] == _NO_DATA:
+            raise NoDataAvailableError(f"No data available (cached): {url}")
+        return zlib.decompress(blob[1:])
+
+    def put(
+        self, url: str, body: bytes, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Store the body of a successful response, unless the request is unsettled."""
+        if self.settled(url):
+            self._store(
+                self.key(url, headers), _BODY + zlib.compress(body, COMPRESSION_LEVEL)
+            )
+
+    def put_no_data(self, url: str, headers: Optional[Dict[str, str]] = None) -> None:
+        """Store a "no data" response so replays skip the request as the server did."""
+        if self.settled(url):
+            self._store(self.key(url, headers), _NO_DATA)
+
+    def settled(self, url: str) -> bool:
+        """
+        Whether a request's response is final, its end date settle_days or more in the
+        past. Requests without a date are always settled.
+        """
+        date = request_date(url)
+        return date is None or date <= settled_date(self.settle_days)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key)
+
+    def _store(self, key: str, blob: bytes) -> None:
+        path = self._file(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write then rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._bytes += len(blob) - self._entries.pop(key, 0)
+            self._entries[key] = len(blob)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self._file(key))
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Evicted cached response {key}")
+
+    def _load(self) -> None:
+        """Index existing entries, least recently used first."""
+        found = []
+        for directory in os.scandir(self.path):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith(".tmp"):
+                    os.remove(entry.path)
+                    continue
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+        with self._lock:
+            self._evict()
+        logger.info(
+            f"Loaded response cache with {len(self._entries)} entries ({self._bytes} bytes) from {self.path}"
+        )
@@ -0,0 +1,514 @@
+import asyncio
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import polars as pl
+from minio import Minio
+from minio.error import S3Error
+
+from betedge_data.client.client import (
+    LogLevel,
+    Request,
+    _set_log_level,
+    interleave_file_jobs,
+    iter_file_jobs,
+    scan_lake,
+)
+from betedge_data.client.requests import OptionRequest, companion_key
+from betedge_data.cache import ResponseCache
+from betedge_data.contracts import ContractRegistry
+from betedge_data.client.config import get_settings
+from betedge_data.http_client import AsyncHTTPClient
+from betedge_data.lake import LakeIndex
+from betedge_data.manifest import LakeManifest
+from betedge_data.exceptions import NoDataAvailableError
+from betedge_data.job import HTTPJob, FileWriteJob, RequestSummary, ReturnType
+from betedge_data.limiter import AsyncAdaptiveLimiter, HostLimiters
+from betedge_data.metrics import PipelineMetrics
+from betedge_data.processing.dispatch import process_http_result
+from betedge_data.profiles import resolve_write_profiles
+from betedge_data.queues import AsyncBoundedQueue
+from betedge_data.writer import LakeWriter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBetEdgeClient:
+    """
+    Asyncio ingestion engine with the same request_data/retrieve_data surface as BetEdgeClient.
+
+    HTTP requests are multiplexed on one event loop with httpx.AsyncClient, so in flight
+    requests cost a coroutine rather than a thread. Like BetEdgeClient the pipeline has
+    three stages joined by bounded queues: HTTP workers only fetch, process_workers
+    executor threads parse the fetched responses and GeneralConfig.file_writers threads
+    encode and upload completed files, so neither parsing nor uploads hold a fetch slot.
+    Streamed CSV responses are parsed while they download on an executor with a thread
+    per connection, so an open response never waits for a parse thread.
+
+    Example:
+        async with AsyncBetEdgeClient() as client:
+            await client.request_data(request)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        log_level: str | LogLevel = LogLevel.WARN,
+    ) -> None:
+        """
+        Args:
+            max_concurrency: Maximum in flight HTTP requests. Defaults to GeneralConfig.max_concurrent_requests.
+            process_workers: Executor threads parsing fetched responses. Defaults to GeneralConfig.process_workers.
+            log_level: Log level for the betedge_data logger.
+        """
+        _set_log_level(log_level)
+        self.settings = get_settings()
+        self.minio_config = self.settings.minio
+        self.general_config = self.settings.general
+
+        self.max_concurrency = (
+            max_concurrency or self.general_config.max_concurrent_requests
+        )
+        self.process_workers = process_workers or self.general_config.process_workers
+        self.file_writers = max(1, self.general_config.file_writers)
+
+        self.minio_client = Minio(
+            endpoint=self.minio_config.endpoint,
+            access_key=self.minio_config.access_key,
+            secret_key=self.minio_config.secret_key,
+            secure=self.minio_config.secure,
+            region="us-east-1",
+        )
+        self.lake_index = LakeIndex(
+            self.minio_client,
+            self.minio_config.bucket,
+            ttl=self.general_config.lake_index_ttl,
+        )
+        self.manifest = (
+            LakeManifest(self.general_config.manifest_path)
+            if self.general_config.manifest_path
+            else None
+        )
+        self.lake_writer = LakeWriter(
+            self.minio_client,
+            self.minio_config.bucket,
+            index=self.lake_index,
+            manifest=self.manifest,
+            row_group_size=self.general_config.row_group_size,
+            part_size=self.general_config.upload_part_size,
+            profiles=resolve_write_profiles(self.general_config.write_profiles),
+            settle_days=self.general_config.settle_days,
+        )
+        self.contracts = (
+            ContractRegistry(self.minio_client, self.minio_config.bucket)
+            if self.general_config.contract_ids
+            else None
+        )
+
+        self.response_cache = (
+            ResponseCache(
+                self.general_config.response_cache_dir,
+                max_bytes=self.general_config.response_cache_max_bytes,
+                replay=self.general_config.response_cache_replay,
+                settle_days=self.general_config.settle_days,
+            )
+            if self.general_config.response_cache_dir
+            else None
+        )
+
+        # max_concurrency stays the hard cap, the adaptive limiter moves below it
+        limiter = None
+        if self.general_config.adaptive_concurrency:
+            limiter_kwargs = self.general_config.adaptive_limiter_kwargs()
+            limiter = HostLimiters(lambda: AsyncAdaptiveLimiter(**limiter_kwargs))
+
+        self.http_client = AsyncHTTPClient(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
+            limiter=limiter,
+            cache=self.response_cache,
+        )
+        # Cached responses are stored whole, so caching takes precedence over streaming
+        self._stream_csv = (
+            self.general_config.stream_csv and self.response_cache is None
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.process_workers, thread_name_prefix="async-processor"
+        )
+        # A streamed response is parsed while it downloads, one thread per connection
+        self._stream_executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="async-stream"
+        )
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=self.file_writers, thread_name_prefix="async-writer"
+        )
+        self._ready = False
+
+        # Metrics of the last request_many call
+        self.metrics = self._new_metrics()
+
+    @property
+    def concurrency_limits(self) -> Dict[str, int]:
+        """Current adaptive in flight limit per host, empty when adaptive concurrency is off."""
+        if self.http_client.limiter is None:
+            return {}
+        return self.http_client.limiter.current_limits()
+
+    def _new_metrics(self) -> PipelineMetrics:
+        return PipelineMetrics(
+            {
+                "fetch": self.max_concurrency,
+                "process": self.process_workers,
+                "write": self.file_writers,
+            }
+        )
+
+    async def __aenter__(self) -> "AsyncBetEdgeClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the HTTP connection pool and shut down the executors."""
+        await self.http_client.aclose()
+        self._executor.shutdown(wait=True)
+        self._stream_executor.shutdown(wait=True)
+        self._write_executor.shutdown(wait=True)
+
+    async def _run_sync(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def _write(self, file_write_job: FileWriteJob) -> None:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        size = await loop.run_in_executor(
+            self._write_executor, self.lake_writer.write, file_write_job
+        )
+        self.metrics.record("write", started, size)
+
+    async def _ensure_ready(self) -> None:
+        if self._ready:
+            return
+        if not self.general_config.response_cache_replay:
+            await self._ensure_theta_running()
+        await self._run_sync(self._ensure_bucket_exists)
+        self._ready = True
+
+    def _ensure_bucket_exists(self) -> None:
+        """Ensure the configured bucket exists, create if not."""
+        try:
+            if not self.minio_client.bucket_exists(self.minio_config.bucket):
+                logger.info(f"Creating bucket: {self.minio_config.bucket}")
+                self.minio_client.make_bucket(
+                    self.minio_config.bucket, location="us-east-1"
+                )
+        except S3Error as e:
+            logger.error(f"Failed to ensure bucket exists: {e}")
+            raise RuntimeError(f"MinIO bucket setup failed: {e}") from e
+
+    async def _ensure_theta_running(self) -> None:
+        """Ensure ThetaTerminal is accessible."""
+        try:
+            await self.http_client.client.get(
+                f"{self.general_config.theta_base_url}/list/dates/stock/quote?root=AAPL",
+                timeout=5,
+            )
+        except Exception:
+            raise RuntimeError(
+                "Cannot connect to ThetaTerminal. Please start it manually:\n"
+                "java -jar ThetaTerminal.jar"
+            )
+
+    async def _http_worker(
+        self,
+        job_queue: asyncio.Queue,
+        result_queue: asyncio.Queue,
+        write_queue: asyncio.Queue,
+    ) -> None:
+        while (job := await job_queue.get()) is not None:
+            try:
+                started = time.perf_counter()
+                if self._stream_csv and job.return_type == ReturnType.CSV:
+                    # Parsing happens inside the download, counted as fetch time
+                    with self.metrics.request():
+                        nbytes = await self._fetch_and_process_stream(job, write_queue)
+                    self.metrics.record("fetch", started, nbytes, job.rows)
+                else:
+                    with self.metrics.request():
+                        await self.http_client.fetch(job)
+                    self.metrics.record("fetch", started, job.response_bytes)
+                    await result_queue.put(job)
+            except NoDataAvailableError:
+                logger.info(f"Got no data available error for {job.url}, skipping.")
+                await self._skip_job(job, write_queue)
+
+    async def _fetch_and_process_stream(
+        self, job: HTTPJob, write_queue: asyncio.Queue
+    ) -> int:
+        """
+        Parse a CSV response on the stream executor while the event loop feeds it, and
+        queue its file if that completed it.
+
+        Returns:
+            Number of response bytes read
+        """
+        loop = asyncio.get_running_loop()
+        async with self.http_client.open_csv_stream(job.url, job.headers) as stream:
+            job.csv_buffer = stream
+            try:
+                file_write_job = await loop.run_in_executor(
+                    self._stream_executor, process_http_result, job
+                )
+            finally:
+                job.csv_buffer = None
+
+        if file_write_job.claim():
+            await write_queue.put(file_write_job)
+        return stream.bytes_read
+
+    async def _skip_job(self, job: HTTPJob, write_queue: asyncio.Queue) -> None:
+        """Count a job that returned no data and queue its file if that completed it."""
+        self.metrics.record_no_data()
+        file_write_job = job.file_write_job
+        file_write_job.skip_item(job.item_index)
+        if file_write_job.claim():
+            await write_queue.put(file_write_job)
+
+    async def _response_processor(
+        self, result_queue: asyncio.Queue, write_queue: asyncio.Queue
+    ) -> None:
+        while (job := await result_queue.get()) is not None:
+            try:
+                started = time.perf_counter()
+                nbytes = job.response_bytes
+                file_write_job = await self._run_sync(process_http_result, job)
+                self.metrics.record("process", started, nbytes, job.rows)
+            except NoDataAvailableError:
+                logger.info(f"Got no data available error for {job.url}, skipping.")
+                await self._skip_job(job, write_queue)
+                continue
+            finally:
+                # Release the raw response as soon as it has been parsed
+                job.csv_buffer = None
+                job.json = None
+
+            if file_write_job.claim():
+                await write_queue.put(file_write_job)
+
+    async def _file_writer(self, write_queue: asyncio.Queue) -> None:
+        while (file_write_job := await write_queue.get()) is not None:
+            await self._write(file_write_job)
+
+    async def request_data(self, request: Request) -> RequestSummary:
+        """
+        Fetch and write every file of a request that is not already in the lake.
+
+        Args:
+            request: Request to process
+
+        Returns:
+            RequestSummary with the outcome of the request
+        """
+        return (await self.request_many([request]))[0]
+
+    async def request_many(self, requests: Iterable[Request]) -> List[RequestSummary]:
+        """
+        Fetch and write a batch of requests concurrently, taking one file from each
+        request in turn.
+
+        Args:
+            requests: Requests to process
+
+        Returns:
+            RequestSummary per request, in the order the requests were given
+        """
+        requests = list(requests)
+        logger.info(f"Processing batch of {len(requests)} data requests")
+        await self._ensure_ready()
+        self.metrics = self._new_metrics()
+
+        await asyncio.gather(
+            *(
+                self._run_sync(self.lake_index.load_for_keys, request.get_day_map())
+                for request in requests
+                if not request.force_refresh
+            )
+        )
+
+        summaries = [
+            RequestSummary(request_id=r.id, request_type=type(r).__name__)
+            for r in requests
+        ]
+        jobs = interleave_file_jobs(
+            iter_file_jobs(
+                request,
+                summary,
+                self.lake_index.exists,
+                covered_dates=self.lake_writer.covered_dates,
+                spill=self.general_config.spill_to_disk,
+                spill_dir=self.general_config.spill_dir,
+                profile_for=self.lake_writer.profile_for,
+                contracts=self.contracts,
+                split_underlying=self.general_config.split_underlying,
+                materialize_silver=self.general_config.materialize_silver,
+            )
+            for request, summary in zip(requests, summaries)
+        )
+
+        # Bounded queues between the stages, by item count and by the bytes of responses
+        # and tables they hold as in BetEdgeClient. A full queue pauses the stage feeding
+        # it, and since jobs are generated lazily a full job queue also pauses
+        # generation. The None that stops a stage weighs nothing.
+        job_queue: asyncio.Queue = AsyncBoundedQueue(
+            maxsize=self.general_config.job_queue_size
+        )
+        result_queue: asyncio.Queue = AsyncBoundedQueue(
+            maxsize=self.general_config.result_queue_size,
+            max_bytes=self.general_config.result_queue_bytes,
+            sizeof=lambda job: job.response_bytes if job else 0,
+        )
+        write_queue: asyncio.Queue = AsyncBoundedQueue(
+            maxsize=self.general_config.write_queue_size,
+            max_bytes=self.general_config.write_queue_bytes,
+            sizeof=lambda file_write_job: (
+                file_write_job.buffered_bytes if file_write_job else 0
+            ),
+        )
+        self.metrics.watch_queue("http_job", job_queue.qsize)
+        self.metrics.watch_queue("http_result", result_queue.qsize)
+        self.metrics.watch_queue("file_write", write_queue.qsize)
+
+        http_workers = [
+            asyncio.create_task(self._http_worker(job_queue, result_queue, write_queue))
+            for _ in range(self.max_concurrency)
+        ]
+        processors = [
+            asyncio.create_task(self._response_processor(result_queue, write_queue))
+            for _ in range(self.process_workers)
+        ]
+        writers = [
+            asyncio.create_task(self._file_writer(write_queue))
+            for _ in range(self.file_writers)
+        ]
+
+        async def feed() -> None:
+            # Generating jobs may read the lake (covered_dates, contract dimensions),
+            # so the generator is advanced on the default executor, off the event loop
+            loop = asyncio.get_running_loop()
+            total_jobs = 0
+            while (
+                job := await loop.run_in_executor(None, next, jobs, None)
+            ) is not None:
+                await job_queue.put(job)
+                total_jobs += 1
+
+            files_skipped = sum(s.files_skipped for s in summaries)
+            total_files = sum(s.files_total for s in summaries)
+            logger.info(
+                f"Queued {total_jobs} HTTP jobs for {total_files - files_skipped} files ({files_skipped} files skipped)"
+            )
+
+        async def drain() -> None:
+            # Each stage is stopped once every stage feeding it has finished
+            stages = [
+                ([feeder], job_queue, http_workers),
+                (http_workers, result_queue, processors),
+                (http_workers + processors, write_queue, writers),
+            ]
+            for producers, queue, consumers in stages:
+                await asyncio.gather(*producers)
+                for _ in consumers:
+                    await queue.put(None)
+            await asyncio.gather(*writers)
+
+        feeder = asyncio.create_task(feed())
+        tasks = [feeder, *http_workers, *processors, *writers]
+        tasks.append(asyncio.create_task(drain()))
+
+        try:
+            # gather re-raises the first worker exception
+            await asyncio.gather(*tasks)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            # Silver pairs still waiting for their other half never complete
+            self.lake_writer.evict_silver(summaries)
+
+        for request, summary in zip(requests, summaries):
+            logger.info(
+                f"Request processing completed for {summary.request_type} (ID: {request.id}): "
+                f"{summary.files_written} files written, {summary.files_skipped} skipped, "
+                f"{summary.no_data} of {summary.http_jobs} HTTP jobs returned no data"
+            )
+            if summary.silver_failed:
+                logger.warning(
+                    f"{summary.silver_failed} silver objects of request {request.id} were not written"
+                )
+        metrics = self.metrics.summary()
+        for summary in summaries:
+            summary.metrics = metrics
+        for line in self.metrics.report():
+            logger.info(f"Stage throughput {line}")
+        if self.response_cache is not None:
+            logger.info(
+                f"Response cache: {self.response_cache.hits} hits, {self.response_cache.misses} misses"
+            )
+        if bottleneck := self.metrics.bottleneck():
+            logger.info(f"Busiest stage: {bottleneck.name}")
+
+        return summaries
+
+    async def retrieve_data(self, request: Request) -> pl.DataFrame:
+        """Read every object of a request that exists in the lake into one DataFrame."""
+        lazy_frame = await self.scan_data(request)
+        return await lazy_frame.collect_async()
+
+    async def scan_data(self, request: Request) -> pl.LazyFrame:
+        """
+        Lazily scan the objects of a request that exist in the lake, see
+        BetEdgeClient.scan_data. Collect the frame with collect_async to keep the event
+        loop free.
+        """
+        logger.info(
+            f"Processing retrieval request for {type(request).__name__} (ID: {request.id})"
+        )
+
+        return await self._scan_keys(list(request.get_day_map()))
+
+    async def scan_underlying(self, request: OptionRequest) -> pl.LazyFrame:
+        """
+        Lazily scan the underlying stock rows written next to the option files of a
+        request, see BetEdgeClient.scan_underlying.
+        """
+        return await self._scan_keys(
+            [companion_key(key) for key in request.get_day_map()]
+        )
+
+    async def _scan_keys(self, keys: List[str]) -> pl.LazyFrame:
+        # See BetEdgeClient._scan_keys
+        recorded = (
+            await self._run_sync(self.manifest.recorded, keys)
+            if self.manifest
+            else set()
+        )
+        await self._run_sync(
+            self.lake_index.load_for_keys, [k for k in keys if k not in recorded]
+        )
+        uris = [
+            f"s3://{self.minio_config.bucket}/{key}"
+            for key in keys
+            if key in recorded or self.lake_index.exists(key)
+        ]
+        return scan_lake(
+            uris,
+            self.minio_config.get_minio_storage_options(),
+            hive_partitioning=self.general_config.lake_layout == "hive",
+        )
@@ -1,29 +1,46 @@
 import requests
 import threading
 import logging
+import time
 
-from io import BytesIO
-from queue import Queue, Empty
-from typing import Optional
+from collections import deque
+from queue import Empty, Full, Queue
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
 from enum import Enum
 
 
 import polars as pl
-import pyarrow.parquet as pq
-import pyarrow as pa
 from minio import Minio
 from minio.error import S3Error
 
 from betedge_data.client.requests import (
+    FileGranularity,
+    companion_key,
     OptionRequest,
     StockRequest,
     EarningsRequest,
 )
+from betedge_data.cache import ResponseCache
+from betedge_data.contracts import ContractRegistry
 from betedge_data.client.config import get_settings
 from betedge_data.http_client import HTTPClient
+from betedge_data.lake import LakeIndex
+from betedge_data.manifest import LakeManifest
+from betedge_data.limiter import AdaptiveLimiter, HostLimiters
+from betedge_data.metrics import PipelineMetrics
+from betedge_data.queues import BoundedQueue
 from betedge_data.exceptions import NoDataAvailableError
-from betedge_data.job import HTTPJob, FileWriteJob, ReturnType, Schema
+from betedge_data.job import (
+    HTTPJob,
+    FileWriteJob,
+    RequestSummary,
+    ReturnType,
+    Schema,
+)
 from betedge_data.processing.dispatch import process_http_result
+from betedge_data.silver import silver_key
+from betedge_data.profiles import WriteProfile, resolve_write_profiles
+from betedge_data.writer import LakeWriter
 
 Request = OptionRequest | StockRequest | EarningsRequest
 
@@ -66,6 +83,207 @@ def _set_log_level(lvl: str | LogLevel) -> None:
             logging.getLogger("betedge_data").setLevel(logging.WARNING)
 
 
+def resolve_job_types(request: Request) -> tuple[Schema, ReturnType]:
+    """Map a request to the Schema and ReturnType of the HTTPJobs it generates."""
+    schema = Schema.EARNINGS
+    return_type = ReturnType.JSON
+
+    if isinstance(request, OptionRequest):
+        return_type = ReturnType.CSV
+        if request.endpoint == "eod":
+            schema = Schema.OPTION_EOD
+        else:
+            schema = Schema.OPTION_QUOTE
+
+    elif isinstance(request, StockRequest):
+        if request.endpoint == "eod":
+            schema = Schema.STOCK_EOD
+        else:
+            schema = Schema.STOCK_QUOTE
+
+        return_type = ReturnType.CSV
+
+    return schema, return_type
+
+
+def iter_file_jobs(
+    request: Request,
+    summary: RequestSummary,
+    file_exists: Callable[[str], bool],
+    *,
+    covered_dates: Optional[Callable[[str], Set[int]]] = None,
+    spill: bool = False,
+    spill_dir: Optional[str] = None,
+    profile_for: Optional[Callable[[Schema], WriteProfile]] = None,
+    contracts: Optional[ContractRegistry] = None,
+    split_underlying: bool = False,
+    materialize_silver: bool = False,
+) -> Iterator[List[HTTPJob]]:
+    """
+    Yield the HTTPJobs of every file a request still needs written, one list per file.
+
+    For incremental requests existing files are not skipped outright. Only their missing
+    days are fetched and the FileWriteJob is marked to merge them into the existing object.
+    Days recorded as returning no data count as present.
+
+    Args:
+        request: Request to generate jobs for
+        summary: RequestSummary the generated FileWriteJobs report to
+        file_exists: Predicate used to skip files already in the lake
+        covered_dates: Returns the YYYYMMDD dates an existing object holds or that returned
+            no data for it, required for incremental requests
+        spill: Append results to an Arrow IPC spill file as they arrive instead of holding them
+        spill_dir: Directory for spill files, the system temp directory when None
+        profile_for: Returns the WriteProfile files of a schema are encoded with
+        contracts: Registry whose dimension of the request's root encodes option files
+            with contract ids
+        split_underlying: Write the underlying stock rows of option requests to a
+            companion object next to each option file instead of into it. The list of an
+            option file then also holds the jobs of its companion.
+        materialize_silver: Have the writer materialise the silver object of each option
+            file it writes
+
+    Returns:
+        Iterator over the HTTPJobs of each file
+    """
+    day_map = request.get_day_map()
+    headers = request.headers
+    schema, return_type = resolve_job_types(request)
+    is_option = isinstance(request, OptionRequest)
+    split = split_underlying and is_option
+    # Objects written per key of the day map
+    objects_per_file = 2 if split else 1
+    summary.files_total = len(day_map) * objects_per_file
+    granularity = getattr(request, "file_granularity", FileGranularity.MONTHLY).value
+    incremental = request.incremental and covered_dates is not None
+    dimension = (
+        contracts.get(request.root)
+        if contracts is not None and schema in (Schema.OPTION_QUOTE, Schema.OPTION_EOD)
+        else None
+    )
+
+    for object_key, days in day_map.items():
+        merge_existing = False
+        if not request.force_refresh and file_exists(object_key):
+            if not incremental:
+                summary.files_skipped += objects_per_file
+                logger.info(f"Skipping existing file: {object_key}")
+                continue
+
+            covered = covered_dates(object_key)
+            missing = [d for d in days if d.to_int() not in covered]
+            summary.days_skipped += len(days) - len(missing)
+            if not missing:
+                summary.files_skipped += objects_per_file
+                logger.info(f"Skipping complete file: {object_key}")
+                continue
+            logger.info(
+                f"Filling {len(missing)} of {len(days)} days missing from {object_key}"
+            )
+            days = missing
+            merge_existing = True
+
+        if split:
+            # The companion follows its option file, so it is filled and skipped with it
+            files = [
+                (
+                    companion_key(object_key),
+                    resolve_job_types(request.stock_request)[0],
+                    request.stock_request._create_urls_per_day(days),
+                ),
+                (object_key, schema, request._create_option_urls_per_day(days)),
+            ]
+        else:
+            files = [(object_key, schema, request._create_urls_per_day(days))]
+
+        silver = silver_key(object_key) if materialize_silver and is_option else None
+        file_jobs = []
+        for key, file_schema, url_list in files:
+            file_write_job = FileWriteJob(
+                key,
+                len(url_list),
+                schema=file_schema,
+                root=getattr(request, "root", None),
+                granularity=granularity,
+                interval=getattr(request, "interval_str", None),
+                write_profile=profile_for(file_schema) if profile_for else None,
+                contracts=dimension if file_schema == schema else None,
+                silver_key=silver,
+                underlying_key=(
+                    companion_key(object_key)
+                    if split and file_schema == schema
+                    else None
+                ),
+                summary=summary,
+                spill=spill,
+                spill_dir=spill_dir,
+                merge_existing=merge_existing,
+                # A day's urls are adjacent, one url or an underlying and option pair
+                item_dates=[
+                    d.to_int() for d in days for _ in range(len(url_list) // len(days))
+                ],
+            )
+            logger.info(f"Creating {len(url_list)} HTTP jobs for file: {key}")
+            summary.http_jobs += len(url_list)
+            file_jobs.append(
+                [
+                    HTTPJob(
+                        url=url,
+                        schema=file_schema,
+                        return_type=return_type,
+                        file_write_job=file_write_job,
+                        headers=headers,
+                        item_index=i,
+                    )
+                    for i, url in enumerate(url_list)
+                ]
+            )
+        # Each day's underlying job ahead of its option job, as in a combined file
+        yield [job for day_jobs in zip(*file_jobs) for job in day_jobs]
+
+
+def interleave_file_jobs(
+    file_jobs: Iterable[Iterator[List[HTTPJob]]],
+) -> Iterator[HTTPJob]:
+    """
+    Round robin over requests one file at a time, so every request in a batch makes
+    progress while only a handful of files are being assembled at once.
+    """
+    active = deque(file_jobs)
+    while active:
+        jobs = active.popleft()
+        try:
+            yield from next(jobs)
+        except StopIteration:
+            continue
+        active.append(jobs)
+
+
+def scan_lake(
+    uris: List[str], storage_options: Dict[str, str], hive_partitioning: bool = False
+) -> pl.LazyFrame:
+    """
+    Scan parquet objects of the lake as one LazyFrame.
+
+    Args:
+        uris: s3:// URIs of the objects to scan
+        storage_options: Polars storage options of the MinIO endpoint
+        hive_partitioning: Add the partition columns of hive layout keys, e.g. year and month
+
+    Returns:
+        LazyFrame over the objects, in the given order
+
+    Raises:
+        FileNotFoundError: If no URIs are given
+    """
+    if not uris:
+        raise FileNotFoundError("None of the requested objects exist in the lake.")
+    logger.info(f"Scanning {len(uris)} objects from the lake")
+    return pl.scan_parquet(
+        uris, storage_options=storage_options, hive_partitioning=hive_partitioning
+    )
+
+
 class BetEdgeClient:
     _instance = None
 
@@ -90,6 +308,7 @@ class BetEdgeClient:
             self.max_workers = self.general_config.max_workers
         else:
             self.max_workers = num_threads
+        self.file_writers = max(1, self.general_config.file_writers)
 
         self.minio_client = Minio(
             endpoint=self.minio_config.endpoint,
@@ -99,16 +318,80 @@ class BetEdgeClient:
             region="us-east-1",
         )
         self._ensure_bucket_exists()
+        self.lake_index = LakeIndex(
+            self.minio_client,
+            self.minio_config.bucket,
+            ttl=self.general_config.lake_index_ttl,
+        )
+        self.manifest = (
+            LakeManifest(self.general_config.manifest_path)
+            if self.general_config.manifest_path
+            else None
+        )
+        self.lake_writer = LakeWriter(
+            self.minio_client,
+            self.minio_config.bucket,
+            index=self.lake_index,
+            manifest=self.manifest,
+            row_group_size=self.general_config.row_group_size,
+            part_size=self.general_config.upload_part_size,
+            profiles=resolve_write_profiles(self.general_config.write_profiles),
+            settle_days=self.general_config.settle_days,
+        )
+        self.contracts = (
+            ContractRegistry(self.minio_client, self.minio_config.bucket)
+            if self.general_config.contract_ids
+            else None
+        )
+        self.response_cache = (
+            ResponseCache(
+                self.general_config.response_cache_dir,
+                max_bytes=self.general_config.response_cache_max_bytes,
+                replay=self.general_config.response_cache_replay,
+                settle_days=self.general_config.settle_days,
+            )
+            if self.general_config.response_cache_dir
+            else None
+        )
+        # Cached responses are stored whole, so caching takes precedence over streaming
+        self._stream_csv = (
+            self.general_config.stream_csv and self.response_cache is None
+        )
+
+        # With adaptive concurrency the limiter, not the thread count, bounds in flight requests
+        limiter = None
+        self.http_workers = self.max_workers
+        if self.general_config.adaptive_concurrency:
+            limiter_kwargs = self.general_config.adaptive_limiter_kwargs()
+            limiter = HostLimiters(lambda: AdaptiveLimiter(**limiter_kwargs))
+            self.http_workers = self.general_config.adaptive_max_limit
 
         self.http_client = HTTPClient(
-            max_connections=self.max_workers, max_keepalive_connections=self.max_workers
+            max_connections=self.http_workers,
+            max_keepalive_connections=self.http_workers,
+            limiter=limiter,
+            cache=self.response_cache,
+        )
+        if not self.general_config.response_cache_replay:
+            self._ensure_theta_running()
+
+        # Bounded queues between the stages, a full queue blocks the stage feeding it
+        self.http_job_queue: Queue[HTTPJob] = BoundedQueue(
+            maxsize=self.general_config.job_queue_size
+        )
+        self.http_result_queue: Queue[HTTPJob] = BoundedQueue(
+            maxsize=self.general_config.result_queue_size,
+            max_bytes=self.general_config.result_queue_bytes,
+            sizeof=lambda job: job.response_bytes,
+        )
+        self.file_write_queue: Queue[FileWriteJob] = BoundedQueue(
+            maxsize=self.general_config.write_queue_size,
+            max_bytes=self.general_config.write_queue_bytes,
+            sizeof=lambda file_write_job: file_write_job.buffered_bytes,
         )
-        self._ensure_theta_running()
 
-        # Queues for processing Async
-        self.http_job_queue: Queue[HTTPJob] = Queue()
-        self.http_result_queue: Queue[HTTPJob] = Queue()
-        self.file_write_queue: Queue[FileWriteJob] = Queue()
+        # Metrics of the last request_many call
+        self.metrics = self._new_metrics()
 
     # Singleton to prevent too many requests being sent.
     def __new__(cls, *args, **kwargs):
@@ -116,15 +399,37 @@ class BetEdgeClient:
             cls._instance = super().__new__(cls)
         return cls._instance
 
+    @property
+    def concurrency_limits(self) -> Dict[str, int]:
+        """Current adaptive in flight limit per host, empty when adaptive concurrency is off."""
+        if self.http_client.limiter is None:
+            return {}
+        return self.http_client.limiter.current_limits()
+
+    def _new_metrics(self) -> PipelineMetrics:
+        metrics = PipelineMetrics(
+            {
+                "fetch": self.http_workers,
+                "process": self.max_workers // 2,
+                "write": self.file_writers,
+            }
+        )
+        metrics.watch_queue("http_job", self.http_job_queue.qsize)
+        metrics.watch_queue("http_result", self.http_result_queue.qsize)
+        metrics.watch_queue("file_write", self.file_write_queue.qsize)
+        return metrics
+
     def _start(self):
+        if self._running:
+            return
         self._running = True
         logger.info(
             f"Starting BetEdge client with {self.max_workers} worker threads per pool"
         )
 
         # Start HTTP worker threads
-        logger.info(f"Starting {self.max_workers} HTTP worker threads")
-        for i in range(self.max_workers):
+        logger.info(f"Starting {self.http_workers} HTTP worker threads")
+        for i in range(self.http_workers):
             thread = threading.Thread(
                 target=self._http_worker, daemon=True, name=f"http-worker-{i}"
             )
@@ -147,13 +452,16 @@ class BetEdgeClient:
                 f"Started response processor thread: {thread.name} (ID: {thread.ident})"
             )
 
-        # Start file writer thread
-        logger.info("Starting file writer thread.")
-        thread = threading.Thread(
-            target=self._file_writer, daemon=True, name="file-writer"
-        )
-        thread.start()
-        logger.debug(f"Started file writer thread: {thread.name} (ID: {thread.ident})")
+        # Start file writer threads
+        logger.info(f"Starting {self.file_writers} file writer threads")
+        for i in range(self.file_writers):
+            thread = threading.Thread(
+                target=self._file_writer, daemon=True, name=f"file-writer-{i}"
+            )
+            thread.start()
+            logger.debug(
+                f"Started file writer thread: {thread.name} (ID: {thread.ident})"
+            )
 
     def _shutdown(self):
         with self._shutdown_lock:
@@ -185,6 +493,21 @@ class BetEdgeClient:
                 except Empty:
                     break
 
+    def _put(self, queue: Queue, item) -> bool:
+        """
+        Put an item into a bounded queue, blocking while it is full.
+
+        Returns:
+            False if the client shut down before the item could be queued
+        """
+        while self._running:
+            try:
+                queue.put(item, timeout=1)
+                return True
+            except Full:
+                continue
+        return False
+
     def _set_worker_exception(self, exc: Exception) -> None:
         with self._exception_lock:
             if self._worker_exception is None:
@@ -226,15 +549,25 @@ class BetEdgeClient:
                 )
 
                 try:
-                    job = self.http_client.fetch(
-                        job
-                    )  # This could raise a NoDataAvailableError
-                    if job:
-                        self.http_result_queue.put(job)
+                    started = time.perf_counter()
+                    if self._stream_csv and job.return_type == ReturnType.CSV:
+                        # Parsing happens inside the download, counted as fetch time
+                        with self.metrics.request():
+                            nbytes = self._fetch_and_process_stream(job)
+                        self.metrics.record("fetch", started, nbytes, job.rows)
+                    else:
+                        with self.metrics.request():
+                            job = self.http_client.fetch(
+                                job
+                            )  # This could raise a NoDataAvailableError
+                        if job:
+                            self.metrics.record("fetch", started, job.response_bytes)
+                            self._put(self.http_result_queue, job)
                     self.http_job_queue.task_done()
 
                 except NoDataAvailableError:
-                    logger.info("Got no data available error for, skipping.")
+                    logger.info(f"Got no data available error for {job.url}, skipping.")
+                    self._skip_job(job)
                     self.http_job_queue.task_done()
 
                 except Exception as e:
@@ -247,6 +580,30 @@ class BetEdgeClient:
             except Empty:  # Exception for empty Queue
                 continue  # Just continue polling
 
+    def _fetch_and_process_stream(self, job: HTTPJob) -> int:
+        """
+        Parse a CSV response while it downloads and queue its file if that completed it.
+
+        Returns:
+            Number of response bytes read
+        """
+        with self.http_client.open_csv_stream(job.url, job.headers) as stream:
+            job.csv_buffer = stream
+            file_write_job = process_http_result(job)
+        job.csv_buffer = None
+
+        if file_write_job.claim():
+            self._put(self.file_write_queue, file_write_job)
+        return stream.bytes_read
+
+    def _skip_job(self, job: HTTPJob) -> None:
+        """Count a job that returned no data and queue its file if that completed it."""
+        self.metrics.record_no_data()
+        file_write_job = job.file_write_job
+        file_write_job.skip_item(job.item_index)
+        if file_write_job.claim():
+            self._put(self.file_write_queue, file_write_job)
+
     def _response_processor(self):
         thread_name = threading.current_thread().name
         logger.debug(
@@ -261,13 +618,16 @@ class BetEdgeClient:
                 )
 
                 try:
+                    started = time.perf_counter()
+                    nbytes = http_result.response_bytes
                     file_write_job = process_http_result(http_result)
+                    self.metrics.record("process", started, nbytes, http_result.rows)
                     logger.debug(
                         f"Response processor {thread_name} converted HTTP result to file write job: {file_write_job.object_key}"
                     )
 
-                    if file_write_job.completed:
-                        self.file_write_queue.put(file_write_job)
+                    if file_write_job.claim():
+                        self._put(self.file_write_queue, file_write_job)
                         logger.debug(
                             f"Response processor {thread_name} queued completed file write job: {file_write_job.object_key}"
                         )
@@ -281,6 +641,7 @@ class BetEdgeClient:
                     logger.info(
                         f"Got no data available error for {http_result.url}, skipping."
                     )
+                    self._skip_job(http_result)
                     self.http_result_queue.task_done()
                 except Exception as e:
                     logger.error(
@@ -306,31 +667,9 @@ class BetEdgeClient:
                 )
 
                 try:
-                    if not file_write_job.completed:
-                        raise RuntimeError("Incomplete FileWriteJob found in Queue.")
-
-                    logger.debug(
-                        f"File writer {thread_name} concatenating {len(file_write_job.tables)} tables for {file_write_job.object_key}"
-                    )
-                    table = pa.concat_tables(file_write_job.tables)
-
-                    buffer = BytesIO()
-                    pq.write_table(table, buffer)
-                    buffer.seek(0)
-
-                    size = len(buffer.getvalue())
-                    logger.info(
-                        f"File writer {thread_name} writing {size} bytes to MinIO object: {file_write_job.object_key}"
-                    )
-
-                    self.minio_client.put_object(
-                        bucket_name=self.minio_config.bucket,
-                        object_name=file_write_job.object_key,
-                        data=buffer,
-                        length=size,
-                        content_type="application/octet-stream",
-                    )
-
+                    started = time.perf_counter()
+                    size = self.lake_writer.write(file_write_job)
+                    self.metrics.record("write", started, size)
                     logger.info(
                         f"File writer {thread_name} successfully uploaded object to MinIO: {file_write_job.object_key}"
                     )
@@ -346,102 +685,173 @@ class BetEdgeClient:
             except Empty:
                 continue
 
-    def request_data(self, request: Request) -> None:
-        logger.info(
-            f"Processing data request for {type(request).__name__} (ID: {request.id})"
-        )
-        self._start()
-        key_map = request.get_key_map()
-        headers = request.headers
-        schema = Schema.EARNINGS
-        return_type = ReturnType.JSON
-
-        if isinstance(request, OptionRequest):
-            return_type = ReturnType.CSV
-            if request.endpoint == "eod":
-                schema = Schema.OPTION_EOD
-            else:
-                schema = Schema.OPTION_QUOTE
+    def request_data(self, request: Request) -> RequestSummary:
+        """
+        Fetch and write every file of a request that is not already in the lake.
 
-        elif isinstance(request, StockRequest):
-            if request.endpoint == "eod":
-                schema = Schema.STOCK_EOD
-            else:
-                schema = Schema.STOCK_QUOTE
+        Args:
+            request: Request to process
 
-            return_type = ReturnType.CSV
+        Returns:
+            RequestSummary with the outcome of the request
+        """
+        return self.request_many([request])[0]
 
-        total_jobs = 0
-        total_files = len(key_map)
-        files_skipped = 0
+    def request_many(self, requests: Iterable[Request]) -> List[RequestSummary]:
+        """
+        Fetch and write a batch of requests through a single pipeline run.
 
-        for object_key, url_list in key_map.items():
-            if not request.force_refresh and self._file_exists(object_key):
-                files_skipped += 1
-                logger.info(f"Skipping existing file: {object_key}")
-                continue
-            else:
-                file_write_job = FileWriteJob(object_key, len(url_list))
-                logger.info(
-                    f"Creating {len(url_list)} HTTP jobs for file: {object_key}"
-                )
-                for url in url_list:
-                    job = HTTPJob(
-                        url=url,
-                        schema=schema,
-                        return_type=return_type,
-                        file_write_job=file_write_job,
-                        headers=headers,
-                    )
-                    self.http_job_queue.put(job)
-                    total_jobs += 1
+        Jobs from all requests are fed into the queues together, taking one file from
+        each request in turn, so the pipeline only drains once at the end of the batch.
 
-        logger.info(
-            f"Queued {total_jobs} HTTP jobs for {total_files - files_skipped} files ({files_skipped} files skipped)"
-        )
+        Args:
+            requests: Requests to process
 
-        self.http_job_queue.join()
-        logger.info("All HTTP jobs completed")
-        self._check_worker_exception()
+        Returns:
+            RequestSummary per request, in the order the requests were given
+        """
+        requests = list(requests)
+        logger.info(f"Processing batch of {len(requests)} data requests")
+        self._start()
+        self.metrics = self._new_metrics()
 
-        self.http_result_queue.join()
-        logger.info("All response processing completed")
-        self._check_worker_exception()
+        for request in requests:
+            if not request.force_refresh:
+                self.lake_index.load_for_keys(request.get_day_map())
 
-        self.file_write_queue.join()
-        self._check_worker_exception()
-        logger.info(
-            f"Request processing completed for {type(request).__name__} (ID: {request.id})"
+        summaries = [
+            RequestSummary(request_id=r.id, request_type=type(r).__name__)
+            for r in requests
+        ]
+        jobs = interleave_file_jobs(
+            iter_file_jobs(
+                request,
+                summary,
+                self.lake_index.exists,
+                covered_dates=self.lake_writer.covered_dates,
+                spill=self.general_config.spill_to_disk,
+                spill_dir=self.general_config.spill_dir,
+                profile_for=self.lake_writer.profile_for,
+                contracts=self.contracts,
+                split_underlying=self.general_config.split_underlying,
+                materialize_silver=self.general_config.materialize_silver,
+            )
+            for request, summary in zip(requests, summaries)
         )
 
+        try:
+            # Jobs are generated lazily, a full job queue pauses generation
+            total_jobs = 0
+            for job in jobs:
+                if not self._put(self.http_job_queue, job):
+                    break
+                total_jobs += 1
+            self._check_worker_exception()
+
+            files_skipped = sum(s.files_skipped for s in summaries)
+            total_files = sum(s.files_total for s in summaries)
+            logger.info(
+                f"Queued {total_jobs} HTTP jobs for {total_files - files_skipped} files ({files_skipped} files skipped)"
+            )
+
+            self.http_job_queue.join()
+            logger.info("All HTTP jobs completed")
+            self._check_worker_exception()
+
+            self.http_result_queue.join()
+            logger.info("All response processing completed")
+            self._check_worker_exception()
+
+            self.file_write_queue.join()
+            self._check_worker_exception()
+        finally:
+            # Silver pairs still waiting for their other half never complete
+            self.lake_writer.evict_silver(summaries)
+
+        for request, summary in zip(requests, summaries):
+            logger.info(
+                f"Request processing completed for {summary.request_type} (ID: {request.id}): "
+                f"{summary.files_written} files written, {summary.files_skipped} skipped, "
+                f"{summary.no_data} of {summary.http_jobs} HTTP jobs returned no data"
+            )
+            if summary.silver_failed:
+                logger.warning(
+                    f"{summary.silver_failed} silver objects of request {request.id} were not written"
+                )
+        metrics = self.metrics.summary()
+        for summary in summaries:
+            summary.metrics = metrics
+        for line in self.metrics.report():
+            logger.info(f"Stage throughput {line}")
+        if self.response_cache is not None:
+            logger.info(
+                f"Response cache: {self.response_cache.hits} hits, {self.response_cache.misses} misses"
+            )
+        if bottleneck := self.metrics.bottleneck():
+            logger.info(f"Busiest stage: {bottleneck.name}")
+
+        return summaries
+
     def retrieve_data(self, request: Request) -> pl.DataFrame:
+        """Read every object of a request that exists in the lake into one DataFrame."""
+        return self.scan_data(request).collect()
+
+    def scan_data(self, request: Request) -> pl.LazyFrame:
+        """
+        Lazily scan the objects of a request that exist in the lake.
+
+        Filters and column selections applied to the returned frame are pushed down into
+        the parquet scan, so only the selected columns of row groups whose statistics
+        can match are downloaded and decoded. Objects the manifest records are taken
+        as existing, so a request the manifest covers needs no listing of the lake.
+
+        Args:
+            request: Request whose objects should be scanned
+
+        Returns:
+            LazyFrame over the request's objects
+
+        Raises:
+            FileNotFoundError: If none of the request's objects exist in the lake
+        """
         logger.info(
             f"Processing retrieval request for {type(request).__name__} (ID: {request.id})"
         )
 
-        key_map = request.get_key_map()
+        return self._scan_keys(list(request.get_day_map()))
+
+    def scan_underlying(self, request: OptionRequest) -> pl.LazyFrame:
+        """
+        Lazily scan the underlying stock rows written next to the option files of a
+        request with GeneralConfig.split_underlying, see scan_data.
+
+        Raises:
+            FileNotFoundError: If none of the request's underlying objects exist in the lake
+        """
+        return self._scan_keys([companion_key(key) for key in request.get_day_map()])
+
+    def _scan_keys(self, keys: List[str]) -> pl.LazyFrame:
+        # Objects the manifest records are read without a listing, only the rest are
+        # looked up in the lake
+        recorded = self.manifest.recorded(keys) if self.manifest else set()
+        self.lake_index.load_for_keys(key for key in keys if key not in recorded)
         uris = [
             f"s3://{self.minio_config.bucket}/{key}"
-            for key in key_map.keys()
-            if self._file_exists(key)
+            for key in keys
+            if key in recorded or self.lake_index.exists(key)
         ]
-        storage_options = self.minio_config.get_minio_storage_options()
-        dfs = [pl.read_parquet(uri, storage_options=storage_options) for uri in uris]
-
-        return pl.concat(dfs)
-
-    def _file_exists(self, object_key: str) -> bool:
-        try:
-            self.minio_client.stat_object(self.minio_config.bucket, object_key)
-            return True
-        except S3Error:
-            return False
+        return scan_lake(
+            uris,
+            self.minio_config.get_minio_storage_options(),
+            hive_partitioning=self.general_config.lake_layout == "hive",
+        )
 
     def _ensure_theta_running(self) -> None:
         """Ensure ThetaTerminal is accessible."""
         try:
             requests.get(
-                "http://127.0.0.1:25510/v2/list/dates/stock/quote?root=AAPL", timeout=5
+                f"{self.general_config.theta_base_url}/list/dates/stock/quote?root=AAPL",
+                timeout=5,
             )
         except Exception:
             raise RuntimeError(
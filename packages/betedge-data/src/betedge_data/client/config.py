@@ -1,3 +1,5 @@
+from typing import Any, Dict, Literal, Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -36,11 +38,136 @@ class MinIOConfig(BaseSettings):
 
 
 class GeneralConfig(BaseSettings):
+    theta_base_url: str = Field(
+        default="http://127.0.0.1:25510/v2",
+        description="Base URL of the ThetaTerminal REST API.",
+    )
     max_workers: int = Field(
         default=2,
         description="Number of threads to use. Should match the value in the config_0.properties for ThetaTerminal.",
     )
     http_timeout: int = Field(default=60)
+    max_concurrent_requests: int = Field(
+        default=64,
+        description="Maximum number of in flight HTTP requests for the asyncio client.",
+    )
+    process_workers: int = Field(
+        default=4,
+        description="Number of executor threads the asyncio client parses fetched responses on, streamed responses are parsed on a thread per connection.",
+    )
+    file_writers: int = Field(
+        default=2,
+        description="Number of threads encoding and uploading completed files concurrently.",
+    )
+    job_queue_size: int = Field(
+        default=1024,
+        description="Maximum HTTP jobs queued ahead of the HTTP workers, job generation blocks beyond it.",
+    )
+    result_queue_size: int = Field(
+        default=256, description="Maximum fetched responses waiting to be parsed."
+    )
+    result_queue_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        description="Maximum bytes of fetched responses waiting to be parsed.",
+    )
+    write_queue_size: int = Field(
+        default=64, description="Maximum completed files waiting to be written."
+    )
+    write_queue_bytes: int = Field(
+        default=1024 * 1024 * 1024,
+        description="Maximum bytes of in memory tables of completed files waiting to be written.",
+    )
+    lake_index_ttl: float = Field(
+        default=300,
+        description="Seconds a lake listing is reused across requests, objects written by this process are tracked without relisting. 0 relists once per request.",
+    )
+    manifest_path: Optional[str] = Field(
+        default=None,
+        description="Path of the SQLite lake manifest updated on every upload, disabled when unset.",
+    )
+    settle_days: int = Field(
+        default=2,
+        description="Calendar days the vendor may still publish or revise a trading day. Responses of requests ending inside this window are not cached and days without data inside it are not recorded in the manifest, so later runs fetch them again.",
+    )
+    row_group_size: Optional[int] = Field(
+        default=None,
+        description="Maximum rows per parquet row group for every schema, the schema's write profile decides when unset.",
+    )
+    lake_layout: Literal["legacy", "hive"] = Field(
+        default="legacy",
+        description="Object key layout, legacy '.../SPY/2024/03/data.parquet' or hive '.../root=SPY/year=2024/month=03/data.parquet'.",
+    )
+    split_underlying: bool = Field(
+        default=False,
+        description="Write the underlying stock rows of option requests to an underlying.parquet object next to each option file instead of mixing them into it.",
+    )
+    materialize_silver: bool = Field(
+        default=False,
+        description="Also write a silver object per option file, its rows joined with the underlying's bid, ask and mid and with mid, spread and days to expiration added, under 'silver/' + the option file's key.",
+    )
+    contract_ids: bool = Field(
+        default=False,
+        description="Write option files with an int32 contract_id in place of root, expiration, strike and right, resolved by a contract dimension object per root.",
+    )
+    write_profiles: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description='WriteProfile field overrides keyed by schema, e.g. {"option_quote": {"compression_level": 9}}.',
+    )
+    upload_part_size: int = Field(
+        default=8 * 1024 * 1024,
+        description="Part size in bytes of the multipart uploads the writer streams parquet into, at least 5 MiB.",
+    )
+    spill_to_disk: bool = Field(
+        default=False,
+        description="Append each day's table to an Arrow IPC spill file as it arrives instead of holding the month in memory, the file is sorted and encoded like in memory tables on upload.",
+    )
+    spill_dir: Optional[str] = Field(
+        default=None,
+        description="Directory for spill files, the system temp directory when unset.",
+    )
+    response_cache_dir: Optional[str] = Field(
+        default=None,
+        description="Directory of the on-disk cache of raw vendor responses, disabled when unset.",
+    )
+    response_cache_max_bytes: int = Field(
+        default=10 * 1024 * 1024 * 1024,
+        description="Maximum compressed size of the response cache, least recently used entries are evicted beyond it.",
+    )
+    response_cache_replay: bool = Field(
+        default=False,
+        description="Serve responses only from the cache and fail on a miss, for reprocessing without network access.",
+    )
+    stream_csv: bool = Field(
+        default=False,
+        description="Parse CSV responses block by block while they download instead of buffering the whole body.",
+    )
+    adaptive_concurrency: bool = Field(
+        default=False,
+        description="Adapt the number of in flight requests per host with AIMD instead of using a fixed worker count.",
+    )
+    adaptive_min_limit: int = Field(
+        default=1, description="Lowest in flight limit per host when adaptive."
+    )
+    adaptive_max_limit: int = Field(
+        default=16, description="Highest in flight limit per host when adaptive."
+    )
+    adaptive_latency_tolerance: float = Field(
+        default=2.0,
+        description="Ratio of recent to long run latency at which the adaptive limit backs off.",
+    )
+    adaptive_latency_target_ms: Optional[float] = Field(
+        default=None,
+        description="Optional absolute latency above which the adaptive limit backs off.",
+    )
+
+    def adaptive_limiter_kwargs(self) -> dict:
+        """Keyword arguments for AdaptiveLimiter/AsyncAdaptiveLimiter."""
+        return {
+            "min_limit": self.adaptive_min_limit,
+            "max_limit": self.adaptive_max_limit,
+            "latency_tolerance": self.adaptive_latency_tolerance,
+            "latency_target_ms": self.adaptive_latency_target_ms,
+        }
 
 
 class AppSettings(BaseSettings):
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from enum import Enum
 from urllib.parse import urlencode
 from uuid import uuid4
@@ -7,26 +7,152 @@ from betedge_data.datetime import (
     interval_ms_to_string,
     DateParts,
 )
+from betedge_data.client.config import get_settings
 from betedge_data.client.validations import (
     val_interval,
     val_start_date_before_end_date,
 )
 
 
-THETA_BASE_URL = "http://127.0.0.1:25510/v2"
-
-
 class FileGranularity(Enum):
     DAILY = "daily"
     MONTHLY = "monthly"
 
 
+class LakeLayout(Enum):
+    # .../{root}/{YYYY}/{MM}/data.parquet
+    LEGACY = "legacy"
+    # .../root={root}/year={YYYY}/month={MM}/data.parquet, prunable by query engines
+    HIVE = "hive"
+
+
+# Object names within a partition, the requested data and the underlying stock rows
+# OptionRequest writes next to it when GeneralConfig.split_underlying is set
+DATA_OBJECT = "data.parquet"
+UNDERLYING_OBJECT = "underlying.parquet"
+
+
 def convert_fg(fg: str | FileGranularity) -> FileGranularity:
     if isinstance(fg, str):
         return FileGranularity(fg)
     return fg
 
 
+def convert_layout(layout: Optional[str | LakeLayout] = None) -> LakeLayout:
+    """Resolve a layout, GeneralConfig.lake_layout when None."""
+    if layout is None:
+        layout = get_settings().general.lake_layout
+    if isinstance(layout, str):
+        return LakeLayout(layout)
+    return layout
+
+
+def object_key(
+    base_key: str,
+    root: Optional[str],
+    year: str,
+    month: str,
+    day: Optional[str] = None,
+    layout: Optional[str | LakeLayout] = None,
+    filename: str = DATA_OBJECT,
+) -> str:
+    """
+    Build the key of one lake object.
+
+    Args:
+        base_key: Key prefix ending before the root, e.g. 'historical-options/quote/monthly/1h'
+        root: Underlying symbol, None for datasets without one
+        year: Four digit year
+        month: Two digit month
+        day: Two digit day for daily files
+        layout: Key layout, GeneralConfig.lake_layout when None
+        filename: Object name within the partition
+
+    Returns:
+        Object key ending in the filename
+    """
+    if convert_layout(layout) == LakeLayout.HIVE:
+        parts = [f"year={year}", f"month={month}"]
+        if root is not None:
+            parts.insert(0, f"root={root}")
+        if day is not None:
+            parts.append(f"day={day}")
+    else:
+        parts = [p for p in (root, year, month, day) if p is not None]
+    return "/".join([base_key, *parts, filename])
+
+
+def companion_key(key: str, filename: str = UNDERLYING_OBJECT) -> str:
+    """
+    Key of an object stored next to a lake object, e.g. the underlying stock rows of an
+    option file: '.../SPY/2024/03/data.parquet' -> '.../SPY/2024/03/underlying.parquet'.
+    """
+    return f"{key.rpartition('/')[0]}/{filename}"
+
+
+def to_hive_key(key: str) -> Optional[str]:
+    """
+    Translate a legacy object key into the hive layout.
+
+    Args:
+        key: Legacy key such as 'historical-options/eod/monthly/1d/SPY/2024/03/data.parquet'
+
+    Returns:
+        The hive key, or None if the key is not a legacy lake key
+    """
+    *head, filename = key.split("/")
+    if filename not in (DATA_OBJECT, UNDERLYING_OBJECT):
+        return None
+
+    dates: List[str] = []
+    while head and head[-1].isdigit() and len(dates) < 3:
+        dates.insert(0, head.pop())
+    if len(dates) < 2 or len(dates[0]) != 4 or not head:
+        return None
+
+    # Only the historical datasets carry a root segment after their base key
+    root = head.pop() if len(head) > 1 else None
+    return object_key(
+        "/".join(head), root, *dates, layout=LakeLayout.HIVE, filename=filename
+    )
+
+
+def map_days_to_keys(
+    base_key: str,
+    start_date: int,
+    end_date: int,
+    file_granularity: FileGranularity = FileGranularity.MONTHLY,
+    root: Optional[str] = None,
+    layout: Optional[str | LakeLayout] = None,
+) -> Dict[str, List[DateParts]]:
+    """
+    Map the trading days between two dates to the object keys they are stored under.
+
+    Args:
+        base_key: Key prefix ending before the root and date components
+        start_date: Start date in integer format YYYYMMDD
+        end_date: End date in integer format YYYYMMDD
+        file_granularity: Whether an object holds a month or a single day
+        root: Underlying symbol, None for datasets without one
+        layout: Key layout, GeneralConfig.lake_layout when None
+
+    Returns:
+        Dictionary of object key to the trading days it holds
+    """
+    layout = convert_layout(layout)
+    day_map = map_trading_days_to_yearmo(start_date, end_date)
+    if file_granularity == FileGranularity.DAILY:
+        return {
+            object_key(base_key, root, d.year, d.month, d.day, layout): [d]
+            for days in day_map.values()
+            for d in days
+        }
+    return {
+        object_key(base_key, root, year, month, layout=layout): days
+        for (year, month), days in day_map.items()
+    }
+
+
 class StockRequest:
     headers = None
 
@@ -39,6 +165,7 @@ class StockRequest:
         endpoint: str,
         interval: int = 3_600_000,
         force_refresh: bool = False,
+        incremental: bool = False,
         file_granularity: FileGranularity = FileGranularity.MONTHLY,
     ) -> None:
         """
@@ -48,6 +175,8 @@ class StockRequest:
             end_date(int): End date in integer format YYYYMMDD
             endpoint(str): API endpoint to hit, either 'quote' or 'eod'
             interval(int): Response interval in ms. Default is 3,600,000 corresponding to 1 hour.
+            force_refresh(bool): Refetch every day even if the file already exists.
+            incremental(bool): Fetch only the days missing from existing files and merge them in.
             file_format(Formats): Format to use when writing to the lake. Default is 'parquet'
             file_granularity(FileGranularity): Granularity to concatenate response to.
         """
@@ -59,6 +188,7 @@ class StockRequest:
         self.endpoint = endpoint
         self.interval = interval
         self.force_refresh = force_refresh
+        self.incremental = incremental
         self.file_granularity = convert_fg(file_granularity)
         self.id = uuid4()
 
@@ -70,7 +200,7 @@ class StockRequest:
             "ivl": self.interval,
             "use_csv": "true",
         }
-        base_url = f"{THETA_BASE_URL}/hist/stock/{self.endpoint}"
+        base_url = f"{get_settings().general.theta_base_url}/hist/stock/{self.endpoint}"
 
         if self.endpoint == "eod":
             base_params.pop("ivl")
@@ -83,27 +213,27 @@ class StockRequest:
 
         return urls
 
-    def get_key_map(self) -> Dict[str, List[str]]:
-        int_str = (
-            "1d" if self.endpoint == "eod" else interval_ms_to_string(self.interval)
+    @property
+    def interval_str(self) -> str:
+        """Interval label used in object keys, e.g. '1h' or '1d' for eod."""
+        return "1d" if self.endpoint == "eod" else interval_ms_to_string(self.interval)
+
+    def get_day_map(self) -> Dict[str, List[DateParts]]:
+        """Trading days covered by each object key of the request."""
+        base_key = f"historical-stock/{self.endpoint}/{self.file_granularity.value}/{self.interval_str}"
+        return map_days_to_keys(
+            base_key,
+            self.start_date,
+            self.end_date,
+            self.file_granularity,
+            root=self.root,
         )
-        base_key = f"historical-stock/{self.endpoint}/{self.file_granularity.value}/{int_str}/{self.root}"
-        day_map = map_trading_days_to_yearmo(self.start_date, self.end_date)
-        key_map: Dict[str, List[str]] = {}
-        if self.file_granularity == FileGranularity.MONTHLY:
-            key_map = {
-                f"{base_key}/{k[0]}/{k[1]}/data.parquet": self._create_urls_per_day(v)
-                for k, v in day_map.items()
-            }
-        elif self.file_granularity == FileGranularity.DAILY:
-            key_map = {
-                f"{base_key}/{d[0]}/{d[1]}/{d[2]}/data.parquet": self._create_urls_per_day(
-                    d
-                )
-                for d in day_map.values()
-            }
-
-        return key_map
+
+    def get_key_map(self) -> Dict[str, List[str]]:
+        return {
+            key: self._create_urls_per_day(days)
+            for key, days in self.get_day_map().items()
+        }
 
 
 class OptionRequest:
@@ -118,6 +248,7 @@ class OptionRequest:
         endpoint: str,
         interval: int = 3_600_000,
         force_refresh: bool = False,
+        incremental: bool = False,
         file_granularity: str | FileGranularity = FileGranularity.MONTHLY,
     ) -> None:
         """
@@ -127,6 +258,8 @@ class OptionRequest:
             end_date(int): End date in integer format YYYYMMDD
             endpoint(str): API endpoint to hit, either 'quote' or 'eod'
             interval(int): Response interval in ms. Default is 3,600,000 corresponding to 1 hour.
+            force_refresh(bool): Refetch every day even if the file already exists.
+            incremental(bool): Fetch only the days missing from existing files and merge them in.
             file_format(Formats): Format to use when writing to the lake. Default is 'parquet'
             file_granularity(FileGranularity): Granularity to concatenate response to.
         """
@@ -138,6 +271,7 @@ class OptionRequest:
         self.endpoint = endpoint
         self.interval = interval
         self.force_refresh = force_refresh
+        self.incremental = incremental
         self.file_granularity = convert_fg(file_granularity)
         self.id = uuid4()
 
@@ -150,38 +284,45 @@ class OptionRequest:
             file_granularity=self.file_granularity,
         )
 
-    def get_key_map(self) -> Dict[str, List[str]]:
-        int_str = (
-            "1d" if self.endpoint == "eod" else interval_ms_to_string(self.interval)
+    @property
+    def interval_str(self) -> str:
+        """Interval label used in object keys, e.g. '1h' or '1d' for eod."""
+        return "1d" if self.endpoint == "eod" else interval_ms_to_string(self.interval)
+
+    def get_day_map(self) -> Dict[str, List[DateParts]]:
+        """Trading days covered by each object key of the request."""
+        base_key = f"historical-options/{self.endpoint}/{self.file_granularity.value}/{self.interval_str}"
+        return map_days_to_keys(
+            base_key,
+            self.start_date,
+            self.end_date,
+            self.file_granularity,
+            root=self.root,
         )
-        base_key = f"historical-options/{self.endpoint}/{self.file_granularity.value}/{int_str}/{self.root}"
-        day_map = map_trading_days_to_yearmo(self.start_date, self.end_date)
-        key_map: Dict[str, List[str]] = {}
-        if self.file_granularity == FileGranularity.MONTHLY:
-            key_map = {
-                f"{base_key}/{k[0]}/{k[1]}/data.parquet": self._create_urls_per_day(v)
-                for k, v in day_map.items()
-            }
-        elif self.file_granularity == FileGranularity.DAILY:
-            key_map = {
-                f"{base_key}/{d[0]}/{d[1]}/{d[2]}/data.parquet": self._create_urls_per_day(
-                    d
-                )
-                for d in day_map.values()
-            }
-
-        return key_map
+
+    def get_key_map(self) -> Dict[str, List[str]]:
+        return {
+            key: self._create_urls_per_day(days)
+            for key, days in self.get_day_map().items()
+        }
 
     def _create_urls_per_day(self, days: List[DateParts]) -> List[str]:
-        # Request stock along with the options
-        urls = self.stock_request._create_urls_per_day(days)
+        # Request stock along with the options, each day's stock url ahead of its option url
+        stock_urls = self.stock_request._create_urls_per_day(days)
+        option_urls = self._create_option_urls_per_day(days)
+        return [url for pair in zip(stock_urls, option_urls) for url in pair]
+
+    def _create_option_urls_per_day(self, days: List[DateParts]) -> List[str]:
+        urls = []
         base_params = {
             "root": self.root,
             "exp": "0",
             "ivl": self.interval,
             "use_csv": "true",
         }
-        base_url = f"{THETA_BASE_URL}/bulk_hist/option/{self.endpoint}"
+        base_url = (
+            f"{get_settings().general.theta_base_url}/bulk_hist/option/{self.endpoint}"
+        )
 
         if self.endpoint == "eod":
             base_params.pop("ivl")
@@ -212,17 +353,25 @@ class EarningsRequest:
     }
 
     def __init__(
-        self, *, start_yearmo: int, end_yearmo: int, force_refresh: bool = False
+        self,
+        *,
+        start_yearmo: int,
+        end_yearmo: int,
+        force_refresh: bool = False,
+        incremental: bool = False,
     ) -> None:
         """
         Args:
             start_yearmo(int): Start yearmo as an integer, like 202509.
             end_yearmo(int): End yearmo as an integer.
+            force_refresh(bool): Refetch every day even if the file already exists.
+            incremental(bool): Fetch only the days missing from existing files and merge them in.
         """
         val_start_date_before_end_date(start_yearmo, end_yearmo)
         self.start_yearmo = start_yearmo
         self.end_yearmo = end_yearmo
         self.force_refresh = force_refresh
+        self.incremental = incremental
         self.id = uuid4()
         self.key_map: Dict[str, List[str]] = {}
 
@@ -238,13 +387,15 @@ class EarningsRequest:
 
         return urls
 
-    def get_key_map(self) -> Dict[str, List[str]]:
-        base_key = "earnings"
+    def get_day_map(self) -> Dict[str, List[DateParts]]:
+        """Trading days covered by each object key of the request."""
         # Add a day to the yearmo to use the function
-        day_map = map_trading_days_to_yearmo(
-            self.start_yearmo * 100 + 1, self.end_yearmo * 100 + 1
+        return map_days_to_keys(
+            "earnings", self.start_yearmo * 100 + 1, self.end_yearmo * 100 + 1
         )
+
+    def get_key_map(self) -> Dict[str, List[str]]:
         return {
-            f"{base_key}/{k[0]}/{k[1]}/data.parquet": self._create_urls_per_day(v)
-            for k, v in day_map.items()
+            key: self._create_urls_per_day(days)
+            for key, days in self.get_day_map().items()
         }
@@ -0,0 +1,299 @@
+"""
+Contract dimension of the option lake.
+
+Option rows are identified by root, expiration, strike and right. With contract ids
+enabled the fact files carry a single int32 contract_id instead, and the attributes of
+every id live in one small dimension object per root:
+
+    contracts/SPY/data.parquet            (legacy layout)
+    contracts/root=SPY/data.parquet       (hive layout)
+
+Ids are assigned once and never change, so fact files written at any time join against
+the current dimension. Id 0 is the underlying, the stock rows of an option file.
+
+Ids are assigned in process, so a root's dimension has a single writer at a time. Saves
+are conditional on the ETag the dimension was loaded with: a second writer that grew the
+same root in between makes the save fail with ContractConflictError instead of both
+writers handing out the same ids to different contracts.
+"""
+
+import io
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from minio import Minio
+from minio.error import S3Error
+
+from betedge_data.client.requests import LakeLayout, convert_layout
+from betedge_data.exceptions import ContractConflictError
+from betedge_data.processing.theta.schemas import contract_dimension
+
+logger = logging.getLogger(__name__)
+
+CONTRACTS_BASE_KEY = "contracts"
+CONTRACT_COLUMNS = ("root", "expiration", "strike", "right")
+UNDERLYING_CONTRACT_ID = 0
+
+# Strikes are in tenths of a cent, a contract key packs
+# ((expiration * _STRIKE_RADIX) + strike) * 2 + is_put into an int64
+_STRIKE_RADIX = 10**9
+
+
+def contract_key(root: str, layout: Optional[str | LakeLayout] = None) -> str:
+    """Object key of a root's contract dimension."""
+    if convert_layout(layout) == LakeLayout.HIVE:
+        return f"{CONTRACTS_BASE_KEY}/root={root}/data.parquet"
+    return f"{CONTRACTS_BASE_KEY}/{root}/data.parquet"
+
+
+def _pack(table: pa.Table) -> pa.ChunkedArray:
+    """int64 key per row, null for the underlying rows, which have no strike."""
+    strike = table["strike"]
+    if (pc.max(strike).as_py() or 0) >= _STRIKE_RADIX:
+        raise ValueError(
+            f"Strike above {_STRIKE_RADIX} cannot be packed into a contract key"
+        )
+    key = pc.add(
+        pc.multiply(pc.cast(table["expiration"], pa.int64()), _STRIKE_RADIX), strike
+    )
+    is_put = pc.cast(pc.equal(table["right"], "P"), pa.int64())
+    return pc.add(pc.multiply(key, 2), is_put)
+
+
+class ContractDimension:
+    """
+    Contract ids of one root.
+
+    Thread safe. encode() assigns ids to contracts it has not seen, in contract order,
+    and save() uploads the dimension when it grew. The writer saves the dimension before
+    every fact file it uploads, so every id a fact file references is in the lake first.
+
+    save() only replaces the object it loaded. When another writer saved the root in
+    between, the ids assigned here may already name other contracts, so the dimension
+    refuses any further encode() or save() and fact files using it fail to write.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        minio_client: Optional[Minio] = None,
+        bucket: Optional[str] = None,
+        object_key: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            root: Underlying symbol of the contracts
+            minio_client: Client used to save the dimension, an in memory dimension when None
+            bucket: Bucket of the lake
+            object_key: Key of the dimension object, contract_key(root) when None
+        """
+        self.root = root
+        self.minio_client = minio_client
+        self.bucket = bucket
+        self.object_key = object_key or contract_key(root)
+        # Packed key of contract id i + 1
+        self._keys: List[int] = []
+        self._value_set = pa.array([], type=pa.int64())
+        self._saved = 0
+        # ETag of the object the saved ids were read from or written to, None when absent
+        self._etag: Optional[str] = None
+        self._conflict: Optional[str] = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of contracts, the underlying not counted."""
+        return len(self._keys)
+
+    def _read(self) -> Tuple[Optional[List[int]], Optional[str]]:
+        """Packed keys and ETag of the dimension in the lake, (None, None) when absent."""
+        try:
+            response = self.minio_client.get_object(self.bucket, self.object_key)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return None, None
+            raise
+        try:
+            table = pq.read_table(io.BytesIO(response.read()))
+            etag = (response.headers.get("ETag") or "").strip('"') or None
+        finally:
+            response.close()
+            response.release_conn()
+
+        table = table.filter(pc.not_equal(table["contract_id"], UNDERLYING_CONTRACT_ID))
+        table = table.sort_by("contract_id")
+        ids = table["contract_id"].to_pylist()
+        if ids != list(range(1, len(ids) + 1)):
+            raise ValueError(f"Contract ids of {self.object_key} are not contiguous")
+        return _pack(table).to_pylist(), etag
+
+    def load(self) -> "ContractDimension":
+        """Read the ids already assigned from the lake, if the dimension exists."""
+        if self.minio_client is None:
+            return self
+        keys, etag = self._read()
+        if keys is None:
+            return self
+        with self._lock:
+            self._keys = keys
+            self._value_set = pa.array(self._keys, type=pa.int64())
+            self._saved = len(self._keys)
+            self._etag = etag
+        logger.debug(
+            f"Loaded {len(keys)} contracts of {self.root} from {self.object_key}"
+        )
+        return self
+
+    def _check_conflict(self) -> None:
+        if self._conflict is not None:
+            raise ContractConflictError(self._conflict)
+
+    def encode(self, table: pa.Table) -> pa.Table:
+        """
+        Replace the contract columns of an option table by its contract_id.
+
+        Tables that are already encoded or carry no contract columns are returned as is.
+        """
+        if "contract_id" in table.column_names or not set(CONTRACT_COLUMNS) <= set(
+            table.column_names
+        ):
+            return table
+        self._check_conflict()
+
+        keys = _pack(table)
+        new = pc.unique(keys.drop_null())
+        with self._lock:
+            new = pc.filter(new, pc.invert(pc.is_in(new, value_set=self._value_set)))
+            if len(new):
+                # Ids of a batch follow contract order, keeping id ranges contract major
+                self._keys.extend(pc.take(new, pc.array_sort_indices(new)).to_pylist())
+                self._value_set = pa.array(self._keys, type=pa.int64())
+            value_set = self._value_set
+
+        # Position in the key list is id - 1, the underlying's null key finds none
+        ids = pc.fill_null(
+            pc.add(pc.index_in(keys, value_set=value_set), 1), UNDERLYING_CONTRACT_ID
+        )
+        table = table.drop_columns(list(CONTRACT_COLUMNS))
+        return table.add_column(0, "contract_id", pc.cast(ids, pa.int32()))
+
+    def table(self) -> pa.Table:
+        """The dimension, the underlying's row first."""
+        with self._lock:
+            keys = pa.array([None, *self._keys], type=pa.int64())
+        pair = pc.divide(keys, 2)
+        strike = pc.subtract(
+            pair, pc.multiply(pc.divide(pair, _STRIKE_RADIX), _STRIKE_RADIX)
+        )
+        expiration = pc.divide(pair, _STRIKE_RADIX).fill_null(0)
+        right = pc.if_else(pc.equal(pc.bit_wise_and(keys, 1), 1), "P", "C")
+        return pa.table(
+            [
+                pa.array(range(len(keys)), type=pa.int32()),
+                pa.repeat(pa.scalar(self.root, pa.string()), len(keys)),
+                pc.cast(expiration, pa.int32()),
+                strike,
+                right,
+            ],
+            schema=contract_dimension,
+        )
+
+    def save(self) -> bool:
+        """
+        Upload the dimension if contracts were added since it was last saved.
+
+        The upload only replaces the object this dimension last read or wrote. When the
+        object changed, the save is retried against it if it holds a prefix of the ids
+        assigned here, as after a lost response to an earlier save.
+
+        Returns:
+            Whether the dimension was uploaded
+
+        Raises:
+            ContractConflictError: If another writer assigned ids to the root meanwhile
+        """
+        if self.minio_client is None:
+            return False
+        with self._save_lock:
+            self._check_conflict()
+            with self._lock:
+                count = len(self._keys)
+                keys = self._keys[:count]
+            if count == self._saved:
+                return False
+            table = self.table().slice(0, count + 1)
+            buffer = io.BytesIO()
+            pq.write_table(table, buffer, compression="zstd")
+            data = buffer.getvalue()
+
+            while True:
+                try:
+                    self._etag = self._put(data, self._etag)
+                    break
+                except S3Error as e:
+                    if e.code != "PreconditionFailed":
+                        raise
+                lake_keys, lake_etag = self._read()
+                if keys[: len(lake_keys or [])] != (lake_keys or []):
+                    self._conflict = (
+                        f"Contract dimension {self.object_key} was changed by another "
+                        f"writer, ids of {self.root} assigned here are not valid"
+                    )
+                    raise ContractConflictError(self._conflict)
+                self._etag = lake_etag
+            self._saved = count
+        logger.info(f"Saved {count} contracts of {self.root} to {self.object_key}")
+        return True
+
+    def _put(self, data: bytes, etag: Optional[str]) -> str:
+        """Upload the dimension if the object still has etag, returning the new ETag."""
+        headers = {"Content-Type": "application/octet-stream"}
+        if etag is None:
+            headers["If-None-Match"] = "*"
+        else:
+            headers["If-Match"] = f'"{etag}"'
+        # put_object turns extra headers into user metadata, the conditional headers
+        # have to reach the PutObject request as they are
+        result = self.minio_client._put_object(
+            self.bucket, self.object_key, data, headers
+        )
+        return result.etag
+
+
+class ContractRegistry:
+    """ContractDimension per root, each read from the lake on first use."""
+
+    def __init__(
+        self,
+        minio_client: Optional[Minio],
+        bucket: Optional[str],
+        layout: Optional[str | LakeLayout] = None,
+    ) -> None:
+        """
+        Args:
+            minio_client: Client the dimensions are read and saved with
+            bucket: Bucket of the lake
+            layout: Key layout of the dimension objects, GeneralConfig.lake_layout when None
+        """
+        self.minio_client = minio_client
+        self.bucket = bucket
+        self.layout = convert_layout(layout)
+        self._dimensions: Dict[str, ContractDimension] = {}
+        self._lock = threading.Lock()
+
+    def get(self, root: str) -> ContractDimension:
+        with self._lock:
+            dimension = self._dimensions.get(root)
+            if dimension is None:
+                dimension = ContractDimension(
+                    root,
+                    self.minio_client,
+                    self.bucket,
+                    contract_key(root, self.layout),
+                ).load()
+                self._dimensions[root] = dimension
+            return dimension
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from collections import defaultdict
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
 
 @dataclass
@@ -18,6 +18,10 @@ class DateParts:
         """Return date in YYYY-MM-DD format"""
         return f"{self.year}-{self.month}-{self.day}"
 
+    def to_int(self) -> int:
+        """Return date as a YYYYMMDD integer"""
+        return int(str(self))
+
     @classmethod
     def from_datetime(cls, dt: datetime) -> "DateParts":
         """Create DateParts from datetime object"""
@@ -190,6 +194,21 @@ def is_market_day(date: datetime) -> bool:
     return date.date() not in [h.date() for h in holidays]
 
 
+def settled_date(settle_days: int, today: Optional[date] = None) -> int:
+    """
+    Latest date whose vendor data is taken as final.
+
+    Args:
+        settle_days: Calendar days the vendor may still publish or revise a day's data
+        today: Date to count back from, the local date when None
+
+    Returns:
+        YYYYMMDD integer of the date `settle_days` days before today
+    """
+    today = today or datetime.now().date()
+    return DateParts.from_datetime(today - timedelta(days=settle_days)).to_int()
+
+
 def interval_ms_to_string(interval_ms: int) -> str:
     """
     Convert interval in milliseconds to human-readable format.
@@ -5,3 +5,15 @@ class NoDataAvailableError(Exception):
     """Raised when ThetaData API returns no data for the specified timeframe."""
 
     pass
+
+
+class CacheMissError(Exception):
+    """Raised in replay mode when a response is not in the raw response cache."""
+
+    pass
+
+
+class ContractConflictError(Exception):
+    """Raised when another writer saved a root's contract dimension concurrently."""
+
+    pass
@@ -2,19 +2,101 @@
 Simple HTTP client for JSON and CSV responses.
 """
 
-from io import BytesIO
-from typing import Any, Dict, Optional
+from contextlib import asynccontextmanager, contextmanager
+from io import BytesIO, RawIOBase
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+import asyncio
+import json
 import logging
 import time
 
 import httpx
 
-from betedge_data.exceptions import NoDataAvailableError
+from betedge_data.cache import ResponseCache
+from betedge_data.exceptions import CacheMissError, NoDataAvailableError
 from betedge_data.job import HTTPJob, ReturnType
+from betedge_data.limiter import (
+    AdaptiveLimiter,
+    AsyncAdaptiveLimiter,
+    HostLimiters,
+    is_overload_status,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _raise_for_no_data(response: httpx.Response, url: str, duration_ms: float) -> None:
+    """Raise NoDataAvailableError for a ThetaData "No data" response (status 472)."""
+    if response.status_code == 472:
+        response_text = response.text
+        ":No data for the specified timeframe & contract."
+        if ":No data for the specified timeframe" in response_text:
+            logger.info(f"No data response from {url} ({duration_ms:.1f}ms)")
+            raise NoDataAvailableError(f"No data available: {response_text}")
+
+
+class ResponseStream(RawIOBase):
+    """
+    Read only file-like view over an iterator of response body chunks.
+
+    Lets pyarrow.csv.open_csv pull the body block by block while it downloads, so only
+    the chunks not yet consumed by the reader are held in memory.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._view = memoryview(b"")
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._view:
+            try:
+                self._view = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+
+        n = min(len(b), len(self._view))
+        b[:n] = self._view[:n]
+        self._view = self._view[n:]
+        self.bytes_read += n
+        return n
+
+
+def _fill_job(job: HTTPJob, body: bytes) -> None:
+    """Populate an HTTPJob from a raw response body."""
+    if job.return_type == ReturnType.CSV:
+        job.csv_buffer = BytesIO(body)
+    elif job.return_type == ReturnType.JSON:
+        try:
+            job.json = json.loads(body)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON response: {e}") from e
+
+
+def _cache_miss(cache: ResponseCache, url: str) -> None:
+    """Raise CacheMissError for a miss when the cache is in replay mode."""
+    if cache.replay:
+        raise CacheMissError(f"No cached response for {url}")
+
+
+def _check_stream_status(
+    response: httpx.Response, url: str, duration_ms: float
+) -> None:
+    """Raise for 472/HTTP errors on a streamed response, reading the body only on error."""
+    if response.is_error:
+        response.read()
+        _raise_for_no_data(response, url, duration_ms)
+        response.raise_for_status()
+
+
+def _stream_latency_ms(start_time: float, headers_ms: Optional[float]) -> float:
+    """Latency sample of a streamed request, its time to headers if they arrived."""
+    return headers_ms if headers_ms is not None else (time.time() - start_time) * 1000
+
+
 class HTTPClient:
     """
     Simple HTTP client for fetching JSON and CSV responses.
@@ -23,6 +105,8 @@ class HTTPClient:
     - JSON responses with optional Pydantic validation
     - CSV responses returned as StringIO for easy parsing
     - Raw responses for custom handling
+    - Optional adaptive per host concurrency limiting
+    - Optional on-disk cache of raw responses consulted by fetch
     """
 
     def __init__(
@@ -32,6 +116,8 @@ class HTTPClient:
         max_connections: int = 100,
         max_keepalive_connections: int = 50,
         http2: bool = True,
+        limiter: Optional[HostLimiters[AdaptiveLimiter]] = None,
+        cache: Optional[ResponseCache] = None,
     ):
         """
         Initialize the HTTP client.
@@ -42,7 +128,11 @@ class HTTPClient:
             max_connections: Maximum number of concurrent connections
             max_keepalive_connections: Maximum keepalive connections
             http2: Whether to use HTTP/2
+            limiter: Optional per host adaptive limiter gating in-flight requests
+            cache: Optional raw response cache consulted by fetch
         """
+        self.limiter = limiter
+        self.cache = cache
         self.client = httpx.Client(
             timeout=timeout,
             limits=httpx.Limits(
@@ -70,7 +160,9 @@ class HTTPClient:
         )
 
         try:
-            if job.return_type == ReturnType.CSV:
+            if self.cache is not None:
+                self._fetch_cached(job)
+            elif job.return_type == ReturnType.CSV:
                 job.csv_buffer = self.fetch_csv(job.url, job.headers)
             elif job.return_type == ReturnType.JSON:
                 job.json = self.fetch_json(job.url, job.headers)
@@ -93,6 +185,26 @@ class HTTPClient:
             )
             raise
 
+    def _fetch_cached(self, job: HTTPJob) -> None:
+        """
+        Fill a job from the response cache, fetching and caching the response on a miss.
+
+        Raises:
+            NoDataAvailableError: If the request returned, or is cached as, no data
+            CacheMissError: On a miss in replay mode
+        """
+        body = self.cache.get(job.url, job.headers)
+        if body is None:
+            _cache_miss(self.cache, job.url)
+            try:
+                response = self.fetch_raw(job.url, headers=job.headers)
+            except NoDataAvailableError:
+                self.cache.put_no_data(job.url, job.headers)
+                raise
+            body = response.content
+            self.cache.put(job.url, body, job.headers)
+        _fill_job(job, body)
+
     def fetch_json(
         self,
         url: str,
@@ -161,6 +273,79 @@ class HTTPClient:
         )
         return csv_buffer
 
+    @contextmanager
+    def open_csv_stream(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Iterator[ResponseStream]:
+        """
+        Stream CSV data from a URL as a file-like object.
+
+        The body is pulled from the connection as the caller reads it, so parsing can
+        overlap the download. The connection and the host's limiter slot are held until
+        the context exits, so the adaptive limit bounds body transfers too. The latency
+        the limiter samples is the time to the response headers, which parsing the
+        body as it arrives does not inflate.
+
+        Args:
+            url: The URL to fetch
+            headers: Optional headers to override defaults
+
+        Returns:
+            Context manager yielding a ResponseStream over the response body
+
+        Raises:
+            NoDataAvailableError: For ThetaData 472 responses
+            httpx.HTTPStatusError: For HTTP errors
+            httpx.RequestError: For connection/timeout errors
+        """
+        limiter = self.limiter.for_url(url) if self.limiter else None
+        if limiter:
+            limiter.acquire()
+        start_time = time.time()
+        headers_ms: Optional[float] = None
+        success = False
+        logger.debug(f"Starting streaming HTTP request to: {url}")
+
+        try:
+            with self.client.stream("GET", url, headers=headers) as response:
+                headers_ms = (time.time() - start_time) * 1000
+                success = not is_overload_status(response.status_code)
+                _check_stream_status(response, url, headers_ms)
+
+                stream = ResponseStream(response.iter_bytes())
+                yield stream
+
+                duration_ms = (time.time() - start_time) * 1000
+                logger.info(
+                    f"HTTP {response.status_code} {url} - {stream.bytes_read} bytes streamed in {duration_ms:.1f}ms"
+                )
+        except httpx.RequestError as e:
+            success = False
+            duration_ms = (time.time() - start_time) * 1000
+            logger.error(f"Request error for {url} after {duration_ms:.1f}ms: {e}")
+            raise
+        finally:
+            if limiter:
+                limiter.release(_stream_latency_ms(start_time, headers_ms), success)
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]]) -> httpx.Response:
+        """GET a URL, holding a slot of the host's adaptive limiter if one is configured."""
+        if self.limiter is None:
+            return self.client.get(url, headers=headers)
+
+        limiter = self.limiter.for_url(url)
+        limiter.acquire()
+        start_time = time.time()
+        success = False
+        try:
+            response = self.client.get(url, headers=headers)
+            success = not is_overload_status(response.status_code)
+            return response
+        finally:
+            limiter.release((time.time() - start_time) * 1000, success)
+
     def fetch_raw(
         self,
         url: str,
@@ -185,17 +370,10 @@ class HTTPClient:
         logger.debug(f"Starting HTTP request to: {url}")
 
         try:
-            response = self.client.get(url, headers=headers)
+            response = self._get(url, headers)
             duration_ms = (time.time() - start_time) * 1000
 
-            # Check for ThetaData "No data" response (status 472)
-            if response.status_code == 472:
-                response_text = response.text
-                ":No data for the specified timeframe & contract."
-                if ":No data for the specified timeframe" in response_text:
-                    logger.info(f"No data response from {url} ({duration_ms:.1f}ms)")
-                    raise NoDataAvailableError(f"No data available: {response_text}")
-
+            _raise_for_no_data(response, url, duration_ms)
             response.raise_for_status()
 
             # Log successful request with timing and response info
@@ -215,3 +393,297 @@ class HTTPClient:
             duration_ms = (time.time() - start_time) * 1000
             logger.error(f"Request error for {url} after {duration_ms:.1f}ms: {e}")
             raise
+
+
+class AsyncHTTPClient:
+    """
+    Asyncio counterpart of HTTPClient built on httpx.AsyncClient.
+
+    Exposes the same fetch/fetch_json/fetch_csv/fetch_raw surface as coroutines,
+    so thousands of requests can be kept in flight from a single event loop.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 120.0,
+        headers: Optional[Dict[str, str]] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 50,
+        http2: bool = True,
+        limiter: Optional[HostLimiters[AsyncAdaptiveLimiter]] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        """
+        Initialize the async HTTP client.
+
+        Args:
+            timeout: Request timeout in seconds
+            headers: Default headers to include in requests
+            max_connections: Maximum number of concurrent connections
+            max_keepalive_connections: Maximum keepalive connections
+            http2: Whether to use HTTP/2
+            limiter: Optional per host adaptive limiter gating in-flight requests
+            cache: Optional raw response cache consulted by fetch
+        """
+        self.limiter = limiter
+        self.cache = cache
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=0),
+            http2=http2,
+            headers=headers or {},
+        )
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self.client.aclose()
+
+    async def fetch(self, job: HTTPJob) -> Optional[HTTPJob]:
+        """
+        Fetch data for an HTTPJob.
+
+        Args:
+            job: HTTPJob containing URL, return type, and headers
+
+        Returns:
+            HTTPJob with populated data (csv_buffer or json)
+        """
+        start_time = time.time()
+        logger.debug(
+            f"Processing {job.return_type.value.upper()} job for URL: {job.url}"
+        )
+
+        try:
+            if self.cache is not None:
+                await self._fetch_cached(job)
+            elif job.return_type == ReturnType.CSV:
+                job.csv_buffer = await self.fetch_csv(job.url, job.headers)
+            elif job.return_type == ReturnType.JSON:
+                job.json = await self.fetch_json(job.url, job.headers)
+
+            duration_ms = (time.time() - start_time) * 1000
+            logger.debug(
+                f"Completed {job.return_type.value.upper()} job for {job.url} in {duration_ms:.1f}ms"
+            )
+
+            return job
+        except NoDataAvailableError as e:
+            logger.warning(
+                f"Failed {job.return_type.value.upper()} job for {job.url} due to no data available."
+            )
+            raise e
+        except Exception as e:
+            duration_ms = (time.time() - start_time) * 1000
+            logger.error(
+                f"Failed {job.return_type.value.upper()} job for {job.url} after {duration_ms:.1f}ms: {e}"
+            )
+            raise
+
+    async def _fetch_cached(self, job: HTTPJob) -> None:
+        """
+        Fill a job from the response cache, fetching and caching the response on a miss.
+        Cache file IO runs in a worker thread.
+
+        Raises:
+            NoDataAvailableError: If the request returned, or is cached as, no data
+            CacheMissError: On a miss in replay mode
+        """
+        body = await asyncio.to_thread(self.cache.get, job.url, job.headers)
+        if body is None:
+            _cache_miss(self.cache, job.url)
+            try:
+                response = await self.fetch_raw(job.url, headers=job.headers)
+            except NoDataAvailableError:
+                await asyncio.to_thread(self.cache.put_no_data, job.url, job.headers)
+                raise
+            body = response.content
+            await asyncio.to_thread(self.cache.put, job.url, body, job.headers)
+        _fill_job(job, body)
+
+    async def fetch_json(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fetch JSON data from a URL.
+
+        Args:
+            url: The URL to fetch, with parameters encoded.
+            headers: Optional headers to override defaults
+
+        Returns:
+            Parsed JSON dict
+
+        Raises:
+            httpx.HTTPStatusError: For HTTP errors
+            ValueError: If response is not valid JSON
+        """
+        response = await self.fetch_raw(url, headers=headers)
+
+        try:
+            return response.json()
+        except Exception as e:
+            logger.error(f"JSON parsing failed for {url}: {e}")
+            raise ValueError(f"Invalid JSON response: {e}") from e
+
+    async def fetch_csv(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> BytesIO:
+        """
+        Fetch CSV data from a URL and return as BytesIO.
+
+        Args:
+            url: The URL to fetch
+            headers: Optional headers to override defaults
+
+        Returns:
+            BytesIO object containing CSV data, ready for parsing
+
+        Raises:
+            httpx.HTTPStatusError: For HTTP errors
+        """
+        response = await self.fetch_raw(url, headers=headers)
+        return BytesIO(response.content)
+
+    @asynccontextmanager
+    async def open_csv_stream(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> AsyncIterator[ResponseStream]:
+        """
+        Stream CSV data from a URL as a blocking file-like object.
+
+        The yielded ResponseStream must be read from a worker thread (e.g. the executor
+        running the CSV parser), it pulls each chunk from this event loop on demand. The
+        host's limiter slot is held until the context exits and sampled with the time to
+        the response headers, as in HTTPClient.open_csv_stream.
+
+        Args:
+            url: The URL to fetch
+            headers: Optional headers to override defaults
+
+        Returns:
+            Async context manager yielding a ResponseStream over the response body
+
+        Raises:
+            NoDataAvailableError: For ThetaData 472 responses
+            httpx.HTTPStatusError: For HTTP errors
+            httpx.RequestError: For connection/timeout errors
+        """
+        limiter = self.limiter.for_url(url) if self.limiter else None
+        if limiter:
+            await limiter.acquire()
+        start_time = time.time()
+        headers_ms: Optional[float] = None
+        success = False
+        logger.debug(f"Starting streaming HTTP request to: {url}")
+
+        try:
+            async with self.client.stream("GET", url, headers=headers) as response:
+                headers_ms = (time.time() - start_time) * 1000
+                success = not is_overload_status(response.status_code)
+                if response.is_error:
+                    await response.aread()
+                _check_stream_status(response, url, headers_ms)
+
+                loop = asyncio.get_running_loop()
+                chunks = response.aiter_bytes()
+
+                async def next_chunk() -> bytes:
+                    return await chunks.__anext__()
+
+                def iter_chunks() -> Iterator[bytes]:
+                    while True:
+                        future = asyncio.run_coroutine_threadsafe(next_chunk(), loop)
+                        try:
+                            yield future.result()
+                        except StopAsyncIteration:
+                            return
+
+                stream = ResponseStream(iter_chunks())
+                yield stream
+
+                duration_ms = (time.time() - start_time) * 1000
+                logger.info(
+                    f"HTTP {response.status_code} {url} - {stream.bytes_read} bytes streamed in {duration_ms:.1f}ms"
+                )
+        except httpx.RequestError as e:
+            success = False
+            duration_ms = (time.time() - start_time) * 1000
+            logger.error(f"Request error for {url} after {duration_ms:.1f}ms: {e}")
+            raise
+        finally:
+            if limiter:
+                await limiter.release(
+                    _stream_latency_ms(start_time, headers_ms), success
+                )
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]]) -> httpx.Response:
+        """GET a URL, holding a slot of the host's adaptive limiter if one is configured."""
+        if self.limiter is None:
+            return await self.client.get(url, headers=headers)
+
+        limiter = self.limiter.for_url(url)
+        await limiter.acquire()
+        start_time = time.time()
+        success = False
+        try:
+            response = await self.client.get(url, headers=headers)
+            success = not is_overload_status(response.status_code)
+            return response
+        finally:
+            await limiter.release((time.time() - start_time) * 1000, success)
+
+    async def fetch_raw(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        """
+        Fetch raw response from a URL.
+
+        Args:
+            url: The URL to fetch
+            headers: Optional headers to override defaults
+
+        Returns:
+            Raw httpx Response object
+
+        Raises:
+            httpx.HTTPStatusError: For HTTP errors
+            httpx.RequestError: For connection/timeout errors
+        """
+        start_time = time.time()
+        logger.debug(f"Starting HTTP request to: {url}")
+
+        try:
+            response = await self._get(url, headers)
+            duration_ms = (time.time() - start_time) * 1000
+
+            _raise_for_no_data(response, url, duration_ms)
+            response.raise_for_status()
+
+            content_length = len(response.content)
+            logger.info(
+                f"HTTP {response.status_code} {url} - {content_length} bytes in {duration_ms:.1f}ms"
+            )
+
+            return response
+        except httpx.HTTPStatusError as e:
+            duration_ms = (time.time() - start_time) * 1000
+            logger.error(
+                f"HTTP error {e.response.status_code} for {url} after {duration_ms:.1f}ms: {e.response.text}"
+            )
+            raise
+        except httpx.RequestError as e:
+            duration_ms = (time.time() - start_time) * 1000
+            logger.error(f"Request error for {url} after {duration_ms:.1f}ms: {e}")
+            raise
@@ -1,10 +1,19 @@
+import os
+import tempfile
 import threading
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, IO, Set
 from io import BytesIO
 from enum import Enum
+from uuid import UUID
 
 import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from betedge_data.contracts import ContractDimension
+from betedge_data.manifest import table_dates
+from betedge_data.metrics import MetricsSummary
+from betedge_data.profiles import WriteProfile
 
 
 class ReturnType(Enum):
@@ -20,27 +29,233 @@ class Schema(Enum):
     EARNINGS = "earnings"
 
 
+@dataclass(slots=True)
+class RequestSummary:
+    """
+    Per request outcome of a request_data/request_many run. Updated by the pipeline stages
+    as the files belonging to the request are fetched and written.
+    """
+
+    request_id: UUID
+    request_type: str
+    files_total: int = 0
+    files_skipped: int = 0
+    files_written: int = 0
+    # Days of incremental requests already present in existing files
+    days_skipped: int = 0
+    http_jobs: int = 0
+    no_data: int = 0
+    bytes_written: int = 0
+    # Silver objects of the request's option files, see LakeWriter
+    silver_written: int = 0
+    silver_failed: int = 0
+    # Metrics of the pipeline run the request was part of
+    metrics: Optional[MetricsSummary] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_no_data(self) -> None:
+        with self._lock:
+            self.no_data += 1
+
+    def record_write(self, size: int) -> None:
+        with self._lock:
+            self.files_written += 1
+            self.bytes_written += size
+
+    def record_silver(self, written: bool) -> None:
+        with self._lock:
+            if written:
+                self.silver_written += 1
+            else:
+                self.silver_failed += 1
+
+
 @dataclass(slots=True)
 class FileWriteJob:
     """
     The FileWriteJob represents a request for a new file coming from the client, as the name implies.
     It contains a object_key to ultimate use when writing and a BytesIO wrapped parquet file.
+
+    An item's table may arrive in parts, one per block of a streamed response, the last
+    one completing the item.
+
+    With spill enabled the tables are not accumulated in memory. Each one is appended as
+    record batches to an uncompressed Arrow IPC spill file in item order as soon as
+    every earlier item has completed, so the parts of the earliest incomplete item go
+    straight to the file, and the file is finalised when the last item lands. The writer
+    then reads the file back through a memory map with spilled_tables and encodes those
+    tables the same way as in memory ones, so both produce the same parquet layout.
     """
 
     object_key: str
     total_items: int
+    # Describes the object for the lake manifest
+    schema: Optional[Schema] = None
+    root: Optional[str] = None
+    granularity: Optional[str] = None
+    interval: Optional[str] = None
+    # Parquet encoding of the object, the writer's profile for the schema when None
+    write_profile: Optional[WriteProfile] = None
+    # Encodes the contract columns of option tables as contract_id when set
+    contracts: Optional[ContractDimension] = None
+    # Key of the silver object materialised from this option file, or from the option
+    # file this object is the underlying companion of
+    silver_key: Optional[str] = None
+    # Key of the companion object holding the underlying rows of a split option file
+    underlying_key: Optional[str] = None
+    # YYYYMMDD date each item fetches, lets the manifest record days without data
+    item_dates: Optional[List[int]] = None
     completed_items: int = 0
     completed: bool = False
     tables: List[pa.table] = field(default_factory=list)
     byte_wrapper: Optional[BytesIO] = None
+    summary: Optional[RequestSummary] = None
+    # Merge the tables into the existing object instead of replacing it
+    merge_existing: bool = False
+    spill: bool = False
+    spill_dir: Optional[str] = None
+    spill_path: Optional[str] = None
+    spilled_rows: int = 0
+    spilled_dates: Set[int] = field(default_factory=set)
+    # Parts not yet spilled and completed items not yet passed, by item index
+    _pending: Dict[int, List[pa.Table]] = field(default_factory=dict)
+    _finished: Set[int] = field(default_factory=set)
+    _next_index: int = 0
+    _spill_writer: Optional[ipc.RecordBatchFileWriter] = None
+    _spill_schema: Optional[pa.Schema] = None
+    _skipped: Set[int] = field(default_factory=set)
+    _claimed: bool = False
     _lock: threading.Lock = field(default_factory=threading.Lock)
 
-    def add_table(self, table: pa.table) -> None:
+    @property
+    def has_data(self) -> bool:
+        """Whether any item returned rows to write."""
+        return bool(self.tables) or self.spill_path is not None
+
+    @property
+    def no_data_dates(self) -> Set[int]:
+        """Dates of item_dates for which every item returned no data."""
+        if self.item_dates is None:
+            return set()
         with self._lock:
-            self.tables.append(table)
-            self.completed_items += 1
-            if self.completed_items == self.total_items:
-                self.completed = True
+            skipped = set(self._skipped)
+        fetched = {d for i, d in enumerate(self.item_dates) if i not in skipped}
+        return {self.item_dates[i] for i in skipped} - fetched
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Bytes of the tables held in memory, spilled tables are not counted."""
+        return sum(table.nbytes for table in self.tables)
+
+    def add_table(
+        self, table: pa.table, index: Optional[int] = None, *, last: bool = True
+    ) -> None:
+        """
+        Args:
+            table: Parsed result of one item, or the next part of it
+            index: Position of the item in the file, orders the spilled row groups.
+                Required for parts.
+            last: Whether the table completes the item, False for all but the last part
+        """
+        with self._lock:
+            if self.spill:
+                index = self.completed_items if index is None else index
+                self._pending.setdefault(index, []).append(table)
+                if last:
+                    self._finished.add(index)
+                self._spill_in_order()
+            else:
+                self.tables.append(table)
+            if last:
+                self._complete_item()
+
+    def skip_item(self, index: Optional[int] = None) -> None:
+        """Count an item that returned no data so the job can still complete."""
+        with self._lock:
+            if index is not None:
+                self._skipped.add(index)
+            if self.spill:
+                self._finished.add(self.completed_items if index is None else index)
+                self._spill_in_order()
+            self._complete_item()
+        if self.summary:
+            self.summary.record_no_data()
+
+    def spilled_tables(self) -> List[pa.Table]:
+        """
+        The tables of the finalised spill file, memory mapped rather than read, one per
+        record batch.
+        """
+        if self.spill_path is None:
+            return []
+        reader = ipc.open_file(pa.memory_map(self.spill_path))
+        return [
+            pa.Table.from_batches([reader.get_batch(i)])
+            for i in range(reader.num_record_batches)
+        ]
+
+    def detach_spill(self) -> Optional[str]:
+        """Hand over the finalised spill file, which discard then leaves in place."""
+        with self._lock:
+            path, self.spill_path = self.spill_path, None
+            return path
+
+    def discard(self) -> None:
+        """Close and delete the spill file, if any."""
+        with self._lock:
+            if self._spill_writer is not None:
+                self._spill_writer.close()
+                self._spill_writer = None
+            if self.spill_path is not None and os.path.exists(self.spill_path):
+                os.remove(self.spill_path)
+
+    def _complete_item(self) -> None:
+        self.completed_items += 1
+        if self.completed_items == self.total_items:
+            for index in sorted(self._pending):
+                for table in self._pending.pop(index):
+                    self._spill_table(table)
+            self._finished.clear()
+            if self._spill_writer is not None:
+                self._spill_writer.close()
+                self._spill_writer = None
+            self.completed = True
+
+    def _spill_in_order(self) -> None:
+        while True:
+            for table in self._pending.pop(self._next_index, []):
+                self._spill_table(table)
+            if self._next_index not in self._finished:
+                return
+            self._finished.remove(self._next_index)
+            self._next_index += 1
+
+    def _spill_table(self, table: pa.Table) -> None:
+        if self._spill_writer is None:
+            fd, self.spill_path = tempfile.mkstemp(
+                prefix="betedge-", suffix=".arrow", dir=self.spill_dir
+            )
+            os.close(fd)
+            self._spill_schema = table.schema
+            self._spill_writer = ipc.new_file(self.spill_path, table.schema)
+        elif not table.schema.equals(self._spill_schema):
+            table = table.cast(self._spill_schema)
+
+        # Sorted and grouped into row groups by the writer, across the whole file
+        self._spill_writer.write_table(table)
+        self.spilled_rows += table.num_rows
+        self.spilled_dates.update(table_dates(table))
+
+    def claim(self) -> bool:
+        """
+        Return True exactly once after the job completes, so that only one of the
+        threads racing to finish the job hands it to the writer.
+        """
+        with self._lock:
+            if not self.completed or self._claimed:
+                return False
+            self._claimed = True
+            return True
 
 
 @dataclass(slots=True)
@@ -52,6 +267,17 @@ class HTTPJob:
     return_type: ReturnType
     file_write_job: FileWriteJob
     headers: Optional[Dict[str, str]] = None
-    # Variables to hold the response
-    csv_buffer: Optional[BytesIO] = None
+    # Position of this job's result within its file
+    item_index: int = 0
+    # Variables to hold the response, csv_buffer may be a streamed response body
+    csv_buffer: Optional[BytesIO | IO[bytes]] = None
     json: Optional[Dict[str, Any] | Any] = None
+    # Rows the response parsed into
+    rows: int = 0
+
+    @property
+    def response_bytes(self) -> int:
+        """Size of the CSV response body received so far, 0 for JSON responses."""
+        if isinstance(self.csv_buffer, BytesIO):
+            return self.csv_buffer.getbuffer().nbytes
+        return getattr(self.csv_buffer, "bytes_read", 0)
@@ -0,0 +1,264 @@
+"""
+In memory index of the objects in the MinIO lake.
+"""
+
+import io
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pyarrow.parquet as pq
+from minio import Minio
+
+from betedge_data.manifest import table_dates
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ObjectInfo:
+    """Listing metadata of a single lake object."""
+
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+
+
+def common_prefix(keys: Iterable[str]) -> str:
+    """Longest common directory prefix of a set of object keys, ending in '/'."""
+    prefix = os.path.commonprefix(list(keys))
+    return prefix[: prefix.rfind("/") + 1]
+
+
+class ObjectReader(io.RawIOBase):
+    """
+    Seekable read only file over a MinIO object, each read is a ranged GET.
+
+    Lets pyarrow read a parquet footer and selected column chunks without downloading
+    the whole object.
+    """
+
+    def __init__(self, minio_client: Minio, bucket: str, key: str, size: int) -> None:
+        super().__init__()
+        self.minio_client = minio_client
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self.size - self._pos)
+        if length <= 0:
+            return 0
+        response = self.minio_client.get_object(
+            self.bucket, self.key, offset=self._pos, length=length
+        )
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+def read_object_dates(
+    minio_client: Minio, bucket: str, key: str, size: int
+) -> List[int]:
+    """
+    Sorted YYYYMMDD dates held by a parquet object, from its date column alone read
+    with ranged requests.
+    """
+    parquet_file = pq.ParquetFile(ObjectReader(minio_client, bucket, key, size))
+    if parquet_file.schema_arrow.get_field_index("date") < 0:
+        return []
+    return table_dates(parquet_file.read(columns=["date"]))
+
+
+class LakeIndex:
+    """
+    Answers object existence from memory instead of one stat_object round trip per key.
+
+    Each prefix is listed with a single recursive list_objects call into a listing of
+    its own. Listings are reused for `ttl` seconds and kept current with record_write for
+    objects written by this process, so only writes from other processes need the ttl to
+    expire. Writes and deletes recorded while a listing of their prefix is in flight
+    take precedence over it.
+    """
+
+    def __init__(self, minio_client: Minio, bucket: str, ttl: float = 300) -> None:
+        """
+        Args:
+            minio_client: Client used for listings
+            bucket: Bucket to index
+            ttl: Seconds a listed prefix is reused by later load calls, 0 relists on every load
+        """
+        self.minio_client = minio_client
+        self.bucket = bucket
+        self.ttl = ttl
+        # Objects of each listed prefix, and when it was listed
+        self._listings: Dict[str, Dict[str, ObjectInfo]] = {}
+        self._loaded: Dict[str, float] = {}
+        # Prefixes being listed, with the number of listings of each in flight
+        self._in_flight: Dict[str, int] = {}
+        # Objects written or deleted (None) by this process while a listing covering
+        # them is in flight, with the monotonic time of the change
+        self._changes: Dict[str, Tuple[float, Optional[ObjectInfo]]] = {}
+        self._lock = threading.Lock()
+
+    def _covering_prefix(self, key: str) -> Optional[str]:
+        # The longest one, a prefix relisted under an older listing holds the newer view
+        covering = [prefix for prefix in self._loaded if key.startswith(prefix)]
+        return max(covering, key=len) if covering else None
+
+    def _is_fresh(self, prefix: str, now: float) -> bool:
+        loaded_at = self._loaded.get(prefix)
+        return loaded_at is not None and now - loaded_at < self.ttl
+
+    def _listing_in_flight(self, key: str) -> bool:
+        return any(key.startswith(prefix) for prefix in self._in_flight)
+
+    def load(self, prefix: str, refresh: bool = False) -> None:
+        """
+        List every object under a prefix into the index.
+
+        Args:
+            prefix: Key prefix to list
+            refresh: Relist even if a listing within the ttl exists
+        """
+        with self._lock:
+            now = time.monotonic()
+            covering = self._covering_prefix(prefix)
+            if not refresh and covering and self._is_fresh(covering, now):
+                return
+            self._in_flight[prefix] = self._in_flight.get(prefix, 0) + 1
+
+        start_time = time.time()
+        listed_at = time.monotonic()
+        try:
+            objects = {
+                obj.object_name: ObjectInfo(
+                    size=obj.size, etag=obj.etag, last_modified=obj.last_modified
+                )
+                for obj in self.minio_client.list_objects(
+                    self.bucket, prefix=prefix, recursive=True
+                )
+                if not obj.is_dir
+            }
+        except BaseException:
+            with self._lock:
+                self._end_listing(prefix)
+            raise
+
+        # Ended under the same lock the listing is installed with, so no change slips
+        # between the two unrecorded
+        with self._lock:
+            self._end_listing(prefix)
+            self._drop(prefix)
+            for key in [k for k in self._changes if k.startswith(prefix)]:
+                changed_at, info = self._changes[key]
+                if changed_at >= listed_at:
+                    # Not necessarily reflected by the listing
+                    if info is None:
+                        objects.pop(key, None)
+                    else:
+                        objects[key] = info
+                if not self._listing_in_flight(key):
+                    del self._changes[key]
+            self._listings[prefix] = objects
+            self._loaded[prefix] = time.monotonic()
+
+        duration_ms = (time.time() - start_time) * 1000
+        logger.info(
+            f"Indexed {len(objects)} objects under '{prefix}' in {duration_ms:.1f}ms"
+        )
+
+    def _end_listing(self, prefix: str) -> None:
+        self._in_flight[prefix] -= 1
+        if not self._in_flight[prefix]:
+            del self._in_flight[prefix]
+
+    def load_for_keys(self, keys: Iterable[str], refresh: bool = False) -> None:
+        """Load the common prefix of a set of keys, typically the key map of one request."""
+        keys = list(keys)
+        if keys:
+            self.load(common_prefix(keys), refresh=refresh)
+
+    def get(self, key: str) -> Optional[ObjectInfo]:
+        """
+        Return the listing metadata of an object, or None if it does not exist.
+
+        Keys outside every loaded prefix trigger a listing of their own directory.
+        """
+        with self._lock:
+            if (covering := self._covering_prefix(key)) is not None:
+                return self._listings[covering].get(key)
+
+        self.load(key[: key.rfind("/") + 1])
+        with self._lock:
+            covering = self._covering_prefix(key)
+            return self._listings[covering].get(key) if covering is not None else None
+
+    def exists(self, key: str) -> bool:
+        """Whether an object exists in the lake."""
+        return self.get(key) is not None
+
+    def record_write(self, key: str, size: int, etag: Optional[str] = None) -> None:
+        """Add an object written by this process to the index."""
+        self._record_change(key, ObjectInfo(size=size, etag=etag))
+
+    def record_delete(self, key: str) -> None:
+        """Remove an object deleted by this process from the index."""
+        self._record_change(key, None)
+
+    def _record_change(self, key: str, info: Optional[ObjectInfo]) -> None:
+        with self._lock:
+            for prefix, objects in self._listings.items():
+                if key.startswith(prefix):
+                    if info is None:
+                        objects.pop(key, None)
+                    else:
+                        objects[key] = info
+            # Only a listing already in flight can miss the change, later ones see it
+            if self._listing_in_flight(key):
+                self._changes[key] = (time.monotonic(), info)
+            else:
+                self._changes.pop(key, None)
+
+    def invalidate(self, prefix: str = "") -> None:
+        """
+        Forget the listings under a prefix and the listings covering it, or all listings,
+        so the prefix is relisted on next use.
+        """
+        with self._lock:
+            self._drop(prefix)
+            for loaded in [p for p in self._loaded if prefix.startswith(p)]:
+                del self._loaded[loaded]
+                del self._listings[loaded]
+
+    def _drop(self, prefix: str) -> None:
+        for loaded in [p for p in self._loaded if p.startswith(prefix)]:
+            del self._loaded[loaded]
+            del self._listings[loaded]
@@ -0,0 +1,192 @@
+"""
+Adaptive (AIMD) concurrency limiting for outgoing HTTP requests.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, Generic, Optional, TypeVar
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class _AIMD:
+    """
+    Additive increase / multiplicative decrease of an in-flight request limit.
+
+    The limit grows by roughly one per round trip while requests succeed with healthy
+    latency, and is multiplied by `backoff` when a request fails or latency climbs.
+    Latency counts as unhealthy when it exceeds `latency_target_ms`, if set, or when the
+    short term latency average exceeds `latency_tolerance` times the long term average.
+    Not thread safe on its own, subclasses guard it with their lock.
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        initial_limit: Optional[int] = None,
+        latency_tolerance: float = 2.0,
+        latency_target_ms: Optional[float] = None,
+        backoff: float = 0.7,
+    ) -> None:
+        """
+        Args:
+            min_limit: Lowest limit the controller backs off to
+            max_limit: Highest limit the controller grows to
+            initial_limit: Starting limit, defaults to min_limit
+            latency_tolerance: Ratio of short to long term latency treated as overload
+            latency_target_ms: Optional absolute latency above which the limit backs off
+            backoff: Factor applied to the limit on overload
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= max_limit.")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.latency_target_ms = latency_target_ms
+        self.backoff = backoff
+
+        self._limit = float(min(max(initial_limit or min_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._short_latency_ms: Optional[float] = None
+        self._long_latency_ms: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently in flight."""
+        return self._in_flight
+
+    def _on_sample(self, latency_ms: float, success: bool) -> None:
+        if self._short_latency_ms is None or self._long_latency_ms is None:
+            self._short_latency_ms = self._long_latency_ms = latency_ms
+        else:
+            self._short_latency_ms += 0.2 * (latency_ms - self._short_latency_ms)
+            self._long_latency_ms += 0.02 * (latency_ms - self._long_latency_ms)
+
+        overloaded = not success
+        if self.latency_target_ms is not None:
+            overloaded |= latency_ms > self.latency_target_ms
+        overloaded |= (
+            self._short_latency_ms > self.latency_tolerance * self._long_latency_ms
+        )
+
+        now = time.monotonic()
+        if overloaded:
+            # Requests issued before the last decrease report late, back off once per round trip
+            if (now - self._last_decrease) * 1000 < self._long_latency_ms:
+                return
+            self._last_decrease = now
+            new_limit = max(self.min_limit, self._limit * self.backoff)
+            if int(new_limit) != int(self._limit):
+                logger.info(
+                    f"Reducing concurrency limit {int(self._limit)} -> {int(new_limit)} "
+                    f"(success={success}, latency={latency_ms:.1f}ms)"
+                )
+            self._limit = new_limit
+        elif self._in_flight + 1 >= int(self._limit):
+            # Only grow while the current limit is actually being used
+            new_limit = min(self.max_limit, self._limit + 1 / self._limit)
+            if int(new_limit) != int(self._limit):
+                logger.debug(
+                    f"Raising concurrency limit {int(self._limit)} -> {int(new_limit)}"
+                )
+            self._limit = new_limit
+
+
+class AdaptiveLimiter(_AIMD):
+    """Blocking AIMD limiter for use from worker threads."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency_ms: float, success: bool) -> None:
+        """
+        Record the outcome of a request acquired with acquire().
+
+        Args:
+            latency_ms: Observed request latency
+            success: False for failures that indicate overload (timeouts, 5xx, 429)
+        """
+        with self._cond:
+            self._in_flight -= 1
+            self._on_sample(latency_ms, success)
+            self._cond.notify_all()
+
+
+class AsyncAdaptiveLimiter(_AIMD):
+    """AIMD limiter for coroutines running on a single event loop."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+
+    async def release(self, latency_ms: float, success: bool) -> None:
+        """
+        Record the outcome of a request acquired with acquire().
+
+        Args:
+            latency_ms: Observed request latency
+            success: False for failures that indicate overload (timeouts, 5xx, 429)
+        """
+        async with self._cond:
+            self._in_flight -= 1
+            self._on_sample(latency_ms, success)
+            self._cond.notify_all()
+
+
+L = TypeVar("L", AdaptiveLimiter, AsyncAdaptiveLimiter)
+
+
+class HostLimiters(Generic[L]):
+    """Keeps one adaptive limiter per host, created on first use."""
+
+    def __init__(self, factory: Callable[[], L]) -> None:
+        """
+        Args:
+            factory: Creates the limiter for a newly seen host
+        """
+        self._factory = factory
+        self._limiters: Dict[str, L] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> L:
+        """Return the limiter of the host the URL points to."""
+        host = urlparse(url).netloc
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = self._factory()
+            return limiter
+
+    def current_limits(self) -> Dict[str, int]:
+        """Current in-flight limit per host."""
+        with self._lock:
+            return {host: limiter.limit for host, limiter in self._limiters.items()}
+
+
+def is_overload_status(status_code: int) -> bool:
+    """Whether an HTTP status signals that the server is overloaded."""
+    return status_code == 429 or status_code >= 500
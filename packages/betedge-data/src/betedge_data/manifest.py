@@ -0,0 +1,268 @@
+"""
+Persistent manifest of the objects written to the lake.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Set
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS objects (
+    object_key TEXT PRIMARY KEY,
+    root TEXT,
+    schema TEXT,
+    granularity TEXT,
+    interval TEXT,
+    start_date INTEGER,
+    end_date INTEGER,
+    row_count INTEGER NOT NULL,
+    byte_size INTEGER NOT NULL,
+    written_at REAL NOT NULL,
+    dates TEXT NOT NULL
+)
+"""
+
+_CREATE_INDEX = """
+CREATE INDEX IF NOT EXISTS objects_lookup
+ON objects (root, schema, interval, start_date, end_date)
+"""
+
+# Dates whose requests returned no data, recorded so incremental runs treat them as
+# covered instead of refetching them
+_CREATE_NO_DATA = """
+CREATE TABLE IF NOT EXISTS no_data (
+    object_key TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    PRIMARY KEY (object_key, date)
+)
+"""
+
+_COLUMNS = (
+    "object_key, root, schema, granularity, interval, start_date, end_date, "
+    "row_count, byte_size, written_at, dates"
+)
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    """Metadata recorded for one lake object."""
+
+    object_key: str
+    root: Optional[str]
+    schema: Optional[str]
+    granularity: Optional[str]
+    interval: Optional[str]
+    start_date: Optional[int]
+    end_date: Optional[int]
+    row_count: int
+    byte_size: int
+    written_at: float = field(default_factory=time.time)
+    dates: List[int] = field(default_factory=list)
+
+
+def table_dates(table: pa.Table) -> List[int]:
+    """
+    Sorted distinct trading dates in a table's `date` column as YYYYMMDD integers.
+
+    Theta tables carry int dates, earnings tables ISO date strings.
+    """
+    if "date" not in table.column_names or table.num_rows == 0:
+        return []
+
+    dates = pc.unique(table["date"]).drop_null()
+    if pa.types.is_string(dates.type):
+        dates = pc.cast(pc.replace_substring(dates, "-", ""), pa.int32())
+    return sorted(dates.to_pylist())
+
+
+class LakeManifest:
+    """
+    SQLite manifest with one row per lake object, updated by the writer on every upload.
+
+    Answers coverage questions such as "what SPY 1m option quotes do we have for 2023"
+    without listing or opening objects.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Location of the SQLite database, created if missing
+        """
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(_CREATE_TABLE)
+            self._conn.execute(_CREATE_INDEX)
+            self._conn.execute(_CREATE_NO_DATA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record(self, entry: ManifestEntry) -> None:
+        """Insert or replace the entry of an object."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO objects ({_COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.object_key,
+                    entry.root,
+                    entry.schema,
+                    entry.granularity,
+                    entry.interval,
+                    entry.start_date,
+                    entry.end_date,
+                    entry.row_count,
+                    entry.byte_size,
+                    entry.written_at,
+                    json.dumps(entry.dates),
+                ),
+            )
+        logger.debug(f"Recorded manifest entry for {entry.object_key}")
+
+    def remove(self, object_key: str) -> None:
+        """Drop the entry of an object and its no-data dates."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM objects WHERE object_key = ?", (object_key,)
+            )
+            self._conn.execute(
+                "DELETE FROM no_data WHERE object_key = ?", (object_key,)
+            )
+
+    def record_no_data(
+        self, object_key: str, dates: Iterable[int], *, replace: bool = False
+    ) -> None:
+        """
+        Record dates an object was requested for that returned no data.
+
+        Args:
+            object_key: Object the dates were requested for
+            dates: YYYYMMDD dates without data
+            replace: Drop the dates recorded for the object before, as when it is rewritten
+        """
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute(
+                    "DELETE FROM no_data WHERE object_key = ?", (object_key,)
+                )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO no_data (object_key, date) VALUES (?, ?)",
+                [(object_key, d) for d in dates],
+            )
+
+    def no_data_dates(self, object_key: str) -> List[int]:
+        """Sorted dates recorded as returning no data for an object."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date FROM no_data WHERE object_key = ? ORDER BY date",
+                (object_key,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def recorded(self, object_keys: Iterable[str]) -> Set[str]:
+        """The keys among object_keys that have an entry."""
+        keys = list(object_keys)
+        found = set()
+        with self._lock:
+            # Batched below SQLite's limit on query parameters
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                rows = self._conn.execute(
+                    "SELECT object_key FROM objects WHERE object_key IN "
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def get(self, object_key: str) -> Optional[ManifestEntry]:
+        """Entry of a single object, or None if it is not in the manifest."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM objects WHERE object_key = ?", (object_key,)
+            ).fetchone()
+        return self._to_entry(row) if row else None
+
+    def query(
+        self,
+        *,
+        root: Optional[str] = None,
+        schema: Optional[str] = None,
+        granularity: Optional[str] = None,
+        interval: Optional[str] = None,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None,
+    ) -> List[ManifestEntry]:
+        """
+        Entries matching every given filter, ordered by start date.
+
+        Args:
+            root: Underlying symbol
+            schema: Schema value, e.g. 'option_quote'
+            granularity: File granularity value, e.g. 'monthly'
+            interval: Interval label, e.g. '1m'
+            start_date: Only objects covering dates on or after this YYYYMMDD date
+            end_date: Only objects covering dates on or before this YYYYMMDD date
+
+        Returns:
+            Matching manifest entries
+        """
+        clauses, params = [], []
+        for column, value in (
+            ("root", root),
+            ("schema", schema),
+            ("granularity", granularity),
+            ("interval", interval),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start_date is not None:
+            clauses.append("end_date >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            clauses.append("start_date <= ?")
+            params.append(end_date)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM objects {where} ORDER BY start_date", params
+            ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def coverage(self, **filters) -> List[int]:
+        """Sorted distinct dates held by the objects matching query(**filters)."""
+        start_date = filters.get("start_date")
+        end_date = filters.get("end_date")
+        dates = {
+            d
+            for entry in self.query(**filters)
+            for d in entry.dates
+            if (start_date is None or d >= start_date)
+            and (end_date is None or d <= end_date)
+        }
+        return sorted(dates)
+
+    @staticmethod
+    def _to_entry(row: tuple) -> ManifestEntry:
+        *values, dates = row
+        return ManifestEntry(*values, dates=json.loads(dates))
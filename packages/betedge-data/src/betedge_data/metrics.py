@@ -0,0 +1,349 @@
+"""
+Metrics of the ingestion pipeline: stage throughput and latency, queue depths and
+in-flight requests, exportable as Prometheus text or a JSON snapshot.
+"""
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds of the stage latency histogram buckets
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Cumulative bucket histogram in the Prometheus style. Not thread safe on its own."""
+
+    buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    count: int = 0
+    sum: float = 0.0
+
+    def __post_init__(self) -> None:
+        # One count per bucket plus the +Inf overflow bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        """Observation count at or below each bucket bound, ending with +Inf."""
+        total, out = 0, []
+        for count in self.counts:
+            total += count
+            out.append(total)
+        return out
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating linearly within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+@dataclass(slots=True)
+class StageStats:
+    """
+    Work done by one pipeline stage, e.g. fetch, process or write.
+
+    Busy time is summed over all workers of the stage, so utilisation close to 1 means
+    every worker was busy for the whole run and the stage is the bottleneck.
+    """
+
+    name: str
+    workers: int = 1
+    items: int = 0
+    bytes: int = 0
+    rows: int = 0
+    busy_seconds: float = 0.0
+    first_start: Optional[float] = None
+    last_end: Optional[float] = None
+    latency: Histogram = field(default_factory=Histogram)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, started: float, nbytes: int = 0, rows: int = 0) -> None:
+        """
+        Record one finished item.
+
+        Args:
+            started: time.perf_counter() value taken when the item started
+            nbytes: Bytes the item moved through the stage
+            rows: Rows the item produced
+        """
+        ended = time.perf_counter()
+        with self._lock:
+            self.items += 1
+            self.bytes += nbytes
+            self.rows += rows
+            self.busy_seconds += ended - started
+            self.latency.observe(ended - started)
+            if self.first_start is None or started < self.first_start:
+                self.first_start = started
+            if self.last_end is None or ended > self.last_end:
+                self.last_end = ended
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.wall_seconds if self.wall_seconds else 0.0
+
+    @property
+    def utilisation(self) -> float:
+        """Busy time as a fraction of the time all workers were available."""
+        if not self.wall_seconds:
+            return 0.0
+        return self.busy_seconds / (self.wall_seconds * max(self.workers, 1))
+
+    def describe(self) -> str:
+        return (
+            f"{self.name}: {self.items} items in {self.wall_seconds:.2f}s "
+            f"({self.items_per_second:.1f}/s, {self.bytes_per_second / 1e6:.2f} MB/s, "
+            f"p50 {self.latency.quantile(0.5) * 1000:.1f}ms, "
+            f"p95 {self.latency.quantile(0.95) * 1000:.1f}ms), "
+            f"{self.workers} workers {self.utilisation:.0%} busy"
+        )
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "items": self.items,
+                "bytes": self.bytes,
+                "rows": self.rows,
+                "workers": self.workers,
+                "wall_seconds": round(self.wall_seconds, 6),
+                "items_per_second": round(self.items_per_second, 3),
+                "mb_per_second": round(self.bytes_per_second / 1e6, 3),
+                "p50_ms": round(self.latency.quantile(0.5) * 1000, 3),
+                "p95_ms": round(self.latency.quantile(0.95) * 1000, 3),
+                "p99_ms": round(self.latency.quantile(0.99) * 1000, 3),
+                "utilisation": round(self.utilisation, 4),
+            }
+
+
+@dataclass(slots=True)
+class MetricsSummary:
+    """Compact outcome of a pipeline run, attached to every RequestSummary of the run."""
+
+    wall_seconds: float
+    bytes_downloaded: int
+    bytes_uploaded: int
+    rows_parsed: int
+    no_data: int
+    peak_in_flight: int
+    peak_queue_depths: Dict[str, int]
+    stages: Dict[str, Dict[str, float]]
+    bottleneck: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class PipelineMetrics:
+    """
+    Metrics of one client run, updated by the HTTP, processing and writer stages.
+
+    Stage names are fetch, process and write. Queue depths are read through callbacks
+    registered with watch_queue and sampled whenever a stage records an item, so the
+    peak depth of every queue is known after the run.
+    """
+
+    def __init__(self, workers: Dict[str, int]) -> None:
+        """
+        Args:
+            workers: Worker count of each stage, keyed by stage name in pipeline order
+        """
+        self.stages: Dict[str, StageStats] = {
+            name: StageStats(name, workers=count) for name, count in workers.items()
+        }
+        self.started = time.perf_counter()
+        self.no_data = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._queues: Dict[str, Callable[[], int]] = {}
+        self._peak_depths: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> StageStats:
+        return self.stages[name]
+
+    def __iter__(self) -> Iterator[StageStats]:
+        return iter(self.stages.values())
+
+    def watch_queue(self, name: str, depth: Callable[[], int]) -> None:
+        """Track the depth of a queue, e.g. watch_queue('http_job', queue.qsize)."""
+        with self._lock:
+            self._queues[name] = depth
+            self._peak_depths.setdefault(name, 0)
+
+    def record(
+        self, stage: str, started: float, nbytes: int = 0, rows: int = 0
+    ) -> None:
+        """Record one finished item of a stage, see StageStats.record."""
+        self.stages[stage].record(started, nbytes, rows)
+        self._sample_queues()
+
+    def record_no_data(self) -> None:
+        with self._lock:
+            self.no_data += 1
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Count an HTTP request as in flight for the duration of the block."""
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Current depth of every watched queue."""
+        with self._lock:
+            queues = dict(self._queues)
+        return {name: depth() for name, depth in queues.items()}
+
+    def _sample_queues(self) -> None:
+        depths = self.queue_depths()
+        with self._lock:
+            for name, depth in depths.items():
+                if depth > self._peak_depths.get(name, 0):
+                    self._peak_depths[name] = depth
+
+    def bottleneck(self) -> Optional[StageStats]:
+        """The stage whose workers were busiest, None before any work was recorded."""
+        active = [stage for stage in self.stages.values() if stage.items]
+        return max(active, key=lambda stage: stage.utilisation, default=None)
+
+    def report(self) -> List[str]:
+        """One line per stage that recorded work."""
+        return [stage.describe() for stage in self.stages.values() if stage.items]
+
+    def summary(self) -> MetricsSummary:
+        bottleneck = self.bottleneck()
+        with self._lock:
+            peak_depths = dict(self._peak_depths)
+        return MetricsSummary(
+            wall_seconds=round(time.perf_counter() - self.started, 6),
+            bytes_downloaded=self.stages["fetch"].bytes,
+            bytes_uploaded=self.stages["write"].bytes,
+            rows_parsed=sum(stage.rows for stage in self.stages.values()),
+            no_data=self.no_data,
+            peak_in_flight=self.peak_in_flight,
+            peak_queue_depths=peak_depths,
+            stages={name: stage.summary() for name, stage in self.stages.items()},
+            bottleneck=bottleneck.name if bottleneck else None,
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state of every metric as JSON serialisable data."""
+        data = self.summary().to_dict()
+        data["in_flight"] = self.in_flight
+        data["queue_depths"] = self.queue_depths()
+        for name, stage in self.stages.items():
+            with stage._lock:
+                bounds = [str(b) for b in stage.latency.buckets] + ["+Inf"]
+                data["stages"][name]["latency_buckets"] = dict(
+                    zip(bounds, stage.latency.cumulative())
+                )
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self, prefix: str = "betedge") -> str:
+        """Every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str) -> str:
+            full = f"{prefix}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        for attr, name, help_text in (
+            ("items", "stage_items_total", "Items completed per pipeline stage."),
+            ("bytes", "stage_bytes_total", "Bytes moved per pipeline stage."),
+            ("rows", "stage_rows_total", "Rows produced per pipeline stage."),
+            (
+                "busy_seconds",
+                "stage_busy_seconds_total",
+                "Worker time spent per pipeline stage.",
+            ),
+        ):
+            full = metric(name, "counter", help_text)
+            for stage in self.stages.values():
+                lines.append(f'{full}{{stage="{stage.name}"}} {getattr(stage, attr)}')
+
+        full = metric(
+            "stage_latency_seconds", "histogram", "Latency of one item per stage."
+        )
+        for stage in self.stages.values():
+            with stage._lock:
+                bounds = [str(b) for b in stage.latency.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, stage.latency.cumulative()):
+                    lines.append(
+                        f'{full}_bucket{{stage="{stage.name}",le="{bound}"}} {count}'
+                    )
+                lines.append(f'{full}_sum{{stage="{stage.name}"}} {stage.latency.sum}')
+                lines.append(
+                    f'{full}_count{{stage="{stage.name}"}} {stage.latency.count}'
+                )
+
+        full = metric("queue_depth", "gauge", "Items waiting in a pipeline queue.")
+        for name, depth in self.queue_depths().items():
+            lines.append(f'{full}{{queue="{name}"}} {depth}')
+        full = metric(
+            "queue_peak_depth", "gauge", "Highest sampled depth of a pipeline queue."
+        )
+        with self._lock:
+            peak_depths = dict(self._peak_depths)
+        for name, depth in peak_depths.items():
+            lines.append(f'{full}{{queue="{name}"}} {depth}')
+
+        full = metric("in_flight_requests", "gauge", "HTTP requests in flight.")
+        lines.append(f"{full} {self.in_flight}")
+        full = metric(
+            "no_data_total", "counter", "Requests answered with no data (472)."
+        )
+        lines.append(f"{full} {self.no_data}")
+        return "\n".join(lines) + "\n"
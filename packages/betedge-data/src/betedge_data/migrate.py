@@ -0,0 +1,168 @@
+"""
+Migration of lake objects from the legacy key layout to the hive layout.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Iterable, List, Optional, Tuple
+
+from minio import Minio
+from minio.commonconfig import CopySource
+from minio.error import S3Error
+
+from betedge_data.client.requests import LakeLayout, to_hive_key
+from betedge_data.contracts import CONTRACTS_BASE_KEY, contract_key
+from betedge_data.manifest import LakeManifest
+from betedge_data.silver import ENRICHED_PREFIX, SILVER_PREFIX
+
+logger = logging.getLogger(__name__)
+
+LAKE_PREFIXES = (
+    "historical-stock/",
+    "historical-options/",
+    "earnings/",
+    f"{CONTRACTS_BASE_KEY}/",
+    SILVER_PREFIX,
+    ENRICHED_PREFIX,
+)
+
+
+def _contracts_hive_key(key: str) -> Optional[str]:
+    """Hive key of a legacy contract dimension key such as 'contracts/SPY/data.parquet'."""
+    parts = key.split("/")
+    if (
+        len(parts) == 3
+        and parts[0] == CONTRACTS_BASE_KEY
+        and parts[2] == "data.parquet"
+        and not parts[1].startswith("root=")
+    ):
+        return contract_key(parts[1], LakeLayout.HIVE)
+    return None
+
+
+@dataclass(slots=True)
+class MigrationSummary:
+    """Outcome of a migrate_to_hive run."""
+
+    copied: int = 0
+    # Hive objects that already existed with the legacy object's size
+    already_migrated: int = 0
+    deleted: int = 0
+    failed: int = 0
+    bytes_copied: int = 0
+
+
+def plan_hive_migration(
+    minio_client: Minio, bucket: str, prefixes: Iterable[str] = LAKE_PREFIXES
+) -> List[Tuple[str, str, int]]:
+    """
+    List the legacy objects under the prefixes with their hive keys.
+
+    Returns:
+        (legacy key, hive key, size) per legacy object, objects already in the hive
+        layout or not recognised as lake objects are left out
+    """
+    plan = []
+    for prefix in prefixes:
+        for obj in minio_client.list_objects(bucket, prefix=prefix, recursive=True):
+            if obj.is_dir:
+                continue
+            hive_key = to_hive_key(obj.object_name) or _contracts_hive_key(
+                obj.object_name
+            )
+            if hive_key is not None:
+                plan.append((obj.object_name, hive_key, obj.size))
+    return plan
+
+
+def migrate_to_hive(
+    minio_client: Minio,
+    bucket: str,
+    prefixes: Iterable[str] = LAKE_PREFIXES,
+    delete_source: bool = False,
+    dry_run: bool = False,
+    manifest: Optional[LakeManifest] = None,
+    workers: int = 8,
+) -> MigrationSummary:
+    """
+    Copy every legacy layout object to its hive layout key with server side copies.
+
+    Objects whose hive copy already exists with the same size are not copied again, so
+    an interrupted migration can simply be rerun. Legacy objects are only deleted after
+    their copy is verified.
+
+    Args:
+        minio_client: Client of the lake
+        bucket: Bucket of the lake
+        prefixes: Key prefixes to migrate
+        delete_source: Delete each legacy object once its copy is verified
+        dry_run: Only log the planned copies
+        manifest: LakeManifest whose entries and no-data dates move to the hive keys
+        workers: Concurrent copies
+
+    Returns:
+        MigrationSummary of the run
+    """
+    plan = plan_hive_migration(minio_client, bucket, prefixes)
+    summary = MigrationSummary()
+    logger.info(f"Found {len(plan)} legacy objects to migrate in bucket {bucket}")
+    if dry_run:
+        for legacy_key, hive_key, size in plan:
+            logger.info(f"Would copy {legacy_key} -> {hive_key} ({size} bytes)")
+        return summary
+
+    def migrate_one(item: Tuple[str, str, int]) -> Tuple[str, int]:
+        legacy_key, hive_key, size = item
+        try:
+            existing = minio_client.stat_object(bucket, hive_key).size
+        except S3Error as e:
+            if e.code != "NoSuchKey":
+                raise
+            existing = None
+
+        outcome = "already_migrated"
+        if existing != size:
+            minio_client.copy_object(bucket, hive_key, CopySource(bucket, legacy_key))
+            copied_size = minio_client.stat_object(bucket, hive_key).size
+            if copied_size != size:
+                raise RuntimeError(
+                    f"Copy of {legacy_key} has {copied_size} bytes, expected {size}"
+                )
+            outcome = "copied"
+
+        if manifest is not None:
+            entry = manifest.get(legacy_key)
+            if entry is not None:
+                manifest.record(replace(entry, object_key=hive_key))
+            # The days without data move too, or incremental runs refetch them
+            manifest.record_no_data(hive_key, manifest.no_data_dates(legacy_key))
+            if delete_source:
+                manifest.remove(legacy_key)
+        if delete_source:
+            minio_client.remove_object(bucket, legacy_key)
+        return outcome, size
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(migrate_one, item): item for item in plan}
+        for future, (legacy_key, hive_key, _) in futures.items():
+            try:
+                outcome, size = future.result()
+            except Exception as e:
+                summary.failed += 1
+                logger.error(f"Failed to migrate {legacy_key} -> {hive_key}: {e}")
+                continue
+            if outcome == "copied":
+                summary.copied += 1
+                summary.bytes_copied += size
+            else:
+                summary.already_migrated += 1
+            if delete_source:
+                summary.deleted += 1
+
+    logger.info(
+        f"Migrated {summary.copied} objects ({summary.bytes_copied} bytes), "
+        f"{summary.already_migrated} already migrated, {summary.deleted} deleted, "
+        f"{summary.failed} failed"
+    )
+    return summary
@@ -1,5 +1,6 @@
 import logging
 import time
+from typing import Iterator
 import pyarrow as pa
 
 from betedge_data.processing.alt.earnings import process_earnings
@@ -14,6 +15,9 @@ def process_http_result(http_result: HTTPJob) -> FileWriteJob:
     """
     Process HTTP result and route to appropriate processor based on schema.
 
+    The tables of a streamed response are handed to the FileWriteJob block by block as
+    they are parsed, the last one completing the item.
+
     Args:
         http_result: HTTPJob containing the response data and schema info
 
@@ -21,31 +25,41 @@ def process_http_result(http_result: HTTPJob) -> FileWriteJob:
         FileWriteJob with processed table added
     """
     start_time = time.time()
-    table = pa.table({})
+    fwj = http_result.file_write_job
+    tables: Iterator[pa.Table] = iter([pa.table({})])
 
     if http_result.schema in [Schema.OPTION_QUOTE, Schema.OPTION_EOD]:
         logger.debug(
             f"Routing to option processor for schema: {http_result.schema.value}"
         )
-        table = process_option(http_result)
+        tables = process_option(http_result)
+        if fwj.contracts is not None:
+            tables = map(fwj.contracts.encode, tables)
     elif http_result.schema in [Schema.STOCK_EOD, Schema.STOCK_QUOTE]:
         logger.debug(
             f"Routing to stock processor for schema: {http_result.schema.value}"
         )
-        table = process_stock(http_result)
+        tables = process_stock(http_result)
     elif http_result.schema == Schema.EARNINGS:
         logger.debug(
             f"Routing to earnings processor for schema: {http_result.schema.value}"
         )
-        table = process_earnings(http_result)
+        tables = iter([process_earnings(http_result)])
+
+    # Each table is added once the next one is parsed, so the last can complete the item
+    row_count = 0
+    table = next(tables)
+    for following in tables:
+        fwj.add_table(table, http_result.item_index, last=False)
+        row_count += len(table)
+        table = following
+    fwj.add_table(table, http_result.item_index)
+    row_count += len(table)
 
     duration_ms = (time.time() - start_time) * 1000
-    row_count = len(table)
+    http_result.rows = row_count
     logger.info(
         f"Processed {http_result.schema.value} data: {row_count} rows in {duration_ms:.1f}ms"
     )
 
-    fwj = http_result.file_write_job
-    fwj.add_table(table)
-
     return fwj
@@ -1,10 +1,12 @@
 import logging
 import time
+from typing import Iterator, Optional
 import pyarrow as pa
 import pyarrow.csv as pv
 
 from urllib.parse import urlparse, parse_qs
 from betedge_data.job import HTTPJob, Schema
+from betedge_data.processing.theta.reader import iter_csv
 from betedge_data.processing.theta.schemas import (
     stock_quote,
     option_quote,
@@ -26,18 +28,19 @@ def _get_schema_map(schema: Schema) -> pa.schema:
         )
 
 
-def process_option(http_result: HTTPJob) -> pa.Table:
+def process_option(http_result: HTTPJob) -> Iterator[pa.Table]:
     """
-    Process option data from HTTP result.
+    Process option data from HTTP result, a table per block of a streamed response.
 
     Args:
         http_result: HTTPJob containing CSV buffer and schema info
 
     Returns:
-        PyArrow table with processed option data
+        Iterator over PyArrow tables with processed option data
     """
     start_time = time.time()
     params = parse_qs(urlparse(http_result.url).query)
+    root = None
 
     if "stock" in http_result.url:
         logger.debug("Processing stock data within option request")
@@ -52,39 +55,32 @@ def process_option(http_result: HTTPJob) -> pa.Table:
         else:
             convert_options = pv.ConvertOptions()
 
-        parse_start = time.time()
-        table = pv.read_csv(http_result.csv_buffer, convert_options=convert_options)
-        parse_duration_ms = (time.time() - parse_start) * 1000
-
         root = params.get("root")
         if root:
             root = root[0]
-
-        # Add contract columns
-        num_rows = len(table)
-
-        table = (
-            table.add_column(0, "right", pa.array(pa.nulls(num_rows), type=pa.string()))
-            .add_column(0, "strike", pa.array(pa.nulls(num_rows), type=pa.int64()))
-            .add_column(0, "expiration", pa.array([0] * num_rows, type=pa.int32()))
-            .add_column(0, "root", pa.array([root] * num_rows, type=pa.string()))
-        )
-
-        logger.debug(f"Stock data CSV parsed in {parse_duration_ms:.1f}ms")
     else:
         logger.debug("Processing option data")
         convert_options = pv.ConvertOptions(
             column_types={field.name: field.type for field in option_quote}
         )
 
-        parse_start = time.time()
-        table = pv.read_csv(http_result.csv_buffer, convert_options=convert_options)
-        parse_duration_ms = (time.time() - parse_start) * 1000
-
-        logger.debug(f"Option data CSV parsed in {parse_duration_ms:.1f}ms")
+    row_count = 0
+    for table in iter_csv(http_result.csv_buffer, convert_options):
+        if "stock" in http_result.url:
+            table = _add_contract_columns(table, root)
+        row_count += len(table)
+        yield table
 
     duration_ms = (time.time() - start_time) * 1000
-    row_count = len(table)
     logger.info(f"Option processing completed: {row_count} rows in {duration_ms:.1f}ms")
 
-    return table
+
+def _add_contract_columns(table: pa.Table, root: Optional[str]) -> pa.Table:
+    """Give the underlying's rows of an option request null contract columns."""
+    num_rows = len(table)
+    return (
+        table.add_column(0, "right", pa.nulls(num_rows, type=pa.string()))
+        .add_column(0, "strike", pa.nulls(num_rows, type=pa.int64()))
+        .add_column(0, "expiration", pa.repeat(pa.scalar(0, pa.int32()), num_rows))
+        .add_column(0, "root", pa.repeat(pa.scalar(root, pa.string()), num_rows))
+    )
@@ -0,0 +1,43 @@
+from io import BytesIO
+from typing import IO, Iterator
+
+import pyarrow as pa
+import pyarrow.csv as pv
+
+# Bytes of CSV the streaming reader parses at a time, bounds the raw data held in memory
+CSV_BLOCK_SIZE = 1 << 20
+
+
+def iter_csv(
+    source: IO[bytes], convert_options: pv.ConvertOptions
+) -> Iterator[pa.Table]:
+    """
+    Parse a CSV response into PyArrow tables.
+
+    In memory buffers are parsed with the multithreaded reader into a single table. Any
+    other file-like source, such as a streamed HTTP response, is read incrementally with
+    open_csv and yields a table per block as soon as it is parsed, so parsing overlaps
+    the download and no table of the whole response is built.
+
+    Args:
+        source: BytesIO or readable binary stream with the CSV body
+        convert_options: Column type conversions to apply
+
+    Returns:
+        Iterator over the parsed tables, at least one even for an empty body
+    """
+    if isinstance(source, BytesIO):
+        yield pv.read_csv(source, convert_options=convert_options)
+        return
+
+    reader = pv.open_csv(
+        source,
+        read_options=pv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=convert_options,
+    )
+    empty = True
+    for batch in reader:
+        empty = False
+        yield pa.Table.from_batches([batch])
+    if empty:
+        yield reader.schema.empty_table()
@@ -45,3 +45,6 @@ stock_quote = pa.schema(quote)
 stock_eod = pa.schema(eod)
 option_quote = pa.schema(contract + quote)
 option_eod = pa.schema(contract + eod)
+
+# Dimension table mapping the contract_id of encoded option files to the contract columns
+contract_dimension = pa.schema([pa.field("contract_id", pa.int32())] + contract)
@@ -1,34 +1,37 @@
 import logging
 import time
+from typing import Iterator
 import pyarrow as pa
 import pyarrow.csv as pv
 
-from betedge_data.job import HTTPJob
-from betedge_data.processing.theta.schemas import stock_quote
+from betedge_data.job import HTTPJob, Schema
+from betedge_data.processing.theta.reader import iter_csv
+from betedge_data.processing.theta.schemas import stock_quote, stock_eod
 
 logger = logging.getLogger(__name__)
 
 
-def process_stock(http_result: HTTPJob) -> pa.Table:
+def process_stock(http_result: HTTPJob) -> Iterator[pa.Table]:
     """
-    Process stock data from HTTP result.
+    Process stock data from HTTP result, a table per block of a streamed response.
 
     Args:
         http_result: HTTPJob containing CSV buffer with stock data
 
     Returns:
-        PyArrow table with processed stock data
+        Iterator over PyArrow tables with processed stock data
     """
     start_time = time.time()
 
-    parse_start = time.time()
-    table = pv.read_csv(http_result.csv_buffer, schema=stock_quote)
-    parse_duration_ms = (time.time() - parse_start) * 1000
+    schema = stock_eod if http_result.schema == Schema.STOCK_EOD else stock_quote
+    convert_options = pv.ConvertOptions(
+        column_types={field.name: field.type for field in schema}
+    )
 
-    duration_ms = (time.time() - start_time) * 1000
-    row_count = len(table)
+    row_count = 0
+    for table in iter_csv(http_result.csv_buffer, convert_options):
+        row_count += len(table)
+        yield table
 
-    logger.debug(f"Stock CSV parsed in {parse_duration_ms:.1f}ms")
+    duration_ms = (time.time() - start_time) * 1000
     logger.info(f"Stock processing completed: {row_count} rows in {duration_ms:.1f}ms")
-
-    return table
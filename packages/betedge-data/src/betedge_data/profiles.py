@@ -0,0 +1,170 @@
+"""
+Parquet encoding profiles, one per Schema of the lake.
+
+A WriteProfile decides how the objects of a schema are encoded: codec and level, row
+group size, which columns are dictionary encoded, the order rows are sorted in, and
+whether a page index and bloom filters are written. Option files dominate storage and
+scan time, so their profile trades some encoding time for size and predicate pruning.
+"""
+
+import inspect
+import logging
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Older pyarrow releases cannot write bloom filters
+SUPPORTS_BLOOM_FILTERS = (
+    "bloom_filter_options" in inspect.signature(pq.ParquetWriter.__init__).parameters
+)
+
+
+@dataclass(frozen=True, slots=True)
+class WriteProfile:
+    """
+    How parquet objects of one schema are encoded.
+
+    Columns named by a profile that a table does not have are ignored, so the stock rows
+    of an option file or an older file layout are written with the same profile.
+    """
+
+    compression: str = "zstd"
+    compression_level: Optional[int] = None
+    # Maximum rows per row group, the writer's default when None
+    row_group_size: Optional[int] = None
+    # Columns to dictionary encode, every column when None
+    dictionary_columns: Optional[Tuple[str, ...]] = None
+    # Ascending sort keys, rows are sorted on write and the order recorded in the metadata
+    sort_by: Tuple[str, ...] = ()
+    write_page_index: bool = False
+    bloom_filter_columns: Tuple[str, ...] = ()
+    bloom_filter_fpp: float = 0.05
+    # Expected distinct values per row group, bounded by the rows written when known
+    bloom_filter_ndv: Optional[int] = None
+
+    def sort_keys(self, schema: pa.Schema) -> List[str]:
+        return [name for name in self.sort_by if name in schema.names]
+
+    def writer_kwargs(
+        self, schema: pa.Schema, num_rows: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Keyword arguments for pq.ParquetWriter writing tables of the given schema.
+
+        Args:
+            schema: Schema of the tables to be written
+            num_rows: Expected rows per row group, bounds the bloom filter size when given
+        """
+        kwargs: Dict[str, Any] = {
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "write_page_index": self.write_page_index,
+        }
+        if self.dictionary_columns is not None:
+            kwargs["use_dictionary"] = [
+                name for name in self.dictionary_columns if name in schema.names
+            ]
+
+        keys = self.sort_keys(schema)
+        if keys:
+            kwargs["sorting_columns"] = [
+                pq.SortingColumn(schema.get_field_index(name), nulls_first=False)
+                for name in keys
+            ]
+
+        bloom_columns = [
+            name for name in self.bloom_filter_columns if name in schema.names
+        ]
+        if bloom_columns and SUPPORTS_BLOOM_FILTERS:
+            options: Dict[str, Any] = {"fpp": self.bloom_filter_fpp}
+            ndv = [n for n in (self.bloom_filter_ndv, num_rows) if n]
+            if ndv:
+                options["ndv"] = min(ndv)
+            kwargs["bloom_filter_options"] = {
+                name: dict(options) for name in bloom_columns
+            }
+        elif bloom_columns:
+            logger.debug(
+                f"pyarrow {pa.__version__} cannot write bloom filters, skipping {bloom_columns}"
+            )
+        return kwargs
+
+
+DEFAULT_WRITE_PROFILE = WriteProfile(compression="zstd", sort_by=("date", "ms_of_day"))
+
+# Keyed by Schema value
+DEFAULT_WRITE_PROFILES: Dict[str, WriteProfile] = {
+    # Files are already split by month, so rows are sorted contract major and row groups
+    # kept small: each row group then covers a narrow band of expirations and strikes and
+    # scans filtering on them skip the rest by row group statistics. Contract columns are
+    # dictionary encoded, the quote columns of one contract's series compress well plain.
+    # Files written with contract ids sort and filter on contract_id instead.
+    "option_quote": WriteProfile(
+        compression="zstd",
+        compression_level=6,
+        row_group_size=128 * 1024,
+        dictionary_columns=("contract_id", "root", "right", "expiration", "strike"),
+        sort_by=("contract_id", "expiration", "strike", "right", "date", "ms_of_day"),
+        write_page_index=True,
+        bloom_filter_columns=("contract_id", "strike", "expiration"),
+        bloom_filter_ndv=16 * 1024,
+    ),
+    "option_eod": WriteProfile(
+        compression="zstd",
+        compression_level=6,
+        row_group_size=128 * 1024,
+        dictionary_columns=("contract_id", "root", "right", "expiration", "strike"),
+        sort_by=("contract_id", "expiration", "strike", "right", "date"),
+        write_page_index=True,
+        bloom_filter_columns=("contract_id", "strike", "expiration"),
+        bloom_filter_ndv=16 * 1024,
+    ),
+    "stock_quote": WriteProfile(
+        compression="zstd", compression_level=3, sort_by=("date", "ms_of_day")
+    ),
+    "stock_eod": WriteProfile(
+        compression="zstd", compression_level=3, sort_by=("date",)
+    ),
+    "earnings": WriteProfile(compression="zstd", compression_level=3),
+}
+
+
+def resolve_write_profiles(
+    overrides: Optional[Mapping[str, Mapping[str, Any]]] = None,
+) -> Dict[str, WriteProfile]:
+    """
+    Default profiles with per schema field overrides applied.
+
+    Args:
+        overrides: WriteProfile fields keyed by Schema value, e.g.
+            {"option_quote": {"compression_level": 9}}
+
+    Returns:
+        WriteProfile per Schema value
+
+    Raises:
+        ValueError: If an override names an unknown field
+    """
+    profiles = dict(DEFAULT_WRITE_PROFILES)
+    valid = {f.name for f in fields(WriteProfile)}
+    for schema, values in (overrides or {}).items():
+        unknown = set(values) - valid
+        if unknown:
+            raise ValueError(
+                f"Unknown WriteProfile fields for '{schema}': {sorted(unknown)}"
+            )
+        values = {
+            name: tuple(value) if isinstance(value, list) else value
+            for name, value in values.items()
+        }
+        # A level only makes sense for the codec it was chosen for
+        if "compression" in values:
+            values.setdefault("compression_level", None)
+        profiles[schema] = replace(
+            profiles.get(schema, DEFAULT_WRITE_PROFILE), **values
+        )
+    return profiles
@@ -0,0 +1,141 @@
+"""
+Queues bounded by item count and by the bytes their items hold.
+"""
+
+import asyncio
+import time
+from collections import deque
+from queue import Full, Queue
+from typing import Any, Callable, Optional
+
+
+class BoundedQueue(Queue):
+    """
+    queue.Queue that blocks producers on a byte budget as well as on maxsize.
+
+    Each item is weighed with `sizeof` when it is put. A put blocks while the queue holds
+    `maxsize` items or at least `max_bytes` bytes. An item is always admitted into an
+    empty queue, so a single item larger than the budget cannot deadlock the pipeline.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        max_bytes: int = 0,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        """
+        Args:
+            maxsize: Maximum number of items, 0 for no limit
+            max_bytes: Maximum bytes held by queued items, 0 for no limit
+            sizeof: Returns the bytes an item holds, every item weighs 0 when None
+        """
+        super().__init__(maxsize)
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda item: 0)
+        self.bytes = 0
+
+    def _init(self, maxsize: int) -> None:
+        # Items are stored with the size they were admitted with
+        self.queue = deque()
+
+    def _put(self, item: Any) -> None:
+        size = self.sizeof(item)
+        self.queue.append((item, size))
+        self.bytes += size
+
+    def _get(self) -> Any:
+        item, size = self.queue.popleft()
+        self.bytes -= size
+        return item
+
+    def _is_full(self) -> bool:
+        if 0 < self.maxsize <= self._qsize():
+            return True
+        return 0 < self.max_bytes <= self.bytes and self._qsize() > 0
+
+    def full(self) -> bool:
+        with self.mutex:
+            return self._is_full()
+
+    def put(
+        self, item: Any, block: bool = True, timeout: Optional[float] = None
+    ) -> None:
+        with self.not_full:
+            if not block:
+                if self._is_full():
+                    raise Full
+            elif timeout is None:
+                while self._is_full():
+                    self.not_full.wait()
+            elif timeout < 0:
+                raise ValueError("'timeout' must be a non-negative number")
+            else:
+                deadline = time.monotonic() + timeout
+                while self._is_full():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0.0:
+                        raise Full
+                    self.not_full.wait(remaining)
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        item = super().get(block, timeout)
+        # Freed bytes may make room for several blocked producers
+        with self.not_full:
+            self.not_full.notify_all()
+        return item
+
+
+class AsyncBoundedQueue(asyncio.Queue):
+    """
+    asyncio.Queue with the byte budget of BoundedQueue.
+
+    A put waits while the queue holds `maxsize` items or at least `max_bytes` bytes, and
+    an item is always admitted into an empty queue.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        max_bytes: int = 0,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        """
+        Args:
+            maxsize: Maximum number of items, 0 for no limit
+            max_bytes: Maximum bytes held by queued items, 0 for no limit
+            sizeof: Returns the bytes an item holds, every item weighs 0 when None
+        """
+        super().__init__(maxsize)
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda item: 0)
+        self.bytes = 0
+
+    def _init(self, maxsize: int) -> None:
+        # Items are stored with the size they were admitted with
+        self._queue = deque()
+
+    def _put(self, item: Any) -> None:
+        size = self.sizeof(item)
+        self._queue.append((item, size))
+        self.bytes += size
+
+    def _get(self) -> Any:
+        item, size = self._queue.popleft()
+        self.bytes -= size
+        return item
+
+    def full(self) -> bool:
+        if super().full():
+            return True
+        return 0 < self.max_bytes <= self.bytes and not self.empty()
+
+    def get_nowait(self) -> Any:
+        item = super().get_nowait()
+        # Freed bytes may make room for several waiting producers, each rechecks full()
+        while self._putters:
+            self._wakeup_next(self._putters)
+        return item
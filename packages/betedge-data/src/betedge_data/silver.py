@@ -0,0 +1,128 @@
+"""
+Silver layer of the option lake: option rows with their underlying's quote attached and
+the derived columns analyses compute on every read.
+
+A silver object mirrors the key of the bronze option file it is built from under
+SILVER_PREFIX, e.g. 'silver/historical-options/quote/monthly/1h/SPY/2024/03/data.parquet',
+so both key layouts carry over. The materialisation runner of betedge-processing, which
+adds forwards, implied volatility and greeks, writes its partitions under ENRICHED_PREFIX
+instead, so ingest and runner output never overwrite each other or mix schemas under
+one prefix.
+"""
+
+from typing import List, Optional, Tuple
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+
+SILVER_PREFIX = "silver/"
+ENRICHED_PREFIX = "silver-enriched/"
+
+# Rows of an option table that hold the underlying rather than a contract
+UNDERLYING_EXPIRATION = 0
+
+
+def silver_key(object_key: str) -> str:
+    """Key of the silver object built from a bronze option object."""
+    return f"{SILVER_PREFIX}{object_key}"
+
+
+def enriched_key(object_key: str) -> str:
+    """Key of the materialised silver partition built from a bronze option object."""
+    return f"{ENRICHED_PREFIX}{object_key}"
+
+
+def calc_mid_and_spread(df: pl.LazyFrame) -> pl.LazyFrame:
+    df = df.filter((pl.col("bid_size") > 0) & (pl.col("ask_size") > 0)).with_columns(
+        [
+            ((pl.col("bid") + pl.col("ask")) / 2).alias("mid"),
+            (pl.col("bid") - pl.col("ask")).abs().alias("spread"),
+        ]
+    )
+
+    return df
+
+
+def calc_dte(df: pl.LazyFrame) -> pl.LazyFrame:
+    return df.with_columns(
+        [
+            (
+                pl.col("expiration").cast(pl.Utf8).str.strptime(pl.Date, "%Y%m%d")
+                - pl.col("date").cast(pl.Utf8).str.strptime(pl.Date, "%Y%m%d")
+            )
+            .dt.total_days()
+            .alias("days_between")
+        ]
+    )
+
+
+def underlying_column(names: List[str]) -> str:
+    """Column whose value 0 marks the underlying rows of a combined option file."""
+    # Contract id 0 is the underlying in files encoded with contract ids
+    return "contract_id" if "contract_id" in names else "expiration"
+
+
+def split_underlying(table: pa.Table) -> Tuple[pa.Table, pa.Table]:
+    """
+    Separate the option rows of a combined option table from its underlying rows.
+
+    Returns:
+        (option rows, underlying rows)
+    """
+    column = underlying_column(table.column_names)
+    is_underlying = pc.fill_null(pc.equal(table[column], UNDERLYING_EXPIRATION), False)
+    return table.filter(pc.invert(is_underlying)), table.filter(is_underlying)
+
+
+def silver_frame(
+    options: pl.LazyFrame,
+    underlying: pl.LazyFrame,
+    contracts: Optional[pl.LazyFrame] = None,
+) -> pl.LazyFrame:
+    """
+    Attach the underlying's bid, ask and mid to each option row at the same time, then
+    add calc_mid_and_spread and calc_dte outputs.
+
+    Pairs rows as join_stock does, so option rows without an underlying quote at their
+    time are left out, as are the one sided quotes calc_mid_and_spread drops.
+
+    Args:
+        options: Option rows
+        underlying: Stock rows of the same period
+        contracts: Contract dimension restoring the contract columns of options encoded
+            with contract ids
+
+    Returns:
+        Silver rows of the options
+    """
+    names = options.collect_schema().names()
+    if "contract_id" in names and contracts is not None:
+        if "root" in names:
+            # A hive scan already has the root partition column
+            contracts = contracts.drop("root")
+        options = options.join(contracts, on="contract_id", how="left")
+
+    stock = underlying.select(
+        "ms_of_day",
+        "date",
+        pl.col("bid").alias("underlying_bid"),
+        pl.col("ask").alias("underlying_ask"),
+        ((pl.col("bid") + pl.col("ask")) / 2).alias("underlying_mid"),
+    )
+    return calc_dte(calc_mid_and_spread(options.join(stock, on=["ms_of_day", "date"])))
+
+
+def build_silver(
+    options: pa.Table, underlying: pa.Table, contracts: Optional[pa.Table] = None
+) -> pa.Table:
+    """Eager silver_frame over the tables of one bronze object."""
+    return (
+        silver_frame(
+            pl.from_arrow(options).lazy(),
+            pl.from_arrow(underlying).lazy(),
+            pl.from_arrow(contracts).lazy() if contracts is not None else None,
+        )
+        .collect()
+        .to_arrow()
+    )
@@ -0,0 +1,703 @@
+"""
+Writes completed FileWriteJobs to the MinIO lake as parquet objects.
+"""
+
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Dict, Iterator, List, Mapping, Optional, Set
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from minio import Minio
+from minio.error import S3Error
+
+from betedge_data.contracts import ContractDimension
+from betedge_data.datetime import settled_date
+from betedge_data.job import FileWriteJob, RequestSummary, Schema
+from betedge_data.lake import LakeIndex, read_object_dates
+from betedge_data.manifest import LakeManifest, ManifestEntry, table_dates
+from betedge_data.profiles import (
+    DEFAULT_WRITE_PROFILE,
+    DEFAULT_WRITE_PROFILES,
+    WriteProfile,
+)
+from betedge_data.silver import build_silver, split_underlying
+
+logger = logging.getLogger(__name__)
+
+# S3 multipart uploads need parts of at least 5 MiB
+MIN_PART_SIZE = 5 * 1024 * 1024
+# pyarrow's default maximum rows per row group
+DEFAULT_ROW_GROUP_SIZE = 1024 * 1024
+
+
+def _concat(tables: List[pa.Table]) -> pa.Table:
+    schema = tables[0].schema
+    return pa.concat_tables(
+        [t if t.schema.equals(schema) else t.cast(schema) for t in tables]
+    )
+
+
+class UploadPipe:
+    """
+    Bounded in memory pipe between a parquet encoder thread and a MinIO upload.
+
+    The encoder writes into the pipe while put_object reads multipart chunks from it,
+    so encoding and network transfer overlap and at most `max_buffered` bytes of
+    encoded parquet are held at once.
+    """
+
+    def __init__(self, max_buffered: int) -> None:
+        self.max_buffered = max_buffered
+        self.bytes_written = 0
+        self._chunks: deque[bytes] = deque()
+        self._buffered = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    # Writer side, used by pyarrow
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        with self._cond:
+            while self._buffered >= self.max_buffered and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise RuntimeError("Upload aborted") from self._error
+            self._chunks.append(data)
+            self._buffered += len(data)
+            self.bytes_written += len(data)
+            self._cond.notify_all()
+        return len(data)
+
+    def tell(self) -> int:
+        return self.bytes_written
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def abort(self, error: BaseException) -> None:
+        """Fail both ends of the pipe, waking a blocked reader or writer."""
+        with self._cond:
+            self._error = error
+            self._closed = True
+            self._cond.notify_all()
+
+    # Reader side, used by put_object
+    def read(self, size: int = -1) -> bytes:
+        with self._cond:
+            while True:
+                if self._error is not None:
+                    raise RuntimeError("Parquet encoding failed") from self._error
+                if self._closed or (size >= 0 and self._buffered >= size):
+                    break
+                self._cond.wait()
+
+            out = bytearray()
+            while self._chunks and (size < 0 or len(out) < size):
+                chunk = self._chunks.popleft()
+                take = len(chunk) if size < 0 else min(len(chunk), size - len(out))
+                out += chunk[:take]
+                if take < len(chunk):
+                    self._chunks.appendleft(chunk[take:])
+            self._buffered -= len(out)
+            self._cond.notify_all()
+            return bytes(out)
+
+
+def _coalesced_row_groups(
+    tables: List[pa.Table], schema: pa.Schema, row_group_size: int
+) -> Iterator[pa.Table]:
+    """Tables in order, small per day tables joined so row groups approach row_group_size."""
+    pending: List[pa.Table] = []
+    pending_rows = 0
+    for table in tables:
+        if not table.schema.equals(schema):
+            table = table.cast(schema)
+        pending.append(table)
+        pending_rows += table.num_rows
+        if pending_rows >= row_group_size:
+            yield pa.concat_tables(pending)
+            pending, pending_rows = [], 0
+    if pending:
+        yield pa.concat_tables(pending)
+
+
+def _sorted_row_groups(
+    tables: List[pa.Table], schema: pa.Schema, keys: List[str], row_group_size: int
+) -> Iterator[pa.Table]:
+    """
+    Rows of tables in ascending key order, nulls last, row_group_size rows at a time.
+
+    Only a sort index over the key columns and one row group are materialised rather
+    than a sorted copy of the whole file. Each block of the index is gathered from the
+    record batches it points into and put back in index order.
+    """
+    batches = [
+        batch for table in tables for batch in table.to_batches() if batch.num_rows
+    ]
+    if not batches:
+        return
+    key_schema = pa.schema([schema.field(name) for name in keys])
+    key_table = pa.Table.from_batches(
+        [batch.select(keys).cast(key_schema) for batch in batches], schema=key_schema
+    )
+    order = pc.sort_indices(key_table, sort_keys=[(name, "ascending") for name in keys])
+    del key_table
+
+    # Batch of every row in input order, and the input position of each batch's first row
+    batch_of_row = pa.chunked_array(
+        [
+            pa.repeat(pa.scalar(i, pa.int32()), b.num_rows)
+            for i, b in enumerate(batches)
+        ],
+        type=pa.int32(),
+    )
+    batch_starts = pa.array(
+        list(accumulate((b.num_rows for b in batches), initial=0)), type=pa.uint64()
+    )
+
+    for offset in range(0, len(order), row_group_size):
+        rows = order.slice(offset, row_group_size)
+        batch = pc.take(batch_of_row, rows).combine_chunks()
+        local = pc.subtract(rows, pc.take(batch_starts, batch))
+        # Stable, so the rows taken from one batch keep their key order
+        by_batch = pc.sort_indices(batch)
+        batch, local = pc.take(batch, by_batch), pc.take(local, by_batch)
+
+        parts = []
+        start = 0
+        for counts in pc.value_counts(batch):
+            source = batches[counts["values"].as_py()]
+            count = counts["counts"].as_py()
+            part = source.take(local.slice(start, count))
+            parts.append(part if part.schema.equals(schema) else part.cast(schema))
+            start += count
+        block = pa.Table.from_batches(parts, schema=schema).combine_chunks()
+        yield block.take(pc.sort_indices(by_batch))
+
+
+@dataclass(slots=True)
+class _SilverPartner:
+    """The half of a split option file's silver pair that was written first."""
+
+    summary: Optional[RequestSummary]
+    underlying: Optional[pa.Table] = None
+    # Local Arrow IPC copy of an option file, with its schema and contract dimension
+    options_path: Optional[str] = None
+    schema: Optional[Schema] = None
+    contracts: Optional[ContractDimension] = None
+    # The other half failed or had no data, the pair can never complete
+    abandoned: bool = False
+
+    def options(self) -> pa.Table:
+        return ipc.open_file(pa.memory_map(self.options_path)).read_all()
+
+    def discard(self) -> None:
+        if self.options_path is not None and os.path.exists(self.options_path):
+            os.remove(self.options_path)
+
+
+def _is_silver_pair(file_write_job: FileWriteJob) -> bool:
+    """Whether a job is one half of a split option file and its underlying companion."""
+    if file_write_job.silver_key is None:
+        return False
+    is_option = file_write_job.schema in (Schema.OPTION_QUOTE, Schema.OPTION_EOD)
+    return not is_option or file_write_job.underlying_key is not None
+
+
+def _record_silver(summary: Optional[RequestSummary], written: bool) -> None:
+    if summary is not None:
+        summary.record_silver(written)
+
+
+class LakeWriter:
+    """
+    Encodes completed FileWriteJobs as parquet and uploads them to MinIO.
+
+    Shared by the threaded and asyncio clients so both write identical objects. Each
+    object is encoded with the WriteProfile of its schema. Option files of jobs with a
+    silver_key also get their silver object written.
+    """
+
+    def __init__(
+        self,
+        minio_client: Minio,
+        bucket: str,
+        index: Optional[LakeIndex] = None,
+        manifest: Optional[LakeManifest] = None,
+        row_group_size: Optional[int] = None,
+        part_size: int = MIN_PART_SIZE,
+        profiles: Optional[Mapping[str, WriteProfile]] = None,
+        settle_days: int = 2,
+    ) -> None:
+        """
+        Args:
+            minio_client: Client used for uploads
+            bucket: Bucket the objects are written to
+            index: Optional LakeIndex kept current with every upload
+            manifest: Optional LakeManifest recording metadata of every upload
+            row_group_size: Maximum rows per parquet row group for every schema, taken
+                from the schema's WriteProfile or 1Mi rows when None
+            part_size: Multipart upload part size in bytes, at least 5 MiB
+            profiles: WriteProfile per Schema value, DEFAULT_WRITE_PROFILES when None
+            settle_days: Days without data are only recorded in the manifest once they
+                are this many days old, the vendor may still publish the latest ones
+        """
+        self.minio_client = minio_client
+        self.bucket = bucket
+        self.index = index
+        self.manifest = manifest
+        self.row_group_size = row_group_size
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.profiles = dict(profiles or DEFAULT_WRITE_PROFILES)
+        self.settle_days = settle_days
+        # Silver pairing of split option files, the half written first per silver key
+        self._silver_partners: Dict[str, _SilverPartner] = {}
+        self._silver_lock = threading.Lock()
+
+    def profile_for(self, schema: Optional[Schema]) -> WriteProfile:
+        """WriteProfile of a schema, DEFAULT_WRITE_PROFILE for unknown schemas."""
+        if schema is None:
+            return DEFAULT_WRITE_PROFILE
+        return self.profiles.get(schema.value, DEFAULT_WRITE_PROFILE)
+
+    def _row_group_size(self, profile: WriteProfile) -> int:
+        return self.row_group_size or profile.row_group_size or DEFAULT_ROW_GROUP_SIZE
+
+    def write(self, file_write_job: FileWriteJob) -> int:
+        """
+        Write a completed FileWriteJob to the lake.
+
+        Args:
+            file_write_job: Job whose tables should be written
+
+        Returns:
+            Number of bytes uploaded
+
+        Raises:
+            RuntimeError: If the job is not complete
+        """
+        if not file_write_job.completed:
+            raise RuntimeError("Incomplete FileWriteJob found in Queue.")
+
+        object_key = file_write_job.object_key
+        tables = file_write_job.tables
+        if not file_write_job.has_data:
+            logger.info(
+                f"No data returned for any item of {object_key}, nothing to write."
+            )
+            if self.manifest:
+                self._record_no_data(file_write_job)
+            if _is_silver_pair(file_write_job):
+                self._abandon_silver(file_write_job, failed=False)
+            return 0
+
+        profile = file_write_job.write_profile or self.profile_for(
+            file_write_job.schema
+        )
+        start_time = time.time()
+        try:
+            if file_write_job.merge_existing:
+                logger.info(f"Merging new days into MinIO object: {object_key}")
+                merged = self._merge_existing(file_write_job, profile)
+                self._save_contracts(file_write_job)
+                size, etag = self._upload_tables(object_key, [merged], profile)
+                dates, row_count = table_dates(merged), merged.num_rows
+            elif file_write_job.spill_path:
+                logger.info(
+                    f"Streaming spill file {file_write_job.spill_path} to MinIO object: {object_key}"
+                )
+                self._save_contracts(file_write_job)
+                size, etag = self._upload_tables(
+                    object_key, file_write_job.spilled_tables(), profile
+                )
+                dates = sorted(file_write_job.spilled_dates)
+                row_count = file_write_job.spilled_rows
+            else:
+                logger.info(
+                    f"Streaming {len(tables)} tables to MinIO object: {object_key}"
+                )
+                self._save_contracts(file_write_job)
+                size, etag = self._upload_tables(object_key, tables, profile)
+                dates = sorted(set().union(*(table_dates(table) for table in tables)))
+                row_count = sum(table.num_rows for table in tables)
+
+            if file_write_job.silver_key is not None:
+                if file_write_job.merge_existing:
+                    written = [merged]
+                elif file_write_job.spill_path:
+                    written = file_write_job.spilled_tables()
+                else:
+                    written = tables
+                self._write_silver(file_write_job, written)
+        except Exception:
+            if _is_silver_pair(file_write_job):
+                self._abandon_silver(file_write_job, failed=True)
+            raise
+        finally:
+            file_write_job.discard()
+
+        duration_ms = (time.time() - start_time) * 1000
+        logger.info(
+            f"Successfully uploaded {size} bytes to MinIO object: {file_write_job.object_key} in {duration_ms:.1f}ms"
+        )
+        if self.index:
+            self.index.record_write(file_write_job.object_key, size, etag)
+        if self.manifest:
+            self._record_manifest(file_write_job, size, dates, row_count)
+            self._record_no_data(file_write_job)
+        if file_write_job.summary:
+            file_write_job.summary.record_write(size)
+        return size
+
+    @staticmethod
+    def _save_contracts(file_write_job: FileWriteJob) -> None:
+        # Every contract_id an object references must be resolvable once the object lands
+        if file_write_job.contracts is not None:
+            file_write_job.contracts.save()
+
+    def _write_silver(
+        self, file_write_job: FileWriteJob, tables: List[pa.Table]
+    ) -> None:
+        """
+        Materialise the silver object of an option file from the tables just written.
+
+        Combined option files hold their underlying rows. A split option file and its
+        underlying companion are written independently, so whichever lands first is
+        held until the other arrives: the small underlying table in memory, the option
+        file as a local Arrow IPC copy that is memory mapped back. Failures are logged
+        and counted in the RequestSummary, not raised, as the bronze object is already
+        written and the silver object can be rebuilt from it.
+        """
+        key = file_write_job.silver_key
+        is_option = file_write_job.schema in (Schema.OPTION_QUOTE, Schema.OPTION_EOD)
+        summary = file_write_job.summary
+        partner = None
+        try:
+            schema, contracts = file_write_job.schema, file_write_job.contracts
+            if not _is_silver_pair(file_write_job):
+                options, underlying = split_underlying(_concat(tables))
+            else:
+                partner = self._pair_silver(file_write_job, tables)
+                if partner is None:
+                    return
+                if partner.abandoned:
+                    if is_option:
+                        logger.warning(f"No underlying written for silver object {key}")
+                        _record_silver(summary, written=False)
+                    return
+                if is_option:
+                    options, underlying = _concat(tables), partner.underlying
+                else:
+                    options, underlying = partner.options(), _concat(tables)
+                    schema, contracts = partner.schema, partner.contracts
+
+            silver = build_silver(
+                options,
+                underlying,
+                contracts.table() if contracts is not None else None,
+            )
+            if silver.num_rows == 0:
+                logger.info(f"No option rows paired with the underlying for {key}")
+                return
+            size, etag = self._upload_tables(key, [silver], self.profile_for(schema))
+        except Exception as e:
+            logger.error(f"Failed to materialise silver object {key}: {e}")
+            _record_silver(summary, written=False)
+            return
+        finally:
+            if partner is not None:
+                partner.discard()
+
+        logger.info(f"Materialised {silver.num_rows} rows to silver object {key}")
+        _record_silver(summary, written=True)
+        if self.index:
+            self.index.record_write(key, size, etag)
+
+    def _pair_silver(
+        self, file_write_job: FileWriteJob, tables: List[pa.Table]
+    ) -> Optional[_SilverPartner]:
+        """
+        Take the other half of a job's silver pair, or hold the job's half until it
+        arrives and return None.
+        """
+        key = file_write_job.silver_key
+        is_option = file_write_job.schema in (Schema.OPTION_QUOTE, Schema.OPTION_EOD)
+        with self._silver_lock:
+            partner = self._silver_partners.pop(key, None)
+        if partner is not None:
+            return partner
+
+        held = _SilverPartner(file_write_job.summary)
+        if is_option:
+            # Copied outside the lock, the underlying may land meanwhile
+            held.options_path = self._stash_options(file_write_job, tables)
+            held.schema = file_write_job.schema
+            held.contracts = file_write_job.contracts
+        else:
+            held.underlying = _concat(tables)
+        with self._silver_lock:
+            partner = self._silver_partners.pop(key, None)
+            if partner is None:
+                self._silver_partners[key] = held
+                return None
+        if is_option:
+            # Built from the memory mapped copy like a partner, which discard removes
+            partner.options_path, held.options_path = held.options_path, None
+        return partner
+
+    @staticmethod
+    def _stash_options(file_write_job: FileWriteJob, tables: List[pa.Table]) -> str:
+        """Local Arrow IPC copy of an option file's tables, its own spill file if any."""
+        if file_write_job.spill_path and not file_write_job.merge_existing:
+            return file_write_job.detach_spill()
+
+        fd, path = tempfile.mkstemp(
+            prefix="betedge-silver-", suffix=".arrow", dir=file_write_job.spill_dir
+        )
+        os.close(fd)
+        schema = tables[0].schema
+        with ipc.new_file(path, schema) as writer:
+            for table in tables:
+                writer.write_table(
+                    table if table.schema.equals(schema) else table.cast(schema)
+                )
+        return path
+
+    def _abandon_silver(self, file_write_job: FileWriteJob, failed: bool) -> None:
+        """
+        Drop the silver pair of a job that wrote nothing, so its partner is not held.
+
+        Args:
+            file_write_job: Half of a silver pair
+            failed: The job had data but its write failed, rather than having no data
+        """
+        key = file_write_job.silver_key
+        with self._silver_lock:
+            partner = self._silver_partners.pop(key, None)
+            if partner is None:
+                self._silver_partners[key] = _SilverPartner(
+                    file_write_job.summary, abandoned=True
+                )
+        is_option = file_write_job.schema in (Schema.OPTION_QUOTE, Schema.OPTION_EOD)
+        if (is_option and failed) or (partner is not None and partner.options_path):
+            logger.warning(f"Silver object {key} not written, its pair is incomplete")
+            _record_silver(file_write_job.summary, written=False)
+        if partner is not None:
+            partner.discard()
+
+    def evict_silver(self, summaries: List[RequestSummary]) -> None:
+        """
+        Drop the silver pairs of finished requests still waiting for their other half,
+        counting the option files among them as silver failures.
+
+        Args:
+            summaries: RequestSummary of every request whose files were all written
+        """
+        with self._silver_lock:
+            evicted = [
+                (key, partner)
+                for key, partner in self._silver_partners.items()
+                if any(partner.summary is summary for summary in summaries)
+            ]
+            for key, _ in evicted:
+                del self._silver_partners[key]
+        for key, partner in evicted:
+            if partner.options_path is not None:
+                logger.warning(
+                    f"Silver object {key} not written, no underlying arrived"
+                )
+                _record_silver(partner.summary, written=False)
+            partner.discard()
+
+    def _upload_tables(
+        self, object_key: str, tables: List[pa.Table], profile: WriteProfile
+    ) -> tuple[int, str]:
+        """
+        Encode tables as one parquet file on a helper thread while put_object uploads it
+        in multipart chunks, instead of serialising the whole file before uploading.
+
+        Tables arrive in completion order, so with profile sort keys the file is sorted
+        as a whole, one row group at a time: memory beyond the tables themselves is
+        bounded by the sort index and a row group.
+        """
+        pipe = UploadPipe(max_buffered=2 * self.part_size)
+        schema = tables[0].schema
+        row_group_size = self._row_group_size(profile)
+        keys = profile.sort_keys(schema)
+        writer_kwargs = profile.writer_kwargs(
+            schema, min(sum(t.num_rows for t in tables), row_group_size)
+        )
+
+        def encode() -> None:
+            try:
+                if keys:
+                    row_groups = _sorted_row_groups(
+                        tables, schema, keys, row_group_size
+                    )
+                else:
+                    row_groups = _coalesced_row_groups(tables, schema, row_group_size)
+                with pq.ParquetWriter(pipe, schema, **writer_kwargs) as writer:
+                    for row_group in row_groups:
+                        writer.write_table(row_group, row_group_size=row_group_size)
+                pipe.close()
+            except BaseException as e:
+                pipe.abort(e)
+
+        encoder = threading.Thread(
+            target=encode, daemon=True, name=f"parquet-encoder-{object_key}"
+        )
+        encoder.start()
+        try:
+            result = self.minio_client.put_object(
+                bucket_name=self.bucket,
+                object_name=object_key,
+                data=pipe,
+                length=-1,
+                part_size=self.part_size,
+                content_type="application/octet-stream",
+            )
+        except BaseException as e:
+            pipe.abort(e)
+            raise
+        finally:
+            encoder.join()
+
+        return pipe.bytes_written, result.etag
+
+    def covered_dates(self, object_key: str) -> Set[int]:
+        """
+        YYYYMMDD dates an existing object holds, plus the settled dates the manifest
+        recorded as returning no data for it.
+
+        Taken from the manifest when its entry matches the listed object size, otherwise
+        read from the object's date column.
+        """
+        info = self.index.get(object_key) if self.index else None
+        no_data = set()
+        if self.manifest:
+            settled = settled_date(self.settle_days)
+            no_data = {
+                d for d in self.manifest.no_data_dates(object_key) if d <= settled
+            }
+            entry = self.manifest.get(object_key)
+            if entry is not None and (info is None or entry.byte_size == info.size):
+                return set(entry.dates) | no_data
+
+        size = (
+            info.size
+            if info
+            else self.minio_client.stat_object(self.bucket, object_key).size
+        )
+        return no_data.union(
+            read_object_dates(self.minio_client, self.bucket, object_key, size)
+        )
+
+    def _read_object(self, object_key: str) -> Optional[pa.Table]:
+        """Read an existing parquet object, None if it does not exist."""
+        try:
+            response = self.minio_client.get_object(self.bucket, object_key)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return None
+            raise
+        try:
+            return pq.read_table(io.BytesIO(response.read()))
+        finally:
+            response.close()
+            response.release_conn()
+
+    def _merge_existing(
+        self, file_write_job: FileWriteJob, profile: WriteProfile
+    ) -> pa.Table:
+        """
+        Combine the rows of the existing object with the job's new days. Existing rows of
+        a day the job refetched are replaced. Without profile sort keys, which
+        _upload_tables applies, the result is sorted by date.
+        """
+        new_tables = list(file_write_job.tables)
+        if file_write_job.spill_path:
+            new_tables.extend(file_write_job.spilled_tables())
+
+        existing = self._read_object(file_write_job.object_key)
+        if existing is not None and file_write_job.contracts is not None:
+            # Objects written before contract ids were enabled carry the contract columns
+            existing = file_write_job.contracts.encode(existing)
+        if existing is None:
+            tables = new_tables
+        else:
+            date_type = (
+                existing.schema.field("date").type
+                if "date" in existing.column_names
+                else None
+            )
+            new_dates = [
+                t["date"].cast(date_type)
+                for t in new_tables
+                if "date" in t.column_names
+            ]
+            if date_type is not None and new_dates:
+                value_set = pa.chunked_array(new_dates, type=date_type).unique()
+                existing = existing.filter(
+                    pc.invert(pc.is_in(existing["date"], value_set=value_set))
+                )
+            tables = [existing] + new_tables
+
+        schema = tables[0].schema
+        merged = pa.concat_tables(
+            [t if t.schema.equals(schema) else t.cast(schema) for t in tables]
+        )
+        if not profile.sort_keys(merged.schema) and "date" in merged.column_names:
+            # Stable sort keeps the intraday order within each day
+            merged = merged.sort_by("date")
+        return merged
+
+    def _record_no_data(self, file_write_job: FileWriteJob) -> None:
+        # A merge adds to the object's no-data dates, a full write starts them over.
+        # Recent days are left out, the vendor may not have published them yet.
+        settled = settled_date(self.settle_days)
+        self.manifest.record_no_data(
+            file_write_job.object_key,
+            sorted(d for d in file_write_job.no_data_dates if d <= settled),
+            replace=not file_write_job.merge_existing,
+        )
+
+    def _record_manifest(
+        self, file_write_job: FileWriteJob, size: int, dates: List[int], row_count: int
+    ) -> None:
+        self.manifest.record(
+            ManifestEntry(
+                object_key=file_write_job.object_key,
+                root=file_write_job.root,
+                schema=file_write_job.schema.value if file_write_job.schema else None,
+                granularity=file_write_job.granularity,
+                interval=file_write_job.interval,
+                start_date=dates[0] if dates else None,
+                end_date=dates[-1] if dates else None,
+                row_count=row_count,
+                byte_size=size,
+                dates=dates,
+            )
+        )
@@ -1,3 +0,0 @@
-"""BetEdge data processing and silver layer transformations."""
-
-__version__ = "0.1.0"
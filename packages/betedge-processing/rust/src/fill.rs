@@ -0,0 +1,83 @@
+//! Work units of par_fill: preallocated outputs split into CHUNK_SIZE rows and the row
+//! loop that fills one. No dependencies, so the tests here run with
+//! `rustc --edition 2021 --test src/fill.rs` as well as cargo test.
+
+/// Rows per rayon work unit, a multiple of 8 so every unit owns whole validity bytes
+pub const CHUNK_SIZE: usize = 8192;
+
+/// The rows of N output columns and their validity bytes belonging to one work unit
+pub type Unit<'a, const N: usize> = ([&'a mut [f64]; N], &'a mut [u8]);
+
+/// Split N columns of equal length and their validity bytes into disjoint work units,
+/// unit i covering rows i * CHUNK_SIZE up to the next unit
+pub fn units<'a, const N: usize>(
+    columns: &'a mut [Vec<f64>; N],
+    validity: &'a mut [u8],
+) -> Vec<Unit<'a, N>> {
+    let mut chunks = columns
+        .each_mut()
+        .map(|column| column.chunks_mut(CHUNK_SIZE));
+    // ceil(len / 8) validity bytes in CHUNK_SIZE / 8 byte units give exactly as many
+    // units as the columns have CHUNK_SIZE row chunks
+    validity
+        .chunks_mut(CHUNK_SIZE / 8)
+        .map(|valid| (chunks.each_mut().map(|chunk| chunk.next().unwrap()), valid))
+        .collect()
+}
+
+/// Fill the rows of one unit starting at row `start`, setting the validity bit of every
+/// row the kernel returns Some for. Rows it returns None for keep 0.0 and a clear bit.
+#[inline]
+pub fn fill_unit<const N: usize, F>(start: usize, unit: Unit<'_, N>, kernel: &F)
+where
+    F: Fn(usize) -> Option<[f64; N]>,
+{
+    let (mut outputs, valid) = unit;
+    let rows = outputs[0].len();
+    for j in 0..rows {
+        if let Some(row) = kernel(start + j) {
+            for (output, value) in outputs.iter_mut().zip(row) {
+                output[j] = value;
+            }
+            valid[j / 8] |= 1 << (j % 8);
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// par_fill without the pool, units filled in reverse to show they are independent
+    fn fill<const N: usize, F>(len: usize, kernel: F) -> ([Vec<f64>; N], Vec<u8>)
+    where
+        F: Fn(usize) -> Option<[f64; N]>,
+    {
+        let mut columns: [Vec<f64>; N] = std::array::from_fn(|_| vec![0.0; len]);
+        let mut validity = vec![0u8; len.div_ceil(8)];
+        let mut all = units(&mut columns, &mut validity);
+        assert_eq!(all.len(), len.div_ceil(CHUNK_SIZE));
+        while let Some(unit) = all.pop() {
+            fill_unit(all.len() * CHUNK_SIZE, unit, &kernel);
+        }
+        (columns, validity)
+    }
+
+    #[test]
+    fn fills_values_and_validity_at_unit_boundaries() {
+        for len in [0, 1, 7, 8, 9, 8191, 8192, 8193, 20_000] {
+            let (columns, validity) = fill(len, |i| (i % 3 != 0).then(|| [i as f64, -(i as f64)]));
+            for i in 0..len {
+                let valid = validity[i / 8] >> (i % 8) & 1 == 1;
+                assert_eq!(valid, i % 3 != 0, "len {} row {} validity", len, i);
+                let expected = if valid { i as f64 } else { 0.0 };
+                assert_eq!(columns[0][i], expected, "len {} row {}", len, i);
+                assert_eq!(columns[1][i], -expected, "len {} row {}", len, i);
+            }
+            // Padding bits past the last row stay clear
+            if len % 8 != 0 {
+                assert_eq!(validity[len / 8] >> (len % 8), 0, "len {} padding", len);
+            }
+        }
+    }
+}
@@ -0,0 +1,311 @@
+//! Black-Scholes greeks of one row. Plain f64 arithmetic with no dependencies, so the
+//! tests here run with `rustc --edition 2021 --test src/greeks.rs` as well as cargo test.
+
+/// Whether greeks are defined for the inputs of one row: finite, positive spot, strike,
+/// time to expiry and volatility
+#[inline]
+pub fn greeks_defined(
+    spot: f64,
+    strike: f64,
+    dte: f64,
+    volatility: f64,
+    risk_free_rate: f64,
+) -> bool {
+    risk_free_rate.is_finite()
+        && [spot, strike, dte, volatility]
+            .iter()
+            .all(|v| v.is_finite() && *v > 0.0)
+}
+
+/// Standard normal density
+#[inline(always)]
+fn norm_pdf(x: f64) -> f64 {
+    const FRAC_1_SQRT_2PI: f64 = 0.398_942_280_401_432_7;
+    FRAC_1_SQRT_2PI * (-0.5 * x * x).exp()
+}
+
+/// Standard normal CDF from the density at x, Abramowitz and Stegun 26.2.17 (absolute
+/// error below 7.5e-8). A reciprocal and a polynomial with an arithmetic sign select,
+/// no erf evaluation or branches, and the density is shared with the greeks that need it.
+#[inline(always)]
+fn norm_cdf(x: f64, pdf: f64) -> f64 {
+    let t = 1.0 / (1.0 + 0.231_641_9 * x.abs());
+    let poly = t
+        * (0.319_381_530
+            + t * (-0.356_563_782
+                + t * (1.781_477_937 + t * (-1.821_255_978 + t * 1.330_274_429))));
+    let tail = pdf * poly;
+    // tail below the mean, 1 - tail above it, selected arithmetically
+    tail + (x >= 0.0) as u8 as f64 * (1.0 - 2.0 * tail)
+}
+
+/// Black-Scholes sensitivities of one option, theta and charm per day, vega, rho,
+/// vanna and volga per percentage point of volatility or rate
+#[derive(Debug, Clone, Copy)]
+pub struct Greeks {
+    pub delta: f64,
+    pub gamma: f64,
+    pub theta: f64,
+    pub vega: f64,
+    pub rho: f64,
+    pub vanna: f64,
+    pub volga: f64,
+    pub charm: f64,
+}
+
+/// Calculate Black-Scholes Greeks, first and second order from one d1/d2 evaluation
+#[inline]
+pub fn calculate_greeks(
+    spot: f64,
+    strike: f64,
+    time_to_expiry: f64,
+    risk_free_rate: f64,
+    volatility: f64,
+    is_call: bool,
+) -> Greeks {
+    let sqrt_t = time_to_expiry.sqrt();
+    let vol_sqrt_t = volatility * sqrt_t;
+    let d1 = ((spot / strike).ln()
+        + (risk_free_rate + 0.5 * volatility * volatility) * time_to_expiry)
+        / vol_sqrt_t;
+    let d2 = d1 - vol_sqrt_t;
+    let discounted_strike = strike * (-risk_free_rate * time_to_expiry).exp();
+
+    // phi(d2) = phi(d1) * S / (K e^-rT), saving a second exp
+    let pdf_d1 = norm_pdf(d1);
+    let pdf_d2 = pdf_d1 * spot / discounted_strike;
+    let cdf_d1 = norm_cdf(d1, pdf_d1);
+    let cdf_d2 = norm_cdf(d2, pdf_d2);
+
+    // Puts through put call parity, N(-x) = N(x) - 1 with the sign folded in
+    let (delta, signed_cdf_d2) = if is_call {
+        (cdf_d1, cdf_d2)
+    } else {
+        (cdf_d1 - 1.0, cdf_d2 - 1.0)
+    };
+
+    // Gamma, vega, vanna, volga and charm are the same for calls and puts
+    let gamma = pdf_d1 / (spot * vol_sqrt_t);
+    let vega = spot * sqrt_t * pdf_d1;
+    let theta = -spot * pdf_d1 * volatility / (2.0 * sqrt_t)
+        - risk_free_rate * discounted_strike * signed_cdf_d2;
+    let rho = discounted_strike * time_to_expiry * signed_cdf_d2;
+    let vanna = -pdf_d1 * d2 / volatility;
+    let volga = vega * d1 * d2 / volatility;
+    let charm = -pdf_d1 * (2.0 * risk_free_rate * time_to_expiry - d2 * vol_sqrt_t)
+        / (2.0 * time_to_expiry * vol_sqrt_t);
+
+    // Normalize to days and percentage points
+    Greeks {
+        delta,
+        gamma,
+        theta: theta / 365.0,
+        vega: vega / 100.0,
+        rho: rho / 100.0,
+        vanna: vanna / 100.0,
+        volga: volga / 10_000.0,
+        charm: charm / 365.0,
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    // Reference values from scipy.stats.norm and closed form Black-Scholes greeks
+    const CDF_CASES: [(f64, f64); 9] = [
+        (-8.0, 6.220_960_574_271_740_5e-16),
+        (-3.5, 0.000_232_629_079_035_525_02),
+        (-1.2, 0.115_069_670_221_708_22),
+        (-0.001, 0.499_601_057_786_088_93),
+        (0.0, 0.5),
+        (0.001, 0.500_398_942_213_911_01),
+        (0.7, 0.758_036_347_776_926_97),
+        (2.5, 0.993_790_334_674_223_84),
+        (6.0, 0.999_999_999_013_412_3),
+    ];
+
+    // spot, strike, time to expiry, rate, volatility, is_call, then delta, gamma,
+    // theta, vega, rho, vanna, volga and charm
+    const GREEK_CASES: [(&str, [f64; 5], bool, [f64; 8]); 8] = [
+        (
+            "atm call",
+            [100.0, 100.0, 0.5, 0.03, 0.2],
+            true,
+            [
+                0.570_158_102_400_666_89,
+                0.027_772_131_739_916_564,
+                -0.019_380_191_279_233_672,
+                0.277_721_317_399_165_67,
+                0.253_223_911_489_496_13,
+                -0.000_694_303_293_497_913_32,
+                8.678_791_168_723_916_5e-05,
+                -0.000_190_220_080_410_387_42,
+            ],
+        ),
+        (
+            "atm put",
+            [100.0, 100.0, 0.5, 0.03, 0.2],
+            false,
+            [
+                -0.429_841_897_599_333_11,
+                0.027_772_131_739_916_564,
+                -0.011_283_380_816_742_745,
+                0.277_721_317_399_165_67,
+                -0.239_332_058_312_035_16,
+                -0.000_694_303_293_497_913_32,
+                8.678_791_168_723_916_5e-05,
+                -0.000_190_220_080_410_387_42,
+            ],
+        ),
+        (
+            "deep itm call",
+            [100.0, 60.0, 0.25, 0.05, 0.3],
+            true,
+            [
+                0.999_817_263_865_285_91,
+                4.643_497_699_355_356_6e-05,
+                -0.008_171_726_726_285_919_2,
+                0.000_348_262_327_451_651_74,
+                0.148_089_225_772_363_08,
+                -7.926_073_269_511_125_8e-05,
+                0.000_141_236_185_402_128_53,
+                1.239_306_596_366_823_6e-05,
+            ],
+        ),
+        (
+            "deep otm call",
+            [100.0, 160.0, 0.25, 0.05, 0.3],
+            true,
+            [
+                0.001_464_827_199_658_108_8,
+                0.000_318_345_523_031_254_69,
+                -0.000_411_722_632_495_820_47,
+                0.002_387_591_422_734_410_1,
+                0.000_351_163_774_845_493_63,
+                0.000_497_418_730_916_775_14,
+                0.000_739_916_379_754_729_58,
+                -8.612_836_019_222_680_6e-05,
+            ],
+        ),
+        (
+            "deep itm put",
+            [100.0, 160.0, 0.25, 0.05, 0.3],
+            false,
+            [
+                -0.998_535_172_800_341_87,
+                0.000_318_345_523_031_254_69,
+                0.021_233_818_200_246_786,
+                0.002_387_591_422_734_410_1,
+                -0.394_679_956_422_707_09,
+                0.000_497_418_730_916_775_14,
+                0.000_739_916_379_754_729_58,
+                -8.612_836_019_222_680_6e-05,
+            ],
+        ),
+        (
+            "deep otm put",
+            [100.0, 60.0, 0.25, 0.05, 0.3],
+            false,
+            [
+                -0.000_182_736_134_714_089_89,
+                4.643_497_699_355_356_6e-05,
+                -5.464_891_400_744_222_4e-05,
+                0.000_348_262_327_451_651_74,
+                -4.744_430_171_913_452_1e-05,
+                -7.926_073_269_511_125_8e-05,
+                0.000_141_236_185_402_128_53,
+                1.239_306_596_366_823_6e-05,
+            ],
+        ),
+        (
+            "near expiry call",
+            [100.0, 101.0, 1.0 / 365.0 / 24.0, 0.04, 0.25],
+            true,
+            [
+                9.876_496_029_888_464_7e-05,
+                0.001_464_770_596_905_014_6,
+                -0.001_255_166_079_477_930_8,
+                4.180_281_383_861_341_4e-06,
+                1.126_733_666_175_014_8e-08,
+                5.829_395_585_885_222_6e-05,
+                2.318_280_040_208_460_6e-06,
+                -0.017_504_239_038_169_694,
+            ],
+        ),
+        (
+            "near expiry put",
+            [100.0, 99.0, 1.0 / 365.0 / 24.0, 0.04, 0.25],
+            false,
+            [
+                -8.304_667_153_014_033_7e-05,
+                0.001_244_490_488_586_604_3,
+                -0.001_064_577_754_880_685_4,
+                3.551_628_106_696_929_1e-06,
+                -9.486_220_087_432_211_9e-09,
+                -5.003_516_178_648_360_2e-05,
+                2.013_108_578_044_776_9e-06,
+                0.014_996_910_284_015_36,
+            ],
+        ),
+    ];
+
+    #[test]
+    fn norm_cdf_matches_reference() {
+        for (x, expected) in CDF_CASES {
+            let cdf = norm_cdf(x, norm_pdf(x));
+            assert!(
+                (cdf - expected).abs() < 7.5e-8,
+                "N({}) = {}, expected {}",
+                x,
+                cdf,
+                expected
+            );
+            // At 0 both sides take 1 - tail, exact only to the approximation error
+            let mirrored = norm_cdf(-x, norm_pdf(-x));
+            assert!((cdf + mirrored - 1.0).abs() < 1.5e-7, "N({}) asymmetric", x);
+        }
+    }
+
+    #[test]
+    fn greeks_match_reference() {
+        const NAMES: [&str; 8] = [
+            "delta", "gamma", "theta", "vega", "rho", "vanna", "volga", "charm",
+        ];
+        for (case, [spot, strike, dte, rate, vol], is_call, expected) in GREEK_CASES {
+            let g = calculate_greeks(spot, strike, dte, rate, vol, is_call);
+            let actual = [
+                g.delta, g.gamma, g.theta, g.vega, g.rho, g.vanna, g.volga, g.charm,
+            ];
+            for ((name, actual), expected) in NAMES.iter().zip(actual).zip(expected) {
+                // The CDF error bounds delta, theta and rho, the rest only use the density
+                let tolerance = 1e-7 + 1e-9 * expected.abs();
+                assert!(
+                    (actual - expected).abs() < tolerance,
+                    "{} {}: {}, expected {}",
+                    case,
+                    name,
+                    actual,
+                    expected
+                );
+            }
+        }
+    }
+
+    #[test]
+    fn greeks_undefined_inputs() {
+        assert!(greeks_defined(100.0, 100.0, 0.5, 0.2, 0.0));
+        assert!(greeks_defined(100.0, 100.0, 0.5, 0.2, -0.01));
+        for (spot, strike, dte, vol, rate) in [
+            (f64::NAN, 100.0, 0.5, 0.2, 0.03),
+            (100.0, 0.0, 0.5, 0.2, 0.03),
+            (100.0, 100.0, 0.0, 0.2, 0.03),
+            (100.0, 100.0, -0.5, 0.2, 0.03),
+            (100.0, 100.0, 0.5, 0.0, 0.03),
+            (100.0, 100.0, 0.5, f64::INFINITY, 0.03),
+            (100.0, 100.0, 0.5, 0.2, f64::NAN),
+        ] {
+            assert!(!greeks_defined(spot, strike, dte, vol, rate));
+        }
+    }
+}
@@ -1,223 +1,374 @@
 use implied_vol::{DefaultSpecialFn, ImpliedBlackVolatility};
 use polars::prelude::*;
+use polars_arrow::bitmap::Bitmap;
+use pyo3::exceptions::PyDeprecationWarning;
 use pyo3::prelude::*;
-use pyo3_polars::PyDataFrame;
+use pyo3_polars::derive::polars_expr;
+use pyo3_polars::{PolarsAllocator, PyDataFrame};
 use rayon::prelude::*;
-use statrs::distribution::{ContinuousCDF, Normal};
-
-/// Input for implied volatility calculations (uses forward price)
-#[derive(Debug, Clone)]
-pub struct VolatilityInput {
-    pub price: f64,
-    pub forward: f64,
-    pub strike: f64,
-    pub dte: f64,
-    pub is_call: bool,
-}
+use rayon::{ThreadPool, ThreadPoolBuilder};
+use std::sync::{Arc, RwLock};
+
+mod fill;
+mod greeks;
+
+use fill::{fill_unit, units, CHUNK_SIZE};
+use greeks::{calculate_greeks, greeks_defined};
+
+// Expression plugins allocate through the allocator of the polars host
+#[global_allocator]
+static ALLOC: PolarsAllocator = PolarsAllocator::new();
+
+/// Threads of the kernel pool when set_num_threads was not called, 0 or unset for one
+/// per core
+const THREADS_ENV: &str = "BETEDGE_NATIVE_THREADS";
+
+/// Pool the kernels run on, separate from the rayon global pool Polars uses
+static POOL: RwLock<Option<Arc<ThreadPool>>> = RwLock::new(None);
 
-/// Input for Greeks calculations (uses spot price and risk-free rate)
-#[derive(Debug, Clone)]
-pub struct GreeksInput {
-    pub price: f64,
-    pub spot: f64,
-    pub strike: f64,
-    pub dte: f64,
-    pub volatility: f64,
-    pub risk_free_rate: f64,
-    pub is_call: bool,
+fn build_pool(num_threads: usize) -> PolarsResult<Arc<ThreadPool>> {
+    ThreadPoolBuilder::new()
+        .num_threads(num_threads)
+        .thread_name(|i| format!("betedge-native-{}", i))
+        .build()
+        .map(Arc::new)
+        .map_err(|e| PolarsError::ComputeError(format!("{}", e).into()))
 }
 
-/// Result with index tracking for parallel processing
-#[derive(Debug)]
-pub struct VolatilityResult {
-    pub iv: f64,
-    pub index: usize,
+/// The kernel pool, built on first use
+fn pool() -> PolarsResult<Arc<ThreadPool>> {
+    if let Some(pool) = POOL.read().unwrap().as_ref() {
+        return Ok(pool.clone());
+    }
+    let mut slot = POOL.write().unwrap();
+    if let Some(pool) = slot.as_ref() {
+        return Ok(pool.clone());
+    }
+    let num_threads = std::env::var(THREADS_ENV)
+        .ok()
+        .and_then(|value| value.parse().ok())
+        .unwrap_or(0);
+    let pool = build_pool(num_threads)?;
+    *slot = Some(pool.clone());
+    Ok(pool)
 }
 
-/// Greeks calculation results
-#[derive(Debug)]
-pub struct GreeksResult {
-    pub delta: f64,
-    pub gamma: f64,
-    pub theta: f64,
-    pub vega: f64,
-    pub rho: f64,
-    pub index: usize,
+/// Contiguous values and validity of a rechunked f64 column, a single value is
+/// broadcast to every row
+struct F64Column<'a> {
+    values: &'a [f64],
+    validity: Option<&'a Bitmap>,
+    step: usize,
 }
 
-/// Extract VolatilityInput structs from DataFrame
-fn extract_volatility_inputs(
-    df: &DataFrame,
-    price_col: &str,
-    forward_col: &str,
-) -> PolarsResult<Vec<VolatilityInput>> {
-    let len = df.height();
-    let mut inputs = Vec::with_capacity(len);
-
-    let prices = df.column(price_col)?.f64()?;
-    let forwards = df.column(forward_col)?.f64()?;
-    let strikes = df.column("strike")?.f64()?;
-    let dtes = df.column("dte")?.f64()?;
-    let is_calls = df.column("is_call")?.bool()?;
-
-    for i in 0..len {
-        inputs.push(VolatilityInput {
-            price: prices.get(i).unwrap(),
-            forward: forwards.get(i).unwrap(),
-            strike: strikes.get(i).unwrap(),
-            dte: dtes.get(i).unwrap(),
-            is_call: is_calls.get(i).unwrap(),
-        });
+impl<'a> F64Column<'a> {
+    fn new(ca: &'a Float64Chunked) -> Self {
+        let arr = ca.downcast_iter().next();
+        F64Column {
+            values: arr.map_or(&[][..], |arr| arr.values().as_slice()),
+            validity: arr.and_then(|arr| arr.validity()),
+            step: (ca.len() != 1) as usize,
+        }
     }
 
-    Ok(inputs)
+    #[inline]
+    fn get(&self, i: usize) -> Option<f64> {
+        let i = i * self.step;
+        match self.validity {
+            Some(validity) if !validity.get_bit(i) => None,
+            _ => Some(self.values[i]),
+        }
+    }
 }
 
-// /// Extract GreeksInput structs from DataFrame
-fn extract_greeks_inputs(
-    df: &DataFrame,
-    price_col: &str,
-    spot_col: &str,
-    volatility_col: &str,
-    risk_free_col: &str,
-) -> PolarsResult<Vec<GreeksInput>> {
-    let len = df.height();
-    let mut inputs = Vec::with_capacity(len);
-
-    let prices = df.column(price_col)?.f64()?;
-    let spots = df.column(spot_col)?.f64()?;
-    let strikes = df.column("strike")?.f64()?;
-    let dtes = df.column("dte")?.f64()?;
-    let volatilities = df.column(volatility_col)?.f64()?;
-    let risk_free_rates = df.column(risk_free_col)?.f64()?;
-    let is_calls = df.column("is_call")?.bool()?;
-
-    for i in 0..len {
-        inputs.push(GreeksInput {
-            price: prices.get(i).unwrap(),
-            spot: spots.get(i).unwrap(),
-            strike: strikes.get(i).unwrap(),
-            dte: dtes.get(i).unwrap(),
-            volatility: volatilities.get(i).unwrap(),
-            risk_free_rate: risk_free_rates.get(i).unwrap(),
-            is_call: is_calls.get(i).unwrap(),
-        });
+/// Values and validity bitmaps of a rechunked boolean column
+struct BoolColumn<'a> {
+    values: Option<&'a Bitmap>,
+    validity: Option<&'a Bitmap>,
+    step: usize,
+}
+
+impl<'a> BoolColumn<'a> {
+    fn new(ca: &'a BooleanChunked) -> Self {
+        let arr = ca.downcast_iter().next();
+        BoolColumn {
+            values: arr.map(|arr| arr.values()),
+            validity: arr.and_then(|arr| arr.validity()),
+            step: (ca.len() != 1) as usize,
+        }
     }
 
-    Ok(inputs)
+    #[inline]
+    fn get(&self, i: usize) -> Option<bool> {
+        let i = i * self.step;
+        match self.validity {
+            Some(validity) if !validity.get_bit(i) => None,
+            _ => self.values.map(|values| values.get_bit(i)),
+        }
+    }
 }
 
-// /// Parallel batch calculation of implied volatility
-fn calc_implied_volatility_batch(inputs: &[VolatilityInput]) -> PyResult<Vec<VolatilityResult>> {
-    inputs
-        .par_iter()
-        .enumerate()
-        .map(|(index, input)| {
-            let builder = ImpliedBlackVolatility::builder()
-                .option_price(input.price)
-                .forward(input.forward)
-                .strike(input.strike)
-                .expiry(input.dte)
-                .is_call(input.is_call);
-
-            let iv_builder = builder.build().ok_or_else(|| {
-                PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!(
-                    "Failed to build IV Calculatation"
-                ))
-            })?;
-
-            let iv = iv_builder.calculate::<DefaultSpecialFn>().ok_or_else(|| {
-                PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!(
-                    "Failed to calculate implied volatility"
-                ))
-            })?;
-
-            Ok(VolatilityResult { iv, index })
-        })
-        .collect()
+fn column<'a>(df: &'a DataFrame, name: &str) -> PolarsResult<&'a Series> {
+    Ok(df.column(name)?.as_materialized_series())
 }
 
-// /// Parallel batch calculation of Greeks
-fn calc_greeks_batch(inputs: &[GreeksInput]) -> Vec<GreeksResult> {
-    inputs
-        .par_iter()
-        .enumerate()
-        .map(|(index, input)| {
-            // Black-Scholes Greeks calculations
-            let greeks = calculate_greeks(
-                input.spot,
-                input.strike,
-                input.dte,
-                input.risk_free_rate,
-                input.volatility,
-                input.is_call,
-            );
-
-            GreeksResult {
-                delta: greeks.0,
-                gamma: greeks.1,
-                theta: greeks.2,
-                vega: greeks.3,
-                rho: greeks.4,
-                index,
-            }
-        })
-        .collect()
+/// Input as a single f64 chunk, so rows are addressed by index into one slice
+fn f64_input(s: &Series) -> PolarsResult<Float64Chunked> {
+    Ok(s.cast(&DataType::Float64)?.rechunk().f64()?.clone())
 }
 
-/// Calculate Black-Scholes Greeks
-fn calculate_greeks(
-    spot: f64,
-    strike: f64,
-    time_to_expiry: f64,
-    risk_free_rate: f64,
-    volatility: f64,
-    is_call: bool,
-) -> (f64, f64, f64, f64, f64) {
-    use std::f64::consts::PI;
-
-    let sqrt_t = time_to_expiry.sqrt();
-    let d1 = ((spot / strike).ln()
-        + (risk_free_rate + 0.5 * volatility * volatility) * time_to_expiry)
-        / (volatility * sqrt_t);
-    let d2 = d1 - volatility * sqrt_t;
+fn bool_input(s: &Series) -> PolarsResult<BooleanChunked> {
+    Ok(s.rechunk().bool()?.clone())
+}
 
-    // Standard normal PDF
-    let n_prime_d1 = (-0.5 * d1 * d1).exp() / (2.0 * PI).sqrt();
+/// Rows of the outputs, every input has as many or a single row
+fn output_len(inputs: &[&Series]) -> PolarsResult<usize> {
+    let len = inputs.iter().map(|s| s.len()).max().unwrap_or(0);
+    match inputs.iter().find(|s| s.len() != len && s.len() != 1) {
+        Some(s) => Err(PolarsError::ShapeMismatch(
+            format!("{} has {} rows, expected {} or 1", s.name(), s.len(), len).into(),
+        )),
+        None => Ok(len),
+    }
+}
 
-    let n_d1 = Normal::standard().cdf(d1);
-    let n_d2 = Normal::standard().cdf(d2);
+/// Run a row kernel over `len` rows in CHUNK_SIZE units on the kernel pool, writing its
+/// N outputs straight into preallocated columns. Rows the kernel returns None for are
+/// null in every output.
+fn par_fill<const N: usize, F>(len: usize, kernel: F) -> PolarsResult<([Vec<f64>; N], Bitmap)>
+where
+    F: Fn(usize) -> Option<[f64; N]> + Sync,
+{
+    let mut columns: [Vec<f64>; N] = std::array::from_fn(|_| vec![0.0; len]);
+    let mut validity = vec![0u8; len.div_ceil(8)];
+    {
+        let work = units(&mut columns, &mut validity);
+        pool()?.install(|| {
+            work.into_par_iter()
+                .enumerate()
+                .for_each(|(unit, outputs)| fill_unit(unit * CHUNK_SIZE, outputs, &kernel))
+        });
+    }
+    Ok((columns, Bitmap::from_u8_vec(validity, len)))
+}
 
-    // Delta
-    let delta = if is_call { n_d1 } else { n_d1 - 1.0 };
+fn into_series(name: &str, values: Vec<f64>, validity: &Bitmap) -> Series {
+    Float64Chunked::from_vec_validity(name.into(), values, Some(validity.clone())).into_series()
+}
 
-    // Gamma (same for calls and puts)
-    let gamma = n_prime_d1 / (spot * volatility * sqrt_t);
+fn to_py_err(e: PolarsError) -> PyErr {
+    PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e))
+}
 
-    // Theta
-    let theta = if is_call {
-        (-spot * n_prime_d1 * volatility / (2.0 * sqrt_t))
-            - risk_free_rate * strike * (-risk_free_rate * time_to_expiry).exp() * n_d2
+/// Black implied volatility of one row, None when an input is null or the price has
+/// no volatility, e.g. outside the no arbitrage bounds or at expiry
+#[inline]
+fn implied_volatility(
+    price: f64,
+    forward: f64,
+    strike: f64,
+    dte: f64,
+    is_call: bool,
+) -> Option<f64> {
+    // Settled here rather than left to the solver, so NaN and degenerate rows are
+    // always None: a price at or below intrinsic or at or above the forward (calls)
+    // or strike (puts) has no volatility
+    let (intrinsic, bound) = if is_call {
+        (forward - strike, forward)
     } else {
-        (-spot * n_prime_d1 * volatility / (2.0 * sqrt_t))
-            + risk_free_rate * strike * (-risk_free_rate * time_to_expiry).exp() * (1.0 - n_d2)
+        (strike - forward, strike)
     };
+    if !([price, forward, strike, dte].iter().all(|v| v.is_finite())
+        && forward > 0.0
+        && strike > 0.0
+        && dte > 0.0
+        && price > intrinsic.max(0.0)
+        && price < bound)
+    {
+        return None;
+    }
+    ImpliedBlackVolatility::builder()
+        .option_price(price)
+        .forward(forward)
+        .strike(strike)
+        .expiry(dte)
+        .is_call(is_call)
+        .build()?
+        .calculate::<DefaultSpecialFn>()
+        .filter(|iv| iv.is_finite())
+}
 
-    // Vega (same for calls and puts)
-    let vega = spot * sqrt_t * n_prime_d1;
+/// Implied volatility of every row, null where it cannot be solved
+fn implied_volatility_series(
+    price: &Series,
+    forward: &Series,
+    strike: &Series,
+    dte: &Series,
+    is_call: &Series,
+) -> PolarsResult<Series> {
+    let len = output_len(&[price, forward, strike, dte, is_call])?;
+    let (prices, forwards, strikes, dtes, is_calls) = (
+        f64_input(price)?,
+        f64_input(forward)?,
+        f64_input(strike)?,
+        f64_input(dte)?,
+        bool_input(is_call)?,
+    );
+
+    let (price, forward, strike, dte, is_call) = (
+        F64Column::new(&prices),
+        F64Column::new(&forwards),
+        F64Column::new(&strikes),
+        F64Column::new(&dtes),
+        BoolColumn::new(&is_calls),
+    );
+    let ([implied_vols], validity) = par_fill(len, |i| {
+        Some([implied_volatility(
+            price.get(i)?,
+            forward.get(i)?,
+            strike.get(i)?,
+            dte.get(i)?,
+            is_call.get(i)?,
+        )?])
+    })?;
+    Ok(into_series("implied_volatility", implied_vols, &validity))
+}
 
-    // Rho
-    let rho = if is_call {
-        strike * time_to_expiry * (-risk_free_rate * time_to_expiry).exp() * n_d2
-    } else {
-        -strike * time_to_expiry * (-risk_free_rate * time_to_expiry).exp() * (1.0 - n_d2)
-    };
+const GREEK_NAMES: [&str; 5] = ["delta", "gamma", "theta", "vega", "rho"];
+
+/// Greeks of every row in GREEK_NAMES order, null where an input is null or
+/// greeks_defined does not hold
+fn greeks_series(
+    spot: &Series,
+    strike: &Series,
+    dte: &Series,
+    volatility: &Series,
+    risk_free_rate: &Series,
+    is_call: &Series,
+) -> PolarsResult<Vec<Series>> {
+    let len = output_len(&[spot, strike, dte, volatility, risk_free_rate, is_call])?;
+    let (spots, strikes, dtes, volatilities, risk_free_rates, is_calls) = (
+        f64_input(spot)?,
+        f64_input(strike)?,
+        f64_input(dte)?,
+        f64_input(volatility)?,
+        f64_input(risk_free_rate)?,
+        bool_input(is_call)?,
+    );
+
+    let (spot, strike, dte, volatility, risk_free_rate, is_call) = (
+        F64Column::new(&spots),
+        F64Column::new(&strikes),
+        F64Column::new(&dtes),
+        F64Column::new(&volatilities),
+        F64Column::new(&risk_free_rates),
+        BoolColumn::new(&is_calls),
+    );
+    let (columns, validity) = par_fill(len, |i| {
+        let (spot, strike, dte) = (spot.get(i)?, strike.get(i)?, dte.get(i)?);
+        let (volatility, risk_free_rate) = (volatility.get(i)?, risk_free_rate.get(i)?);
+        if !greeks_defined(spot, strike, dte, volatility, risk_free_rate) {
+            return None;
+        }
+        let greeks = calculate_greeks(
+            spot,
+            strike,
+            dte,
+            risk_free_rate,
+            volatility,
+            is_call.get(i)?,
+        );
+        Some([
+            greeks.delta,
+            greeks.gamma,
+            greeks.theta,
+            greeks.vega,
+            greeks.rho,
+        ])
+    })?;
+    Ok(GREEK_NAMES
+        .iter()
+        .zip(columns)
+        .map(|(name, values)| into_series(name, values, &validity))
+        .collect())
+}
 
-    (delta, gamma, theta / 365.0, vega / 100.0, rho / 100.0) // Normalize theta and vega
+const IV_AND_GREEK_NAMES: [&str; 9] = [
+    "implied_volatility",
+    "delta",
+    "gamma",
+    "theta",
+    "vega",
+    "rho",
+    "vanna",
+    "volga",
+    "charm",
+];
+
+/// Implied volatility and first and second order greeks of every row in
+/// IV_AND_GREEK_NAMES order, in one pass over the inputs. Null where the volatility
+/// cannot be solved or greeks_defined does not hold.
+fn iv_and_greeks_series(
+    price: &Series,
+    forward: &Series,
+    strike: &Series,
+    dte: &Series,
+    is_call: &Series,
+    spot: &Series,
+    risk_free_rate: &Series,
+) -> PolarsResult<Vec<Series>> {
+    let len = output_len(&[price, forward, strike, dte, is_call, spot, risk_free_rate])?;
+    let (prices, forwards, strikes, dtes, is_calls, spots, risk_free_rates) = (
+        f64_input(price)?,
+        f64_input(forward)?,
+        f64_input(strike)?,
+        f64_input(dte)?,
+        bool_input(is_call)?,
+        f64_input(spot)?,
+        f64_input(risk_free_rate)?,
+    );
+
+    let (price, forward, strike, dte, is_call, spot, risk_free_rate) = (
+        F64Column::new(&prices),
+        F64Column::new(&forwards),
+        F64Column::new(&strikes),
+        F64Column::new(&dtes),
+        BoolColumn::new(&is_calls),
+        F64Column::new(&spots),
+        F64Column::new(&risk_free_rates),
+    );
+    let (columns, validity) = par_fill(len, |i| {
+        let (strike, dte, is_call) = (strike.get(i)?, dte.get(i)?, is_call.get(i)?);
+        let volatility = implied_volatility(price.get(i)?, forward.get(i)?, strike, dte, is_call)?;
+        let (spot, risk_free_rate) = (spot.get(i)?, risk_free_rate.get(i)?);
+        if !greeks_defined(spot, strike, dte, volatility, risk_free_rate) {
+            return None;
+        }
+        let greeks = calculate_greeks(spot, strike, dte, risk_free_rate, volatility, is_call);
+        Some([
+            volatility,
+            greeks.delta,
+            greeks.gamma,
+            greeks.theta,
+            greeks.vega,
+            greeks.rho,
+            greeks.vanna,
+            greeks.volga,
+            greeks.charm,
+        ])
+    })?;
+    Ok(IV_AND_GREEK_NAMES
+        .iter()
+        .zip(columns)
+        .map(|(name, values)| into_series(name, values, &validity))
+        .collect())
 }
 
+/// Adds an implied_volatility column to a DataFrame, null where it cannot be solved
 #[pyfunction]
+#[pyo3(signature = (py_df, price_col=None, forward_col=None))]
 fn add_implied_volatility(
+    py: Python<'_>,
     py_df: PyDataFrame,
     price_col: Option<String>,
     forward_col: Option<String>,
@@ -227,74 +378,175 @@ fn add_implied_volatility(
     let price_str = price_col.unwrap_or_else(|| "price".to_string());
     let forward_str = forward_col.unwrap_or_else(|| "forward".to_string());
 
-    // Extract inputs
-    let vol_inputs = extract_volatility_inputs(&df, &price_str, &forward_str)
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
-
-    // Calculate in parallel
-    let mut results = calc_implied_volatility_batch(&vol_inputs)
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
-
-    // Sort by index to preserve order
-    results.sort_unstable_by_key(|r| r.index);
-
-    // Extract values
-    let implied_vols: Vec<f64> = results.into_iter().map(|r| r.iv).collect();
+    // Other Python threads run while the kernel does
+    let implied_vols = py
+        .allow_threads(|| {
+            implied_volatility_series(
+                column(&df, &price_str)?,
+                column(&df, &forward_str)?,
+                column(&df, "strike")?,
+                column(&df, "dte")?,
+                column(&df, "is_call")?,
+            )
+        })
+        .map_err(to_py_err)?;
 
-    // Add column
-    df.with_column(Series::new("implied_volatility".into(), implied_vols))
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+    df.with_column(implied_vols).map_err(to_py_err)?;
 
     Ok(PyDataFrame(df))
 }
 
-/// Adds Greek columns to a DataFrame
+/// Adds Greek columns to a DataFrame, null where an input is null or greeks_defined
+/// does not hold. price_col is deprecated and ignored, the greeks follow from the
+/// volatility column; it stays the first column argument so positional calls keep
+/// their meaning.
 #[pyfunction]
+#[pyo3(signature = (py_df, price_col=None, spot_col=None, volatility_col=None, risk_free_col=None))]
 fn add_greeks(
+    py: Python<'_>,
     py_df: PyDataFrame,
     price_col: Option<String>,
     spot_col: Option<String>,
     volatility_col: Option<String>,
     risk_free_col: Option<String>,
 ) -> PyResult<PyDataFrame> {
+    if price_col.is_some() {
+        PyErr::warn(
+            py,
+            py.get_type::<PyDeprecationWarning>().as_any(),
+            c"add_greeks ignores price_col, which will be removed",
+            1,
+        )?;
+    }
     let df: DataFrame = py_df.into();
 
-    let price_str = price_col.unwrap_or_else(|| "price".to_string());
     let spot_str = spot_col.unwrap_or_else(|| "spot".to_string());
     let vol_str = volatility_col.unwrap_or_else(|| "implied_volatility".to_string());
     let rf_str = risk_free_col.unwrap_or_else(|| "risk_free_rate".to_string());
 
-    // Extract inputs
-    let greeks_inputs = extract_greeks_inputs(&df, &price_str, &spot_str, &vol_str, &rf_str)
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+    // Other Python threads run while the kernel does
+    let greek_columns: Vec<Column> = py
+        .allow_threads(|| {
+            greeks_series(
+                column(&df, &spot_str)?,
+                column(&df, "strike")?,
+                column(&df, "dte")?,
+                column(&df, &vol_str)?,
+                column(&df, &rf_str)?,
+                column(&df, "is_call")?,
+            )
+        })
+        .map_err(to_py_err)?
+        .into_iter()
+        .map(Column::from)
+        .collect();
+
+    // Add all columns at once
+    let df_with_greeks = df.hstack(&greek_columns).map_err(to_py_err)?;
 
-    // Calculate in parallel
-    let mut results = calc_greeks_batch(&greeks_inputs);
+    Ok(PyDataFrame(df_with_greeks))
+}
 
-    // Sort by index to preserve order
-    results.sort_unstable_by_key(|r| r.index);
+/// Adds implied_volatility and the first and second order greeks to a DataFrame in a
+/// single pass, see add_implied_volatility and add_greeks for the inputs
+#[pyfunction]
+#[pyo3(signature = (py_df, price_col=None, forward_col=None, spot_col=None, risk_free_col=None))]
+fn add_iv_and_greeks(
+    py: Python<'_>,
+    py_df: PyDataFrame,
+    price_col: Option<String>,
+    forward_col: Option<String>,
+    spot_col: Option<String>,
+    risk_free_col: Option<String>,
+) -> PyResult<PyDataFrame> {
+    let df: DataFrame = py_df.into();
 
-    // Extract values and create series
-    let deltas: Vec<f64> = results.iter().map(|r| r.delta).collect();
-    let gammas: Vec<f64> = results.iter().map(|r| r.gamma).collect();
-    let thetas: Vec<f64> = results.iter().map(|r| r.theta).collect();
-    let vegas: Vec<f64> = results.iter().map(|r| r.vega).collect();
-    let rhos: Vec<f64> = results.iter().map(|r| r.rho).collect();
+    let price_str = price_col.unwrap_or_else(|| "price".to_string());
+    let forward_str = forward_col.unwrap_or_else(|| "forward".to_string());
+    let spot_str = spot_col.unwrap_or_else(|| "spot".to_string());
+    let rf_str = risk_free_col.unwrap_or_else(|| "risk_free_rate".to_string());
 
-    // Create all Greek columns
-    let greek_columns = vec![
-        Column::new("delta".into(), deltas),
-        Column::new("gamma".into(), gammas),
-        Column::new("theta".into(), thetas),
-        Column::new("vega".into(), vegas),
-        Column::new("rho".into(), rhos),
-    ];
+    // Other Python threads run while the kernel does
+    let columns: Vec<Column> = py
+        .allow_threads(|| {
+            iv_and_greeks_series(
+                column(&df, &price_str)?,
+                column(&df, &forward_str)?,
+                column(&df, "strike")?,
+                column(&df, "dte")?,
+                column(&df, "is_call")?,
+                column(&df, &spot_str)?,
+                column(&df, &rf_str)?,
+            )
+        })
+        .map_err(to_py_err)?
+        .into_iter()
+        .map(Column::from)
+        .collect();
 
-    // Add all columns at once
-    let df_with_greeks = df.hstack(&greek_columns)
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+    let df = df.hstack(&columns).map_err(to_py_err)?;
 
-    Ok(PyDataFrame(df_with_greeks))
+    Ok(PyDataFrame(df))
+}
+
+/// Resize the kernel pool, 0 for one thread per core. Batches already running finish
+/// on the previous pool.
+#[pyfunction]
+fn set_num_threads(num_threads: usize) -> PyResult<()> {
+    let pool = build_pool(num_threads).map_err(to_py_err)?;
+    *POOL.write().unwrap() = Some(pool);
+    Ok(())
+}
+
+/// Threads of the kernel pool
+#[pyfunction]
+fn get_num_threads() -> PyResult<usize> {
+    Ok(pool().map_err(to_py_err)?.current_num_threads())
+}
+
+/// Expression plugin of implied_volatility_series, inputs price, forward, strike, dte
+/// and is_call
+#[polars_expr(output_type=Float64)]
+fn implied_vol(inputs: &[Series]) -> PolarsResult<Series> {
+    implied_volatility_series(&inputs[0], &inputs[1], &inputs[2], &inputs[3], &inputs[4])
+}
+
+fn float_struct(name: &str, names: &[&str]) -> Field {
+    let fields = names
+        .iter()
+        .map(|name| Field::new((*name).into(), DataType::Float64))
+        .collect();
+    Field::new(name.into(), DataType::Struct(fields))
+}
+
+fn greeks_struct(_input_fields: &[Field]) -> PolarsResult<Field> {
+    Ok(float_struct("greeks", &GREEK_NAMES))
+}
+
+fn iv_and_greeks_struct(_input_fields: &[Field]) -> PolarsResult<Field> {
+    Ok(float_struct("iv_and_greeks", &IV_AND_GREEK_NAMES))
+}
+
+/// Expression plugin of greeks_series as a struct, inputs spot, strike, dte,
+/// volatility, risk_free_rate and is_call
+#[polars_expr(output_type_func=greeks_struct)]
+fn greeks(inputs: &[Series]) -> PolarsResult<Series> {
+    let fields = greeks_series(
+        &inputs[0], &inputs[1], &inputs[2], &inputs[3], &inputs[4], &inputs[5],
+    )?;
+    let len = fields[0].len();
+    Ok(StructChunked::from_series("greeks".into(), len, fields.iter())?.into_series())
+}
+
+/// Expression plugin of iv_and_greeks_series as a struct, inputs price, forward,
+/// strike, dte, is_call, spot and risk_free_rate
+#[polars_expr(output_type_func=iv_and_greeks_struct)]
+fn iv_and_greeks(inputs: &[Series]) -> PolarsResult<Series> {
+    let fields = iv_and_greeks_series(
+        &inputs[0], &inputs[1], &inputs[2], &inputs[3], &inputs[4], &inputs[5], &inputs[6],
+    )?;
+    let len = fields[0].len();
+    Ok(StructChunked::from_series("iv_and_greeks".into(), len, fields.iter())?.into_series())
 }
 
 /// A Python module implemented in Rust
@@ -302,5 +554,8 @@ fn add_greeks(
 fn _native(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(add_implied_volatility, m)?)?;
     m.add_function(wrap_pyfunction!(add_greeks, m)?)?;
+    m.add_function(wrap_pyfunction!(add_iv_and_greeks, m)?)?;
+    m.add_function(wrap_pyfunction!(set_num_threads, m)?)?;
+    m.add_function(wrap_pyfunction!(get_num_threads, m)?)?;
     Ok(())
 }
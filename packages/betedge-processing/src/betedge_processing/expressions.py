@@ -0,0 +1,158 @@
+"""
+Polars expressions of the native implied volatility and greeks kernels.
+
+The expressions are plugins of the betedge_processing._native library, so they take
+part in lazy plans like any other expression: projection pushdown, the streaming engine
+and group by contexts all apply.
+
+    df.with_columns(
+        implied_vol("mid", "forward", "strike", "dte", "is_call").alias("iv")
+    )
+"""
+
+from pathlib import Path
+
+import polars as pl
+from polars.plugins import register_plugin_function
+
+try:
+    from betedge_processing import _native
+
+    HAS_NATIVE = True
+except ImportError:
+    _native = None
+    HAS_NATIVE = False
+
+# Fields of the greeks struct
+GREEK_COLUMNS = ("delta", "gamma", "theta", "vega", "rho")
+# Fields of the iv_and_greeks struct
+IV_AND_GREEK_COLUMNS = (
+    "implied_volatility",
+    *GREEK_COLUMNS,
+    "vanna",
+    "volga",
+    "charm",
+)
+
+IntoExpr = str | pl.Expr
+
+_NOT_BUILT = (
+    "The betedge_processing native extension is not built, install "
+    "betedge-processing with `uv sync`, which needs a Rust toolchain"
+)
+
+
+def _plugin_path() -> Path:
+    """The _native shared library, the same file Python imported the module from."""
+    if _native is None:
+        raise RuntimeError(_NOT_BUILT)
+    return Path(_native.__file__)
+
+
+def set_native_threads(num_threads: int) -> None:
+    """
+    Size the thread pool the native kernels run on, 0 for one thread per core.
+
+    The kernels release the GIL and use their own pool rather than the one Polars
+    shares with its engine, so capping it leaves cores to ingestion and queries running
+    next to them. The BETEDGE_NATIVE_THREADS environment variable sets the initial size.
+    """
+    if _native is None:
+        raise RuntimeError(_NOT_BUILT)
+    _native.set_num_threads(num_threads)
+
+
+def implied_vol(
+    price: IntoExpr,
+    forward: IntoExpr,
+    strike: IntoExpr,
+    dte: IntoExpr,
+    is_call: IntoExpr,
+) -> pl.Expr:
+    """
+    Black implied volatility, null where an input is null or not finite, or the price
+    has none: at or below intrinsic value, at or above the forward (calls) or strike
+    (puts), or at expiration.
+
+    Args:
+        price: Option price
+        forward: Forward of the underlying at expiration
+        strike: Strike in the price's unit
+        dte: Time to expiration in years
+        is_call: Whether the option is a call
+
+    Returns:
+        Float64 expression
+    """
+    return register_plugin_function(
+        plugin_path=_plugin_path(),
+        function_name="implied_vol",
+        args=[price, forward, strike, dte, is_call],
+        is_elementwise=True,
+    )
+
+
+def greeks(
+    spot: IntoExpr,
+    strike: IntoExpr,
+    dte: IntoExpr,
+    volatility: IntoExpr,
+    risk_free_rate: IntoExpr,
+    is_call: IntoExpr,
+) -> pl.Expr:
+    """
+    Black-Scholes greeks as a struct of GREEK_COLUMNS, null where an input is null or
+    not finite, or the spot, strike, volatility or time to expiration is not positive.
+    Theta is per day, vega and rho per percentage point.
+
+    Args:
+        spot: Price of the underlying
+        strike: Strike in the spot's unit
+        dte: Time to expiration in years
+        volatility: Volatility, e.g. an implied_vol expression
+        risk_free_rate: Decimal risk free rate
+        is_call: Whether the option is a call
+
+    Returns:
+        Struct expression, expand it with .struct.unnest()
+    """
+    return register_plugin_function(
+        plugin_path=_plugin_path(),
+        function_name="greeks",
+        args=[spot, strike, dte, volatility, risk_free_rate, is_call],
+        is_elementwise=True,
+    )
+
+
+def iv_and_greeks(
+    price: IntoExpr,
+    forward: IntoExpr,
+    strike: IntoExpr,
+    dte: IntoExpr,
+    is_call: IntoExpr,
+    spot: IntoExpr,
+    risk_free_rate: IntoExpr,
+) -> pl.Expr:
+    """
+    Implied volatility with first and second order greeks in one pass over the inputs,
+    as a struct of IV_AND_GREEK_COLUMNS. Vanna and volga are per percentage point of
+    volatility, charm per day. Null where implied_vol or greeks is.
+
+    Args:
+        price: Option price
+        forward: Forward of the underlying at expiration
+        strike: Strike in the price's unit
+        dte: Time to expiration in years
+        is_call: Whether the option is a call
+        spot: Price of the underlying
+        risk_free_rate: Decimal risk free rate
+
+    Returns:
+        Struct expression, expand it with .struct.unnest()
+    """
+    return register_plugin_function(
+        plugin_path=_plugin_path(),
+        function_name="iv_and_greeks",
+        args=[price, forward, strike, dte, is_call, spot, risk_free_rate],
+        is_elementwise=True,
+    )
@@ -3,10 +3,24 @@ import logging
 
 import polars as pl
 
-from betedge_data.client.minio import MinIOConfig, get_minio_storage_options
+from betedge_data.client.config import get_settings
+from betedge_data.client.requests import (
+    DATA_OBJECT,
+    UNDERLYING_OBJECT,
+    LakeLayout,
+    convert_layout,
+    object_key,
+)
+from betedge_data.contracts import contract_key
+from betedge_data.manifest import LakeManifest
+
+from betedge_processing.processing import join_underlying
 
 logger = logging.getLogger()
 
+# Key prefix of the option EOD objects OptionRequest writes
+EOD_BASE_KEY = "historical-options/eod/monthly/1d"
+
 
 def glob_eod(
     ticker: str,
@@ -15,6 +29,8 @@ def glob_eod(
     get_all: bool = False,
     ext: str = "parquet",
     bucket: str = "betedge-data",
+    layout: Optional[str | LakeLayout] = None,
+    underlying: bool = False,
 ) -> List[str]:
     """
     Generate glob patterns for EOD options data.
@@ -25,6 +41,9 @@ def glob_eod(
         end_yearmo: End year-month as YYYYMM (e.g., 202403)
         get_all: If True, get all data for ticker
         ext: File extension
+        layout: Lake key layout, GeneralConfig.lake_layout when None
+        underlying: Match the underlying stock objects written next to the option files
+            with GeneralConfig.split_underlying instead of the option files
 
     Returns:
         List of glob patterns
@@ -32,16 +51,25 @@ def glob_eod(
     if not start_yearmo and not end_yearmo and not get_all:
         raise ValueError("At least start_yearmo must be provided if get_all is False.")
 
-    base_path = f"{bucket}/historical-options/eod/{ticker}"
+    layout = convert_layout(layout)
+    base_path = f"{bucket}/{EOD_BASE_KEY}"
+
+    filename = UNDERLYING_OBJECT if underlying else DATA_OBJECT
+    filename = filename.replace(".parquet", f".{ext}")
+
+    def month_path(year: int | str, month: str) -> str:
+        return object_key(
+            base_path, ticker, str(year), str(month), layout=layout, filename=filename
+        )
 
     if get_all:
-        return [f"{base_path}/*/*/data.{ext}"]
+        return [month_path("*", "*")]
 
     # Handle single yearmo
     if start_yearmo and not end_yearmo:
         year = start_yearmo // 100
         month = start_yearmo % 100
-        return [f"{base_path}/{year}/{month:02d}/data.{ext}"]
+        return [month_path(year, f"{month:02d}")]
 
     # Handle range
     if start_yearmo and end_yearmo:
@@ -51,7 +79,7 @@ def glob_eod(
         while current <= end:
             year = current // 100
             month = current % 100
-            patterns.append(f"{base_path}/{year}/{month:02d}/data.{ext}")
+            patterns.append(month_path(year, f"{month:02d}"))
 
             # Increment month
             if month == 12:
@@ -64,8 +92,183 @@ def glob_eod(
     return []
 
 
+def manifest_eod_keys(
+    manifest: LakeManifest,
+    ticker: str,
+    start_yearmo: Optional[int] = None,
+    end_yearmo: Optional[int] = None,
+    underlying: bool = False,
+) -> List[str]:
+    """
+    Keys of the EOD option objects of a ticker between two months, inclusive, that the
+    manifest records, found without listing the lake.
+
+    Args:
+        manifest: LakeManifest of the writer that wrote the objects
+        ticker: Stock symbol (e.g., "SPY")
+        start_yearmo: First year-month as YYYYMM, every month when None
+        end_yearmo: Last year-month as YYYYMM, start_yearmo when None
+        underlying: The underlying stock objects instead of the option files
+
+    Returns:
+        Sorted object keys
+    """
+    filename = UNDERLYING_OBJECT if underlying else DATA_OBJECT
+    end_yearmo = end_yearmo or start_yearmo
+    entries = manifest.query(
+        root=ticker,
+        start_date=start_yearmo * 100 + 1 if start_yearmo else None,
+        end_date=end_yearmo * 100 + 31 if end_yearmo else None,
+    )
+    return sorted(
+        entry.object_key
+        for entry in entries
+        if entry.object_key.startswith(f"{EOD_BASE_KEY}/")
+        and entry.object_key.endswith(f"/{filename}")
+    )
+
+
+def scan_eod_data(
+    patterns: List[str], layout: Optional[str | LakeLayout] = None
+) -> pl.LazyFrame:
+    """
+    Lazily scan EOD options data, pushing filters and column selections into the scan.
+
+    Args:
+        patterns: Object paths or glob patterns from glob_eod
+        layout: Lake key layout, GeneralConfig.lake_layout when None. Hive layout paths
+            add their root, year and month partition columns.
+
+    Returns:
+        LazyFrame over every matching object
+    """
+    opts = get_settings().minio.get_minio_storage_options()
+    return pl.scan_parquet(
+        [f"s3://{pattern}" for pattern in patterns],
+        storage_options=opts,
+        hive_partitioning=convert_layout(layout) == LakeLayout.HIVE,
+    )
+
+
+def scan_eod(
+    ticker: str,
+    start_yearmo: Optional[int] = None,
+    end_yearmo: Optional[int] = None,
+    bucket: str = "betedge-data",
+    layout: Optional[str | LakeLayout] = None,
+    underlying: bool = False,
+    manifest: Optional[LakeManifest] = None,
+) -> pl.LazyFrame:
+    """
+    Lazily scan EOD options data of a ticker between two months, inclusive.
+
+    With a manifest the scan covers the objects it records in the range. Otherwise,
+    with the hive layout this is a single glob whose year and month partitions are
+    pruned by the scan, and with the legacy layout one path per month.
+
+    Args:
+        ticker: Stock symbol (e.g., "SPY")
+        start_yearmo: First year-month as YYYYMM, every month when None
+        end_yearmo: Last year-month as YYYYMM, start_yearmo when None
+        bucket: Bucket of the lake
+        layout: Lake key layout, GeneralConfig.lake_layout when None
+        underlying: Scan the underlying stock objects instead of the option files
+        manifest: LakeManifest to take the objects from instead of globbing the lake
+
+    Returns:
+        LazyFrame over the ticker's objects in the month range
+
+    Raises:
+        FileNotFoundError: If a manifest is given and records none of the objects
+    """
+    layout = convert_layout(layout)
+    if manifest is not None:
+        keys = manifest_eod_keys(
+            manifest, ticker, start_yearmo, end_yearmo, underlying=underlying
+        )
+        if not keys:
+            raise FileNotFoundError(
+                f"The manifest records no EOD objects of {ticker} in the range"
+            )
+        return scan_eod_data([f"{bucket}/{key}" for key in keys], layout)
+    if layout == LakeLayout.LEGACY or start_yearmo is None:
+        patterns = glob_eod(
+            ticker,
+            start_yearmo,
+            end_yearmo or start_yearmo,
+            get_all=start_yearmo is None,
+            bucket=bucket,
+            layout=layout,
+            underlying=underlying,
+        )
+        return scan_eod_data(patterns, layout)
+
+    patterns = glob_eod(
+        ticker, get_all=True, bucket=bucket, layout=layout, underlying=underlying
+    )
+    lf = scan_eod_data(patterns, layout)
+    yearmo = pl.col("year") * 100 + pl.col("month")
+    return lf.filter(yearmo.is_between(start_yearmo, end_yearmo or start_yearmo))
+
+
+def scan_eod_pair(
+    ticker: str,
+    start_yearmo: Optional[int] = None,
+    end_yearmo: Optional[int] = None,
+    bucket: str = "betedge-data",
+    layout: Optional[str | LakeLayout] = None,
+    manifest: Optional[LakeManifest] = None,
+) -> pl.LazyFrame:
+    """
+    Lazily scan EOD options data of a ticker paired with its underlying, for option
+    files written with GeneralConfig.split_underlying. See scan_eod for the arguments.
+
+    Returns:
+        LazyFrame of the option rows with the underlying's columns suffixed '_right',
+        as join_stock returns for combined files
+    """
+    options = scan_eod(
+        ticker, start_yearmo, end_yearmo, bucket, layout, manifest=manifest
+    )
+    underlying = scan_eod(
+        ticker,
+        start_yearmo,
+        end_yearmo,
+        bucket,
+        layout,
+        underlying=True,
+        manifest=manifest,
+    )
+    return join_underlying(options, underlying)
+
+
+def scan_contracts(
+    ticker: str,
+    bucket: str = "betedge-data",
+    layout: Optional[str | LakeLayout] = None,
+) -> pl.LazyFrame:
+    """
+    Lazily scan the contract dimension of a ticker, written with GeneralConfig.contract_ids.
+
+    Args:
+        ticker: Stock symbol (e.g., "SPY")
+        bucket: Bucket of the lake
+        layout: Lake key layout, GeneralConfig.lake_layout when None
+
+    Returns:
+        LazyFrame of contract_id, root, expiration, strike and right
+    """
+    opts = get_settings().minio.get_minio_storage_options()
+    # The dimension carries its root column, the hive root partition would duplicate it
+    return pl.scan_parquet(
+        f"s3://{bucket}/{contract_key(ticker, layout)}",
+        storage_options=opts,
+        hive_partitioning=False,
+    )
+
+
 def load_eod_data(patterns: List[str], raise_err: bool = True) -> pl.DataFrame:
-    opts = get_minio_storage_options(MinIOConfig())
+    opts = get_settings().minio.get_minio_storage_options()
 
     if len(patterns) == 1:
         return pl.read_parquet(f"s3://{patterns[0]}", storage_options=opts)
@@ -0,0 +1,471 @@
+"""
+Incremental materialisation of the silver option layer.
+
+Every bronze option object becomes one silver partition at enriched_key(object key): the
+option rows with their underlying's quote, mid, spread, days to expiration, the risk
+free rate and forward of the date and, when the native extension is built, implied
+volatility and greeks.
+
+A partition is recomputed only when the ETag of one of its sources (the option object,
+its underlying companion and the year's T-bill rates) or the silver code version differs
+from the watermark recorded when it was last materialised. The root's contract dimension
+only ever appends ids, so it is not a source: the watermark records how many contracts
+the dimension held instead, and the partition stays current while that covered its
+highest contract_id. Stale partitions are recomputed in parallel, each streamed from the
+bronze scan to the lake with sink_parquet.
+
+The partitions live under their own prefix rather than next to the silver objects the
+ingest writes with materialize_silver enabled, whose columns differ.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import polars as pl
+from minio import Minio
+from minio.error import S3Error
+
+from betedge_data.client.requests import (
+    DATA_OBJECT,
+    UNDERLYING_OBJECT,
+    LakeLayout,
+    convert_layout,
+)
+from betedge_data.contracts import ContractDimension, contract_key
+from betedge_data.silver import enriched_key, silver_frame, underlying_column
+from betedge_processing.expressions import HAS_NATIVE, set_native_threads
+from betedge_processing.processing import add_iv_and_greeks
+
+logger = logging.getLogger(__name__)
+
+# Bump when the silver columns or their computation change, every partition is then
+# recomputed on the next run
+SILVER_VERSION = 2
+
+# Objects written by scripts/get_tbill_rates.py, one per year with percent rates
+RATES_PREFIX = "tbill-rates/"
+
+
+def code_version() -> str:
+    """Version of the silver computation, which columns it adds depends on the extension."""
+    return f"{SILVER_VERSION}+{'native' if HAS_NATIVE else 'base'}"
+
+
+@dataclass(slots=True)
+class SilverPartition:
+    """One silver object and the bronze objects it is computed from."""
+
+    silver_key: str
+    option_key: str
+    root: str
+    # ETag per source object key
+    sources: Dict[str, str]
+    underlying_key: Optional[str] = None
+    contracts_key: Optional[str] = None
+    # Contracts in the root's dimension when the partition was planned
+    contract_count: int = 0
+
+
+@dataclass(slots=True)
+class Watermark:
+    """Sources and code version a silver partition was last materialised from."""
+
+    silver_key: str
+    sources: Dict[str, str]
+    code_version: str
+    byte_size: int
+    computed_at: float = field(default_factory=time.time)
+    # Contracts in the root's dimension and highest contract_id of the option object
+    contract_count: int = 0
+    max_contract_id: int = 0
+
+    def covers_contracts(self, partition: "SilverPartition") -> bool:
+        """
+        Whether the contract attributes of the partition were complete when computed.
+
+        Ids never change, so a dimension that held every id of the option object gave
+        every row its attributes. Otherwise a recompute only helps once it grew.
+        """
+        return (
+            self.contract_count >= self.max_contract_id
+            or self.contract_count == partition.contract_count
+        )
+
+
+@dataclass(slots=True)
+class MaterializeSummary:
+    """Outcome of a materialize_silver run."""
+
+    computed: int = 0
+    up_to_date: int = 0
+    failed: int = 0
+    bytes_written: int = 0
+
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    silver_key TEXT PRIMARY KEY,
+    sources TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    byte_size INTEGER NOT NULL,
+    computed_at REAL NOT NULL,
+    contract_count INTEGER NOT NULL DEFAULT 0,
+    max_contract_id INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Columns added after the table was first released, with their declaration
+_ADDED_COLUMNS = {
+    "contract_count": "INTEGER NOT NULL DEFAULT 0",
+    "max_contract_id": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+class SilverWatermarks:
+    """SQLite store of the Watermark of every materialised silver partition."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Location of the SQLite database, created if missing
+        """
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(_CREATE_TABLE)
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(watermarks)")
+            }
+            for name, declaration in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    self._conn.execute(
+                        f"ALTER TABLE watermarks ADD COLUMN {name} {declaration}"
+                    )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, silver_key: str) -> Optional[Watermark]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT silver_key, sources, code_version, byte_size, computed_at, "
+                "contract_count, max_contract_id FROM watermarks WHERE silver_key = ?",
+                (silver_key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return Watermark(row[0], json.loads(row[1]), *row[2:])
+
+    def record(self, watermark: Watermark) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks "
+                "(silver_key, sources, code_version, byte_size, computed_at, "
+                "contract_count, max_contract_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    watermark.silver_key,
+                    json.dumps(watermark.sources, sort_keys=True),
+                    watermark.code_version,
+                    watermark.byte_size,
+                    watermark.computed_at,
+                    watermark.contract_count,
+                    watermark.max_contract_id,
+                ),
+            )
+
+    def is_current(self, partition: SilverPartition) -> bool:
+        """Whether a partition was materialised from its current sources and code."""
+        watermark = self.get(partition.silver_key)
+        return (
+            watermark is not None
+            and watermark.sources == partition.sources
+            and watermark.code_version == code_version()
+            and (
+                partition.contracts_key is None or watermark.covers_contracts(partition)
+            )
+        )
+
+
+def _contract_count(
+    minio_client: Minio, bucket: str, root: str, key: str
+) -> Optional[int]:
+    """Contracts in a dimension object, None when it does not exist."""
+    try:
+        minio_client.stat_object(bucket, key)
+    except S3Error as e:
+        if e.code == "NoSuchKey":
+            return None
+        raise
+    return len(ContractDimension(root, minio_client, bucket, key).load())
+
+
+def _partition_year(relative_key: str) -> Optional[int]:
+    """Year of an object key relative to its root, '2024/03/...' or 'year=2024/...'."""
+    first = relative_key.split("/", 1)[0].removeprefix("year=")
+    return int(first) if first.isdigit() else None
+
+
+def plan_silver(
+    minio_client: Minio,
+    bucket: str,
+    base_key: str,
+    roots: Iterable[str],
+    layout: Optional[str | LakeLayout] = None,
+) -> Tuple[List[SilverPartition], Dict[int, str]]:
+    """
+    List the silver partitions of the bronze option objects of some roots.
+
+    Args:
+        minio_client: Client of the lake
+        bucket: Bucket of the lake
+        base_key: Key prefix of the option objects before the root, e.g.
+            'historical-options/eod/monthly/1d'
+        roots: Underlying symbols
+        layout: Key layout of the lake, GeneralConfig.lake_layout when None
+
+    Returns:
+        The partitions, and the T-bill rates object key per year
+    """
+    layout = convert_layout(layout)
+    rates = {}
+    rate_etags = {}
+    for obj in minio_client.list_objects(bucket, prefix=RATES_PREFIX, recursive=True):
+        year = _partition_year(obj.object_name.removeprefix(RATES_PREFIX))
+        if year is not None:
+            rates[year] = obj.object_name
+            rate_etags[year] = obj.etag
+
+    partitions = []
+    for root in roots:
+        prefix = (
+            f"{base_key}/root={root}/"
+            if layout == LakeLayout.HIVE
+            else f"{base_key}/{root}/"
+        )
+        objects = {
+            obj.object_name: obj.etag
+            for obj in minio_client.list_objects(bucket, prefix=prefix, recursive=True)
+            if not obj.is_dir
+        }
+        dimension = contract_key(root, layout)
+        contract_count = _contract_count(minio_client, bucket, root, dimension)
+
+        for key, etag in sorted(objects.items()):
+            directory, _, name = key.rpartition("/")
+            if name != DATA_OBJECT:
+                continue
+            sources = {key: etag}
+            underlying = f"{directory}/{UNDERLYING_OBJECT}"
+            if underlying in objects:
+                sources[underlying] = objects[underlying]
+            else:
+                underlying = None
+            year = _partition_year(key.removeprefix(prefix))
+            if year in rates:
+                sources[rates[year]] = rate_etags[year]
+            partitions.append(
+                SilverPartition(
+                    silver_key=enriched_key(key),
+                    option_key=key,
+                    root=root,
+                    sources=sources,
+                    underlying_key=underlying,
+                    contracts_key=dimension if contract_count is not None else None,
+                    contract_count=contract_count or 0,
+                )
+            )
+    return partitions, rates
+
+
+def scan_rates(
+    bucket: str, rates: Dict[int, str], storage_options: Dict[str, str]
+) -> Optional[pl.LazyFrame]:
+    """Monthly risk free rates as yearmo (YYYYMM) and risk_free_rate (decimal)."""
+    if not rates:
+        return None
+    return pl.scan_parquet(
+        [f"s3://{bucket}/{key}" for key in rates.values()],
+        storage_options=storage_options,
+    ).select(
+        (pl.col("year").cast(pl.Int32) * 100 + pl.col("month").cast(pl.Int32)).alias(
+            "yearmo"
+        ),
+        (pl.col("rate").cast(pl.Float64) / 100).alias("risk_free_rate"),
+    )
+
+
+def add_forward(
+    df: pl.LazyFrame, rates: Optional[pl.LazyFrame], default_rate: float = 0.0
+) -> pl.LazyFrame:
+    """
+    Add the month's risk free rate, the time to expiration in years and the forward of
+    the underlying's mid, without dividends.
+    """
+    if rates is None:
+        df = df.with_columns(pl.lit(default_rate).alias("risk_free_rate"))
+    else:
+        df = (
+            df.with_columns((pl.col("date") // 100).cast(pl.Int32).alias("yearmo"))
+            .join(rates, on="yearmo", how="left")
+            .drop("yearmo")
+            .with_columns(pl.col("risk_free_rate").fill_null(default_rate))
+        )
+    df = df.with_columns((pl.col("days_between") / 365.0).alias("time_to_expiry"))
+    return df.with_columns(
+        (
+            pl.col("underlying_mid")
+            * (pl.col("risk_free_rate") * pl.col("time_to_expiry")).exp()
+        ).alias("forward")
+    )
+
+
+def silver_partition_frame(
+    partition: SilverPartition,
+    bucket: str,
+    storage_options: Dict[str, str],
+    rates: Optional[pl.LazyFrame] = None,
+    default_rate: float = 0.0,
+) -> pl.LazyFrame:
+    """Lazy silver rows of a partition, streamed from its bronze objects."""
+
+    def scan(key: str) -> pl.LazyFrame:
+        # Partition columns stay in the keys, the silver keys mirror them
+        return pl.scan_parquet(
+            f"s3://{bucket}/{key}",
+            storage_options=storage_options,
+            hive_partitioning=False,
+        )
+
+    options = scan(partition.option_key)
+    if partition.underlying_key is not None:
+        underlying = scan(partition.underlying_key)
+    else:
+        column = underlying_column(options.collect_schema().names())
+        underlying = options.filter(pl.col(column) == 0)
+        options = options.filter(pl.col(column) != 0)
+    contracts = scan(partition.contracts_key) if partition.contracts_key else None
+
+    lf = add_forward(silver_frame(options, underlying, contracts), rates, default_rate)
+    if HAS_NATIVE:
+        lf = add_iv_and_greeks(lf)
+    return lf
+
+
+def materialize_silver(
+    minio_client: Minio,
+    bucket: str,
+    storage_options: Dict[str, str],
+    base_key: str,
+    roots: Iterable[str],
+    watermarks: SilverWatermarks,
+    layout: Optional[str | LakeLayout] = None,
+    workers: int = 4,
+    force: bool = False,
+    dry_run: bool = False,
+    default_rate: float = 0.0,
+    native_threads: Optional[int] = None,
+) -> MaterializeSummary:
+    """
+    Recompute the silver partitions whose sources or code changed since their watermark.
+
+    Args:
+        minio_client: Client of the lake
+        bucket: Bucket of the lake
+        storage_options: Polars storage options of the lake
+        base_key: Key prefix of the option objects before the root
+        roots: Underlying symbols
+        watermarks: Store of the partitions' watermarks, updated as partitions complete
+        layout: Key layout of the lake, GeneralConfig.lake_layout when None
+        workers: Partitions computed concurrently
+        force: Recompute every partition
+        dry_run: Only log the partitions that would be computed
+        default_rate: Risk free rate of months without a T-bill rate
+        native_threads: Threads of the native IV and greeks kernels, their default pool
+            when None
+
+    Returns:
+        MaterializeSummary of the run
+    """
+    partitions, rate_keys = plan_silver(minio_client, bucket, base_key, roots, layout)
+    stale = [p for p in partitions if force or not watermarks.is_current(p)]
+    summary = MaterializeSummary(up_to_date=len(partitions) - len(stale))
+    logger.info(
+        f"{len(stale)} of {len(partitions)} silver partitions under {base_key} are stale"
+    )
+    if dry_run:
+        for partition in stale:
+            logger.info(f"Would materialise {partition.silver_key}")
+        return summary
+
+    if native_threads is not None and HAS_NATIVE:
+        set_native_threads(native_threads)
+    rates = scan_rates(bucket, rate_keys, storage_options)
+    version = code_version()
+
+    def materialize_one(partition: SilverPartition) -> int:
+        started = time.perf_counter()
+        max_contract_id = 0
+        if partition.contracts_key is not None:
+            max_contract_id = (
+                pl.scan_parquet(
+                    f"s3://{bucket}/{partition.option_key}",
+                    storage_options=storage_options,
+                    hive_partitioning=False,
+                )
+                .select(pl.col("contract_id").max())
+                .collect()
+                .item()
+            ) or 0
+        lf = silver_partition_frame(
+            partition, bucket, storage_options, rates, default_rate
+        )
+        lf.sink_parquet(
+            f"s3://{bucket}/{partition.silver_key}", storage_options=storage_options
+        )
+        size = minio_client.stat_object(bucket, partition.silver_key).size
+        watermarks.record(
+            Watermark(
+                partition.silver_key,
+                partition.sources,
+                version,
+                size,
+                contract_count=partition.contract_count,
+                max_contract_id=max_contract_id,
+            )
+        )
+        logger.info(
+            f"Materialised {partition.silver_key} ({size} bytes) in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+        return size
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(materialize_one, p): p for p in stale}
+        for future, partition in futures.items():
+            try:
+                size = future.result()
+            except Exception as e:
+                summary.failed += 1
+                logger.error(f"Failed to materialise {partition.silver_key}: {e}")
+                continue
+            summary.computed += 1
+            summary.bytes_written += size
+
+    logger.info(
+        f"Materialised {summary.computed} silver partitions ({summary.bytes_written} "
+        f"bytes), {summary.up_to_date} up to date, {summary.failed} failed"
+    )
+    return summary
@@ -1,31 +1,84 @@
 import polars as pl
 
+# Shared with the silver objects materialised at ingest
+from betedge_data.silver import calc_dte, calc_mid_and_spread  # noqa: F401
 
-def calc_mid_and_spread(df: pl.LazyFrame) -> pl.LazyFrame:
-    df = df.filter((pl.col("bid_size") > 0) & (pl.col("ask_size") > 0)).with_columns(
-        [
-            ((pl.col("bid") + pl.col("ask")) / 2).alias("mid"),
-            (pl.col("bid") - pl.col("ask")).abs().alias("spread"),
-        ]
-    )
+from betedge_processing.expressions import iv_and_greeks
 
-    return df
+CONTRACT_COLUMNS = ["root", "expiration", "strike", "right"]
 
 
 def join_stock(df: pl.LazyFrame) -> pl.LazyFrame:
+    """Pair option rows with the stock rows of the same combined option file."""
     stock = df.filter(pl.col("expiration") == 0)
     joined = df.filter(pl.col("expiration") != 0).join(stock, on=["ms_of_day", "date"])
     return joined
 
 
-def calc_dte(df: pl.LazyFrame) -> pl.LazyFrame:
+def join_underlying(options: pl.LazyFrame, underlying: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Pair option rows with the rows of the underlying objects written next to the option
+    files with GeneralConfig.split_underlying, the counterpart of join_stock.
+
+    Neither side is filtered, each scan only reads its own objects.
+    """
+    return options.join(underlying, on=["ms_of_day", "date"])
+
+
+def join_contracts(df: pl.LazyFrame, contracts: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Restore root, expiration, strike and right of option data written with contract ids.
+
+    Frames without a contract_id column are returned unchanged, so the same pipeline
+    reads files written either way. Filter with filter_contracts before joining to let
+    the scan skip row groups of other contracts.
+    """
+    names = df.collect_schema().names()
+    if "contract_id" not in names:
+        return df
+    # A hive scan already has the root partition column
+    contracts = contracts.select(
+        ["contract_id"] + [c for c in CONTRACT_COLUMNS if c not in names]
+    )
+    joined = df.join(contracts, on="contract_id", how="left").drop("contract_id")
+    return joined.select(
+        CONTRACT_COLUMNS
+        + [c for c in names if c not in CONTRACT_COLUMNS + ["contract_id"]]
+    )
+
+
+def filter_contracts(
+    df: pl.LazyFrame, contracts: pl.LazyFrame, predicate: pl.Expr
+) -> pl.LazyFrame:
+    """
+    Keep the rows of contract id encoded option data whose contract matches a predicate
+    on the contract columns, e.g. pl.col("strike").is_between(400_000, 450_000).
+
+    The dimension is small and collected here, the matching ids then filter the fact
+    scan where row group statistics and bloom filters on contract_id prune it.
+    """
+    ids = contracts.filter(predicate).select("contract_id").collect().to_series()
+    return df.filter(pl.col("contract_id").is_in(ids.implode()))
+
+
+def add_iv_and_greeks(df: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Add implied_volatility with the first and second order greeks to silver rows with a
+    forward, time_to_expiry and risk_free_rate, see
+    betedge_processing.materialize.add_forward.
+
+    The fused native expression runs inside the lazy plan, so the frame can be
+    streamed. Rows the Black model cannot price are null.
+    """
+    # Strikes are in tenths of a cent
     return df.with_columns(
-        [
-            (
-                pl.col("expiration").cast(pl.Utf8).str.strptime(pl.Date, "%Y%m%d")
-                - pl.col("date").cast(pl.Utf8).str.strptime(pl.Date, "%Y%m%d")
-            )
-            .dt.total_days()
-            .alias("days_between")
-        ]
+        iv_and_greeks(
+            "mid",
+            "forward",
+            pl.col("strike") / 1000,
+            "time_to_expiry",
+            pl.col("right") == "C",
+            "underlying_mid",
+            "risk_free_rate",
+        ).struct.unnest()
     )
@@ -3,6 +3,7 @@ from io import StringIO
 
 import pandas as pd
 
+
 def get_index_tickers(index_name):
     urls = {
         "sp500": "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies",
@@ -43,4 +44,4 @@ def get_index_tickers(index_name):
             if col in tables[0].columns:
                 return tables[0][col].tolist()
 
-    return []
\ No newline at end of file
+    return []
@@ -1,30 +1,33 @@
 """Quick script that runs in 15s and gets an approximation for risk free rates that I can run once month."""
+
 from io import BytesIO
 from collections import defaultdict
 from typing import List
 from dataclasses import dataclass
 
 import httpx
-import pyarrow as pa 
-import pyarrow.parquet as pq 
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from betedge_data import BetEdgeClient
 
 CLIENT = BetEdgeClient()
 
+
 @dataclass
 class TBillEntry:
     year: str
     month: str
     rate: float
 
+
 def get_tbill_responses() -> List[TBillEntry]:
     client = httpx.Client(
-                timeout=60,
-                limits=httpx.Limits(
-                    max_connections=4,
-                    max_keepalive_connections=4,
-                )
+        timeout=60,
+        limits=httpx.Limits(
+            max_connections=4,
+            max_keepalive_connections=4,
+        ),
     )
 
     base_url = "https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v2/accounting/od/avg_interest_rates"
@@ -32,7 +35,6 @@ def get_tbill_responses() -> List[TBillEntry]:
     tbill_responses = []
     next_link = "&page%5Bnumber%5D=1&page%5Bsize%5D=100"
     while next_link is not None:
-
         response = client.get(base_url + "?" + next_link)
         resp_json = response.json()
         data = resp_json["data"]
@@ -41,17 +43,19 @@ def get_tbill_responses() -> List[TBillEntry]:
                 tbill = TBillEntry(
                     year=entry["record_calendar_year"],
                     month=entry["record_calendar_month"],
-                    rate=float(entry["avg_interest_rate_amt"])
+                    rate=float(entry["avg_interest_rate_amt"]),
                 )
                 tbill_responses.append(tbill)
-        
+
         links = resp_json["links"]
         next_link = links["next"]
 
     return tbill_responses
 
 
-def write_file_with_client(client: BetEdgeClient, buffer: BytesIO, object_key: str) -> None:
+def write_file_with_client(
+    client: BetEdgeClient, buffer: BytesIO, object_key: str
+) -> None:
     minio_client = client.minio_client
     size = len(buffer.getvalue())
 
@@ -63,6 +67,7 @@ def write_file_with_client(client: BetEdgeClient, buffer: BytesIO, object_key: s
         content_type="application/octet-stream",
     )
 
+
 def write_tables(tbill_responses: List[TBillEntry]) -> None:
 
     entries_by_year = defaultdict(list)
@@ -74,24 +79,21 @@ def write_tables(tbill_responses: List[TBillEntry]) -> None:
         months = [entry.month for entry in year_entries]
         rates = [entry.rate for entry in year_entries]
         years = [entry.year for entry in year_entries]
-        
+
         # Create PyArrow table
-        table = pa.table({
-            'year': years,
-            'month': months,
-            'rate': rates
-        })
-        
+        table = pa.table({"year": years, "month": months, "rate": rates})
+
         yearly_tables[year] = table
 
     for year, table in yearly_tables.items():
         buffer = BytesIO()
         pq.write_table(table, buffer)
         buffer.seek(0)
-        
+
         object_key = f"tbill-rates/{year}/data.parquet"
         write_file_with_client(CLIENT, buffer, object_key)
 
+
 if __name__ == "__main__":
     resp = get_tbill_responses()
-    write_tables(resp)
\ No newline at end of file
+    write_tables(resp)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Materialise the silver option partitions whose bronze sources changed since the last run.
+
+Each bronze option object under --base-key becomes silver-enriched/<object key> with mid, spread,
+days to expiration, the risk free rate and forward, and implied volatility and greeks
+when the native extension is built. Source ETags and the code version of every partition
+are kept in --watermarks, so reruns only recompute new or changed partitions.
+"""
+
+import argparse
+import logging
+
+from minio import Minio
+
+from betedge_data.client.config import get_settings
+from betedge_processing.materialize import SilverWatermarks, materialize_silver
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--base-key",
+        default="historical-options/eod/monthly/1d",
+        help="Key prefix of the bronze option objects before the root",
+    )
+    parser.add_argument(
+        "--root", action="append", required=True, help="May be repeated"
+    )
+    parser.add_argument("--bucket", default=settings.minio.bucket)
+    parser.add_argument("--watermarks", default="~/.betedge/silver.sqlite")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--default-rate",
+        type=float,
+        default=0.0,
+        help="Risk free rate (decimal) of months without a T-bill rate in the lake",
+    )
+    parser.add_argument(
+        "--native-threads",
+        type=int,
+        help="Threads of the native IV and greeks kernels, 0 for one per core",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Recompute every partition"
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    minio_client = Minio(
+        endpoint=settings.minio.endpoint,
+        access_key=settings.minio.access_key,
+        secret_key=settings.minio.secret_key,
+        secure=settings.minio.secure,
+        region="us-east-1",
+    )
+    watermarks = SilverWatermarks(args.watermarks)
+
+    try:
+        summary = materialize_silver(
+            minio_client,
+            args.bucket,
+            settings.minio.get_minio_storage_options(),
+            args.base_key,
+            args.root,
+            watermarks,
+            workers=args.workers,
+            force=args.force,
+            dry_run=args.dry_run,
+            default_rate=args.default_rate,
+            native_threads=args.native_threads,
+        )
+    finally:
+        watermarks.close()
+    print(summary)
+    if summary.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
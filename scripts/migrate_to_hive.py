@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Copy the lake from the legacy key layout (.../SPY/2024/03/data.parquet) to the hive layout
+(.../root=SPY/year=2024/month=03/data.parquet).
+
+Run with --dry-run first. Set GeneralConfig.lake_layout to 'hive' (LAKE_LAYOUT=hive) once
+the copies are done, then rerun with --delete-source to drop the legacy objects.
+"""
+
+import argparse
+import logging
+
+from minio import Minio
+
+from betedge_data.client.config import get_settings
+from betedge_data.manifest import LakeManifest
+from betedge_data.migrate import LAKE_PREFIXES, migrate_to_hive
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--prefix",
+        action="append",
+        help=f"Key prefix to migrate, may be repeated. Default: {', '.join(LAKE_PREFIXES)}",
+    )
+    parser.add_argument("--bucket", default=settings.minio.bucket)
+    parser.add_argument(
+        "--manifest",
+        default=settings.general.manifest_path,
+        help="Lake manifest whose entries are moved to the new keys",
+    )
+    parser.add_argument("--delete-source", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    minio_client = Minio(
+        endpoint=settings.minio.endpoint,
+        access_key=settings.minio.access_key,
+        secret_key=settings.minio.secret_key,
+        secure=settings.minio.secure,
+        region="us-east-1",
+    )
+    manifest = LakeManifest(args.manifest) if args.manifest else None
+
+    summary = migrate_to_hive(
+        minio_client,
+        args.bucket,
+        prefixes=args.prefix or LAKE_PREFIXES,
+        delete_source=args.delete_source,
+        dry_run=args.dry_run,
+        manifest=manifest,
+        workers=args.workers,
+    )
+    print(summary)
+    if summary.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
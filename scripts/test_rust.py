@@ -1 +1,330 @@
-from betedge_processing._native import add_implied_volatility
+"""
+Checks of the native implied volatility and greeks kernels, run after building the
+extension with `uv sync` or `maturin develop -r` in packages/betedge-processing.
+"""
+
+import math
+import random
+import warnings
+
+import polars as pl
+
+from betedge_processing._native import (
+    add_greeks,
+    add_implied_volatility,
+    add_iv_and_greeks,
+    get_num_threads,
+)
+from betedge_processing.expressions import (
+    greeks,
+    implied_vol,
+    iv_and_greeks,
+    set_native_threads,
+)
+
+# A multiple of the kernels' 8192 row work unit plus a partial unit
+ROWS = 3 * 8192 + 100
+
+
+# The kernels' normal CDF approximation has an absolute error below 7.5e-8
+GREEK_TOLERANCE = 1e-7
+
+# spot, strike, dte, vol, is_call; calls and puts at the money, deep in and out of the
+# money and an hour from expiry
+GREEK_CASES = [
+    (100.0, 100.0, 0.5, 0.2, True),
+    (100.0, 100.0, 0.5, 0.2, False),
+    (100.0, 60.0, 0.25, 0.3, True),
+    (100.0, 160.0, 0.25, 0.3, True),
+    (100.0, 160.0, 0.25, 0.3, False),
+    (100.0, 60.0, 0.25, 0.3, False),
+    (100.0, 101.0, 1 / 365 / 24, 0.25, True),
+    (100.0, 99.0, 1 / 365 / 24, 0.25, False),
+]
+
+
+def norm_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def norm_pdf(x: float) -> float:
+    return math.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def reference_greeks(
+    spot: float, strike: float, dte: float, rate: float, vol: float, is_call: bool
+) -> dict[str, float]:
+    """Closed form Black-Scholes greeks in the kernels' units, with an exact CDF."""
+    sqrt_t = math.sqrt(dte)
+    d1 = (math.log(spot / strike) + (rate + 0.5 * vol * vol) * dte) / (vol * sqrt_t)
+    d2 = d1 - vol * sqrt_t
+    discounted_strike = strike * math.exp(-rate * dte)
+    pdf = norm_pdf(d1)
+    if is_call:
+        delta = norm_cdf(d1)
+        carry = -rate * discounted_strike * norm_cdf(d2)
+        rho = discounted_strike * dte * norm_cdf(d2)
+    else:
+        delta = norm_cdf(d1) - 1.0
+        carry = rate * discounted_strike * norm_cdf(-d2)
+        rho = -discounted_strike * dte * norm_cdf(-d2)
+    vega = spot * sqrt_t * pdf
+    charm = -pdf * (2.0 * rate * dte - d2 * vol * sqrt_t) / (2.0 * dte * vol * sqrt_t)
+    return {
+        "delta": delta,
+        "gamma": pdf / (spot * vol * sqrt_t),
+        "theta": (-spot * pdf * vol / (2.0 * sqrt_t) + carry) / 365.0,
+        "vega": vega / 100.0,
+        "rho": rho / 100.0,
+        "vanna": -pdf * d2 / vol / 100.0,
+        "volga": vega * d1 * d2 / vol / 10_000.0,
+        "charm": charm / 365.0,
+    }
+
+
+def assert_close(actual: float, expected: float, label: object) -> None:
+    tolerance = GREEK_TOLERANCE + 1e-9 * abs(expected)
+    assert abs(actual - expected) < tolerance, (label, actual, expected)
+
+
+def black_price(
+    forward: float, strike: float, dte: float, vol: float, is_call: bool
+) -> float:
+    """Undiscounted Black price, the price add_implied_volatility inverts."""
+    d1 = (math.log(forward / strike) + 0.5 * vol * vol * dte) / (vol * math.sqrt(dte))
+    d2 = d1 - vol * math.sqrt(dte)
+    if is_call:
+        return forward * norm_cdf(d1) - strike * norm_cdf(d2)
+    return strike * norm_cdf(-d2) - forward * norm_cdf(-d1)
+
+
+def sample_frame(rows: int = ROWS, seed: int = 7) -> pl.DataFrame:
+    """Options with prices solvable for the volatility they were priced at."""
+    rng = random.Random(seed)
+    records = []
+    while len(records) < rows:
+        forward = 100.0
+        strike = rng.uniform(70.0, 130.0)
+        dte = rng.uniform(0.02, 2.0)
+        vol = rng.uniform(0.1, 0.9)
+        is_call = rng.random() < 0.5
+        price = black_price(forward, strike, dte, vol, is_call)
+        if price < 0.01:
+            # Too far out of the money for the volatility to be recovered exactly
+            continue
+        records.append(
+            {
+                "price": price,
+                "forward": forward,
+                "spot": forward * rng.uniform(0.97, 1.0),
+                "strike": strike,
+                "dte": dte,
+                "vol": vol,
+                "is_call": is_call,
+                "risk_free_rate": rng.uniform(0.0, 0.06),
+            }
+        )
+    return pl.DataFrame(records)
+
+
+def check_round_trip() -> None:
+    df = sample_frame()
+    iv = add_implied_volatility(df, "price", "forward")["implied_volatility"]
+    assert iv.null_count() == 0, "solvable prices came out null"
+    assert (iv - df["vol"]).abs().max() < 1e-6, "implied volatility does not round trip"
+
+
+def check_rows_match_reference() -> None:
+    """Every row of a multi unit frame gets its own greeks, in place."""
+    df = sample_frame()
+    greeks = add_greeks(df.rename({"vol": "implied_volatility"}))
+    assert greeks["delta"].null_count() == 0, "valid rows came out null"
+    for row in greeks.iter_rows(named=True):
+        expected = reference_greeks(
+            row["spot"],
+            row["strike"],
+            row["dte"],
+            row["risk_free_rate"],
+            row["implied_volatility"],
+            row["is_call"],
+        )
+        for name in ("delta", "gamma", "theta", "vega", "rho"):
+            assert_close(row[name], expected[name], name)
+
+
+def check_invalid_inputs_are_null() -> None:
+    """Null and degenerate inputs give null, without panicking."""
+    nan = float("nan")
+    valid = black_price(100.0, 100.0, 0.5, 0.2, True)
+    df = pl.DataFrame(
+        {
+            "price": [valid, nan, valid, valid, 0.5, 150.0, None, valid, valid],
+            "forward": [100.0] * 9,
+            "strike": [100.0, 100.0, 100.0, 100.0, 90.0, 100.0, 100.0, nan, 100.0],
+            "dte": [0.5, 0.5, 0.0, -0.5, 0.5, 0.5, 0.5, 0.5, None],
+            "is_call": [True] * 9,
+        }
+    )
+    iv = add_implied_volatility(df, "price", "forward")["implied_volatility"]
+    # Valid, NaN price, dte 0, dte < 0, below intrinsic, above forward, null price,
+    # NaN strike, null dte
+    assert iv.is_not_null().to_list() == [True] + [False] * 8, iv.to_list()
+
+    greeks = add_greeks(
+        df.with_columns(
+            pl.lit(100.0).alias("spot"),
+            pl.Series(
+                "implied_volatility", [0.2, 0.2, 0.2, 0.2, 0.0, nan, None, 0.2, 0.2]
+            ),
+            pl.lit(0.03).alias("risk_free_rate"),
+        )
+    )
+    # Valid, valid, dte 0, dte < 0, zero vol, NaN vol, null vol, NaN strike, null dte
+    expected = [True, True] + [False] * 7
+    for name in ("delta", "gamma", "theta", "vega", "rho"):
+        assert greeks[name].is_not_null().to_list() == expected, (name, greeks[name])
+
+
+def check_greeks_match_reference() -> None:
+    """Greeks of add_greeks and add_iv_and_greeks match the closed form."""
+    rate = 0.04
+    rows = []
+    for spot, strike, dte, vol, is_call in GREEK_CASES:
+        # The fused kernel solves the volatility back from the Black price
+        forward = spot * math.exp(rate * dte)
+        price = black_price(forward, strike, dte, vol, is_call)
+        rows.append(
+            {
+                "price": price,
+                "forward": forward,
+                "spot": spot,
+                "strike": strike,
+                "dte": dte,
+                "implied_volatility": vol,
+                "is_call": is_call,
+                "risk_free_rate": rate,
+            }
+        )
+    df = pl.DataFrame(rows)
+    greeks = add_greeks(df).to_dicts()
+    fused = add_iv_and_greeks(
+        df.drop("implied_volatility"), "price", "forward"
+    ).to_dicts()
+
+    for case, row, fused_row in zip(GREEK_CASES, greeks, fused):
+        spot, strike, dte, vol, is_call = case
+        expected = reference_greeks(spot, strike, dte, rate, vol, is_call)
+        for name in ("delta", "gamma", "theta", "vega", "rho"):
+            assert_close(row[name], expected[name], (case, name))
+        # The fused greeks are taken at the solved volatility
+        assert abs(fused_row["implied_volatility"] - vol) < 1e-6, case
+        expected = reference_greeks(
+            spot, strike, dte, rate, fused_row["implied_volatility"], is_call
+        )
+        for name in expected:
+            assert_close(fused_row[name], expected[name], (case, name))
+
+
+def check_chunked_input() -> None:
+    """Multi chunk inputs, with a null in a middle chunk, match their rechunked form."""
+    df = sample_frame()
+    third = ROWS // 3
+    middle = df.slice(third, third).with_columns(
+        pl.when(pl.int_range(pl.len()) == 5000)
+        .then(None)
+        .otherwise(pl.col("price"))
+        .alias("price")
+    )
+    chunked = pl.concat(
+        [df.slice(0, third), middle, df.slice(2 * third)], rechunk=False
+    )
+    assert chunked.n_chunks() == 3
+
+    from_chunks = add_implied_volatility(chunked, "price", "forward")
+    rechunked = add_implied_volatility(chunked.rechunk(), "price", "forward")
+    assert from_chunks["implied_volatility"].equals(rechunked["implied_volatility"])
+    nulls = from_chunks["implied_volatility"].is_null()
+    assert nulls.arg_true().to_list() == [third + 5000], "null not kept in place"
+
+    assert add_greeks(from_chunks).equals(add_greeks(from_chunks.rechunk()))
+
+
+def check_plugins_match_eager() -> None:
+    """The expression plugins load and agree with the eager functions on both engines."""
+    df = sample_frame()
+    eager_vol = add_implied_volatility(df, "price", "forward")["implied_volatility"]
+    eager_greeks = add_greeks(df, volatility_col="vol")
+    eager_fused = add_iv_and_greeks(df, "price", "forward")
+
+    lazy = df.lazy().select(
+        implied_vol("price", "forward", "strike", "dte", "is_call").alias("iv"),
+        greeks("spot", "strike", "dte", "vol", "risk_free_rate", "is_call").alias(
+            "greeks"
+        ),
+        iv_and_greeks(
+            "price", "forward", "strike", "dte", "is_call", "spot", "risk_free_rate"
+        ).alias("fused"),
+    )
+    for engine in ("in-memory", "streaming"):
+        out = lazy.collect(engine=engine)
+        assert out["iv"].equals(eager_vol), engine
+        for struct, eager in (("greeks", eager_greeks), ("fused", eager_fused)):
+            fields = out[struct].struct.unnest()
+            for name in fields.columns:
+                assert fields[name].equals(eager[name]), (engine, struct, name)
+
+
+def check_deprecated_price_col() -> None:
+    """A positional price_col is still accepted, with a DeprecationWarning."""
+    df = pl.DataFrame(
+        {
+            "price": [4.0],
+            "spot": [100.0],
+            "vol": [0.2],
+            "rate": [0.03],
+            "strike": [100.0],
+            "dte": [0.5],
+            "is_call": [True],
+        }
+    )
+    expected = add_greeks(
+        df, spot_col="spot", volatility_col="vol", risk_free_col="rate"
+    )
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        positional = add_greeks(df, "price", "spot", "vol", "rate")
+    assert positional.equals(expected)
+    assert [w.category for w in caught] == [DeprecationWarning], caught
+
+
+def check_thread_pool() -> None:
+    """The kernel pool resizes, and results do not depend on its size."""
+    df = sample_frame()
+    expected = add_implied_volatility(df, "price", "forward")
+    try:
+        set_native_threads(2)
+        assert get_num_threads() == 2
+        assert add_implied_volatility(df, "price", "forward").equals(expected)
+    finally:
+        set_native_threads(0)
+    assert get_num_threads() >= 1
+
+
+def main() -> None:
+    checks = [
+        check_round_trip,
+        check_rows_match_reference,
+        check_invalid_inputs_are_null,
+        check_greeks_match_reference,
+        check_chunked_input,
+        check_plugins_match_eager,
+        check_deprecated_price_col,
+        check_thread_pool,
+    ]
+    for check in checks:
+        check()
+        print(f"{check.__name__}: ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+from minio import Minio
+
+# The in-process S3 stand-in of the benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "bench"))
+
+from fake_s3 import FakeS3  # noqa: E402
+
+BUCKET = "betedge-test"
+
+
+@pytest.fixture
+def bucket() -> str:
+    return BUCKET
+
+
+@pytest.fixture
+def minio_client(bucket):
+    server = FakeS3().start()
+    client = Minio(server.endpoint, access_key="test", secret_key="test", secure=False)
+    client.make_bucket(bucket)
+    yield client
+    server.shutdown()
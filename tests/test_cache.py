@@ -0,0 +1,76 @@
+import pytest
+
+from betedge_data.cache import ResponseCache, request_date
+from betedge_data.datetime import settled_date
+from betedge_data.exceptions import NoDataAvailableError
+
+pytestmark = pytest.mark.unit
+
+URL = "http://theta/v2/hist/stock/quote?root=AAPL&start_date=20240102&end_date=20240102"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "cache"), max_bytes=1 << 20)
+
+
+def test_body_round_trip_keyed_by_url_and_headers(cache):
+    cache.put(URL, b"date,price\n20240102,1.0\n", {"Accept": "text/csv"})
+
+    assert cache.get(URL, {"accept": "text/csv"}) == b"date,price\n20240102,1.0\n"
+    assert cache.get(URL) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_no_data_marker_raises(cache):
+    cache.put_no_data(URL)
+
+    with pytest.raises(NoDataAvailableError):
+        cache.get(URL)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    body = bytes(range(256)) * 4
+    urls = [URL.replace("AAPL", root) for root in ("A", "B", "C", "D")]
+    sizing = ResponseCache(str(tmp_path / "sizing"), max_bytes=1 << 20)
+    sizing.put(urls[0], body)
+
+    cache = ResponseCache(str(tmp_path / "cache"), max_bytes=3 * sizing.size_bytes)
+    for url in urls[:3]:
+        cache.put(url, body)
+    # The hit on A makes B the least recently used
+    assert cache.get(urls[0]) is not None
+    cache.put(urls[3], body)
+
+    assert len(cache) == 3
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[0]) is not None
+
+
+def test_entries_survive_a_restart(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"), max_bytes=1 << 20)
+    cache.put(URL, b"body")
+    cache.put_no_data(URL.replace("AAPL", "MSFT"))
+
+    reopened = ResponseCache(str(tmp_path / "cache"), max_bytes=1 << 20)
+    assert len(reopened) == 2
+    assert reopened.size_bytes == cache.size_bytes
+    assert reopened.get(URL) == b"body"
+
+
+@pytest.mark.parametrize("settle_days", [0, 2])
+def test_unsettled_requests_are_not_cached(cache, settle_days):
+    cache.settle_days = settle_days
+    today = settled_date(0)
+    url = URL.replace("end_date=20240102", f"end_date={today}")
+
+    cache.put(url, b"partial")
+    cache.put_no_data(url.replace("AAPL", "MSFT"))
+
+    assert len(cache) == (2 if settle_days == 0 else 0)
+
+
+def test_request_date_reads_end_date_or_date():
+    assert request_date(URL) == 20240102
+    assert request_date("http://x/earnings?date=2024-03-05") == 20240305
+    assert request_date("http://x/list/roots") is None
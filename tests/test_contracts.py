@@ -0,0 +1,105 @@
+import pyarrow as pa
+import pytest
+
+from betedge_data.contracts import UNDERLYING_CONTRACT_ID, ContractDimension
+from betedge_data.exceptions import ContractConflictError
+
+pytestmark = pytest.mark.unit
+
+
+def _options(*contracts) -> pa.Table:
+    """Option rows of (expiration, strike, right), None for an underlying row."""
+    rows = [c or (None, None, None) for c in contracts]
+    return pa.table(
+        {
+            "root": pa.array(["SPY"] * len(rows), pa.string()),
+            "expiration": pa.array([r[0] for r in rows], pa.int32()),
+            "strike": pa.array([r[1] for r in rows], pa.int64()),
+            "right": pa.array([r[2] for r in rows], pa.string()),
+            "bid": pa.array([1.0] * len(rows), pa.float64()),
+        }
+    )
+
+
+def _ids(table: pa.Table) -> list:
+    return table["contract_id"].to_pylist()
+
+
+def test_ids_follow_contract_order_and_never_change():
+    dimension = ContractDimension("SPY")
+    first = dimension.encode(
+        _options((20240119, 480_000, "P"), None, (20240119, 480_000, "C"))
+    )
+    assert _ids(first) == [2, UNDERLYING_CONTRACT_ID, 1]
+    assert first.column_names == ["contract_id", "bid"]
+
+    # Known contracts keep their id, new ones are appended
+    second = dimension.encode(
+        _options((20240119, 480_000, "P"), (20240216, 470_000, "C"))
+    )
+    assert _ids(second) == [2, 3]
+    assert len(dimension) == 3
+    assert dimension.encode(second) is second
+
+
+def test_dimension_round_trips_through_the_lake(minio_client, bucket):
+    dimension = ContractDimension("SPY", minio_client, bucket)
+    dimension.encode(_options((20240119, 480_000, "C"), (20240119, 480_000, "P")))
+    assert dimension.save()
+    assert not dimension.save()
+
+    loaded = ContractDimension("SPY", minio_client, bucket).load()
+    assert loaded.table().equals(dimension.table())
+    table = loaded.table()
+    assert table["right"].to_pylist() == [None, "C", "P"]
+    assert table["strike"].to_pylist() == [None, 480_000, 480_000]
+
+    # A reloaded dimension hands out the next id and saves over its own object
+    assert _ids(loaded.encode(_options((20240216, 470_000, "C")))) == [3]
+    assert loaded.save()
+    assert len(ContractDimension("SPY", minio_client, bucket).load()) == 3
+
+
+def test_concurrent_writer_is_detected(minio_client, bucket):
+    seed = ContractDimension("SPY", minio_client, bucket)
+    seed.encode(_options((20240119, 470_000, "C")))
+    seed.save()
+    a = ContractDimension("SPY", minio_client, bucket).load()
+    b = ContractDimension("SPY", minio_client, bucket).load()
+
+    a.encode(_options((20240119, 480_000, "C")))
+    b.encode(_options((20240119, 490_000, "C")))
+    assert a.save()
+
+    # Both handed out id 2, b must not overwrite a's dimension
+    with pytest.raises(ContractConflictError):
+        b.save()
+    with pytest.raises(ContractConflictError):
+        b.encode(_options((20240216, 470_000, "C")))
+    loaded = ContractDimension("SPY", minio_client, bucket).load()
+    assert loaded.table()["strike"].to_pylist() == [None, 470_000, 480_000]
+
+
+def test_first_save_does_not_overwrite_a_new_dimension(minio_client, bucket):
+    a = ContractDimension("SPY", minio_client, bucket)
+    b = ContractDimension("SPY", minio_client, bucket)
+    a.encode(_options((20240119, 480_000, "C")))
+    b.encode(_options((20240119, 490_000, "C")))
+
+    assert a.save()
+    with pytest.raises(ContractConflictError):
+        b.save()
+
+
+def test_save_retries_when_the_lake_holds_a_prefix_of_its_ids(minio_client, bucket):
+    dimension = ContractDimension("SPY", minio_client, bucket)
+    dimension.encode(_options((20240119, 480_000, "C")))
+    dimension.save()
+    # Same ids written again, as by a save whose response was lost
+    copy = ContractDimension("SPY", minio_client, bucket).load()
+    copy._saved = 0
+    copy.save()
+
+    dimension.encode(_options((20240119, 490_000, "C")))
+    assert dimension.save()
+    assert len(ContractDimension("SPY", minio_client, bucket).load()) == 2
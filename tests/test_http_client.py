@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+import pytest
+
+from betedge_data.http_client import AsyncHTTPClient, HTTPClient
+from betedge_data.limiter import AdaptiveLimiter, AsyncAdaptiveLimiter, HostLimiters
+
+pytestmark = pytest.mark.unit
+
+URL = "http://theta/v2/hist/stock/quote?root=AAPL"
+BODY = b"date,price\n20240102,1.0\n"
+
+
+def _respond(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, content=BODY)
+
+
+def test_stream_holds_the_limiter_slot_until_closed():
+    limiters = HostLimiters(AdaptiveLimiter)
+    client = HTTPClient(limiter=limiters)
+    client.client.close()
+    client.client = httpx.Client(transport=httpx.MockTransport(_respond))
+    limiter = limiters.for_url(URL)
+
+    with client.open_csv_stream(URL) as stream:
+        assert limiter.in_flight == 1
+        assert stream.read() == BODY
+        assert limiter.in_flight == 1
+
+    assert limiter.in_flight == 0
+
+
+def test_async_stream_holds_the_limiter_slot_until_closed():
+    limiters = HostLimiters(AsyncAdaptiveLimiter)
+
+    async def run() -> None:
+        client = AsyncHTTPClient(limiter=limiters)
+        await client.client.aclose()
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(_respond))
+        limiter = limiters.for_url(URL)
+
+        async with client.open_csv_stream(URL) as stream:
+            assert limiter.in_flight == 1
+            assert await asyncio.to_thread(stream.read) == BODY
+            assert limiter.in_flight == 1
+
+        assert limiter.in_flight == 0
+        await client.aclose()
+
+    asyncio.run(run())
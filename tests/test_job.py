@@ -0,0 +1,116 @@
+import threading
+
+import pyarrow as pa
+import pytest
+
+from betedge_data.job import FileWriteJob
+
+pytestmark = pytest.mark.unit
+
+
+def _table(item: int, rows: int = 2) -> pa.Table:
+    return pa.table(
+        {
+            "date": pa.array([20240102 + item] * rows, pa.int32()),
+            "item": pa.array([item] * rows, pa.int64()),
+        }
+    )
+
+
+def _spilled_items(job: FileWriteJob) -> list:
+    return [v for table in job.spilled_tables() for v in table["item"].to_pylist()]
+
+
+@pytest.fixture
+def spill_job(tmp_path):
+    job = FileWriteJob("key", 4, spill=True, spill_dir=str(tmp_path))
+    yield job
+    job.discard()
+
+
+def test_spill_writes_items_in_index_order(spill_job):
+    for index in (2, 0, 3, 1):
+        spill_job.add_table(_table(index), index)
+
+    assert spill_job.completed
+    assert _spilled_items(spill_job) == [0, 0, 1, 1, 2, 2, 3, 3]
+    assert spill_job.spilled_rows == 8
+    assert spill_job.spilled_dates == {20240102, 20240103, 20240104, 20240105}
+
+
+def test_spill_waits_for_earlier_items(spill_job):
+    spill_job.add_table(_table(1), 1)
+    assert spill_job.spill_path is None
+
+    spill_job.add_table(_table(0), 0)
+    assert spill_job.spilled_rows == 4
+    assert not spill_job.completed
+
+
+def test_skipped_items_keep_spill_order(spill_job):
+    spill_job.skip_item(0)
+    spill_job.add_table(_table(3), 3)
+    spill_job.skip_item(2)
+    spill_job.add_table(_table(1), 1)
+
+    assert spill_job.completed
+    assert _spilled_items(spill_job) == [1, 1, 3, 3]
+
+
+def test_all_items_skipped_has_no_data(spill_job):
+    for index in range(4):
+        spill_job.skip_item(index)
+
+    assert spill_job.completed
+    assert not spill_job.has_data
+    assert spill_job.spill_path is None
+
+
+def test_claim_only_once_after_completion():
+    job = FileWriteJob("key", 2)
+    assert not job.claim()
+
+    job.add_table(_table(0), 0)
+    assert not job.claim()
+
+    job.add_table(_table(1), 1)
+    assert job.claim()
+    assert not job.claim()
+
+
+def test_claim_has_one_winner_across_threads():
+    items = 16
+    job = FileWriteJob("key", items)
+    barrier = threading.Barrier(items)
+    claims = []
+
+    def finish(index: int) -> None:
+        barrier.wait()
+        job.add_table(_table(index), index)
+        claims.append(job.claim())
+
+    threads = [threading.Thread(target=finish, args=(i,)) for i in range(items)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert claims.count(True) == 1
+    assert len(job.tables) == items
+
+
+def test_parts_of_the_earliest_item_stream_to_spill(spill_job):
+    spill_job.add_table(_table(1), 1, last=False)
+    spill_job.add_table(_table(0), 0, last=False)
+    assert spill_job.spilled_rows == 2
+
+    # Completing item 0 passes on to the part of item 1 that already arrived
+    spill_job.add_table(_table(0), 0)
+    assert spill_job.spilled_rows == 6
+    assert spill_job.completed_items == 1
+
+    spill_job.add_table(_table(1), 1)
+    spill_job.add_table(_table(3), 3)
+    spill_job.add_table(_table(2), 2)
+    assert spill_job.completed
+    assert _spilled_items(spill_job) == [0] * 4 + [1] * 4 + [2, 2, 3, 3]
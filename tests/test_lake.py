@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional
+
+import pytest
+
+from betedge_data.lake import LakeIndex
+
+pytestmark = pytest.mark.unit
+
+
+class StubMinio:
+    """list_objects over a dict of key to size, optionally running a hook mid listing."""
+
+    def __init__(self, objects: Dict[str, int]) -> None:
+        self.objects = objects
+        self.listings = 0
+        self.during_listing: Optional[Callable[[], None]] = None
+
+    def list_objects(self, bucket, prefix, recursive):
+        self.listings += 1
+        listed = [
+            SimpleNamespace(
+                object_name=key, size=size, etag=None, last_modified=None, is_dir=False
+            )
+            for key, size in self.objects.items()
+            if key.startswith(prefix)
+        ]
+        if self.during_listing is not None:
+            hook, self.during_listing = self.during_listing, None
+            hook()
+        return iter(listed)
+
+
+@pytest.fixture
+def minio():
+    return StubMinio({"a/1": 1, "a/2": 2, "b/1": 3})
+
+
+def test_listing_reused_within_ttl(minio):
+    index = LakeIndex(minio, "bucket", ttl=60)
+    index.load("a/")
+    index.load("a/")
+
+    assert minio.listings == 1
+    assert index.exists("a/1")
+    assert not index.exists("a/3")
+
+
+def test_ttl_zero_relists(minio):
+    index = LakeIndex(minio, "bucket", ttl=0)
+    index.load("a/")
+    index.load("a/")
+
+    assert minio.listings == 2
+
+
+def test_key_outside_loaded_prefixes_lists_its_directory(minio):
+    index = LakeIndex(minio, "bucket")
+    index.load("a/")
+
+    assert index.get("b/1").size == 3
+    assert minio.listings == 2
+
+
+def test_changes_during_listing_take_precedence(minio):
+    index = LakeIndex(minio, "bucket")
+    index.load("a/")
+
+    def change() -> None:
+        # The listing already holds the old a/1 and a/2
+        index.record_write("a/1", 10)
+        index.record_delete("a/2")
+
+    minio.during_listing = change
+    index.load("a/", refresh=True)
+
+    assert index.get("a/1").size == 10
+    assert index.get("a/2") is None
+
+
+def test_changes_pruned_once_listing_lands(minio):
+    index = LakeIndex(minio, "bucket")
+    index.load("a/")
+    index.record_write("a/3", 4)
+    assert index.get("a/3").size == 4
+    # No listing was in flight, later listings see the write themselves
+    assert not index._changes
+
+    minio.during_listing = lambda: index.record_write("a/4", 5)
+    index.load("a/", refresh=True)
+
+    assert index.get("a/4").size == 5
+    assert not index._changes
+
+
+def test_listing_older_than_change_does_not_resurrect_delete(minio):
+    index = LakeIndex(minio, "bucket")
+
+    def delete() -> None:
+        minio.objects.pop("a/1")
+        index.record_delete("a/1")
+
+    minio.during_listing = delete
+    index.load("a/")
+
+    assert index.get("a/1") is None
+
+
+def test_relisted_subprefix_answers_for_its_keys(minio):
+    index = LakeIndex(minio, "bucket", ttl=0)
+    index.load("a/")
+    minio.objects["a/x/1"] = 6
+    index.load("a/x/")
+
+    assert index.get("a/x/1").size == 6
+
+    # Relisting the parent replaces the subprefix listing
+    minio.objects["a/x/1"] = 7
+    index.load("a/")
+    assert index.get("a/x/1").size == 7
+
+
+def test_invalidate_relists_the_prefix(minio):
+    index = LakeIndex(minio, "bucket")
+    index.load("a/")
+    minio.objects["a/3"] = 8
+    assert not index.exists("a/3")
+
+    index.invalidate("a/")
+    assert index.exists("a/3")
+    assert minio.listings == 2
+
+
+def test_invalidate_drops_a_covering_listing(minio):
+    index = LakeIndex(minio, "bucket")
+    index.load("a/")
+    minio.objects["a/x/1"] = 6
+
+    index.invalidate("a/x/")
+    assert index.get("a/x/1").size == 6
+    # The parent listing went too, its other keys are relisted on use
+    minio.objects["a/4"] = 9
+    assert index.exists("a/4")
+
+
+def test_invalidate_everything(minio):
+    index = LakeIndex(minio, "bucket")
+    index.load("a/")
+    index.load("b/")
+
+    index.invalidate()
+    minio.objects.pop("b/1")
+    assert not index.exists("b/1")
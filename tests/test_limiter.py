@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import pytest
+
+from betedge_data.limiter import (
+    AdaptiveLimiter,
+    AsyncAdaptiveLimiter,
+    HostLimiters,
+    is_overload_status,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _round_trip(limiter: AdaptiveLimiter, latency_ms: float = 10.0, success=True):
+    limiter.acquire()
+    limiter.release(latency_ms, success)
+
+
+def test_limit_grows_while_saturated_and_healthy():
+    limiter = AdaptiveLimiter(min_limit=1, max_limit=4)
+    for _ in range(50):
+        # Every allowed slot in flight
+        slots = limiter.limit
+        for _ in range(slots):
+            limiter.acquire()
+        for _ in range(slots):
+            limiter.release(10.0, True)
+
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_limit_does_not_grow_while_underused():
+    limiter = AdaptiveLimiter(min_limit=1, max_limit=8, initial_limit=4)
+    for _ in range(50):
+        # One request in flight of four allowed
+        _round_trip(limiter)
+
+    assert limiter.limit == 4
+
+
+def test_failure_backs_off_once_per_round_trip():
+    limiter = AdaptiveLimiter(min_limit=2, max_limit=16, initial_limit=10)
+    _round_trip(limiter, latency_ms=1000.0, success=False)
+    assert limiter.limit == 7
+
+    # Reported within the same round trip, so not counted again
+    _round_trip(limiter, latency_ms=1000.0, success=False)
+    assert limiter.limit == 7
+
+
+def test_backs_off_to_min_limit_on_latency_target():
+    limiter = AdaptiveLimiter(
+        min_limit=2, max_limit=16, initial_limit=3, latency_target_ms=50.0
+    )
+    _round_trip(limiter, latency_ms=0.0)
+    _round_trip(limiter, latency_ms=80.0)
+
+    assert limiter.limit == 2
+
+
+def test_latency_climb_backs_off():
+    limiter = AdaptiveLimiter(min_limit=1, max_limit=16, initial_limit=8)
+    for _ in range(20):
+        _round_trip(limiter, latency_ms=10.0)
+    limit = limiter.limit
+
+    limiter._last_decrease = 0.0
+    _round_trip(limiter, latency_ms=500.0)
+    assert limiter.limit < limit
+
+
+def test_acquire_blocks_at_the_limit():
+    limiter = AdaptiveLimiter(min_limit=1, max_limit=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def second() -> None:
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not acquired.wait(0.1)
+
+    limiter.release(10.0, True)
+    assert acquired.wait(1.0)
+    thread.join()
+    assert limiter.in_flight == 1
+
+
+def test_async_acquire_waits_for_release():
+    async def run() -> list:
+        limiter = AsyncAdaptiveLimiter(min_limit=1, max_limit=1)
+        order = []
+
+        async def request(name: str) -> None:
+            await limiter.acquire()
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} end")
+            await limiter.release(10.0, True)
+
+        await asyncio.gather(request("a"), request("b"))
+        return order
+
+    assert asyncio.run(run()) == ["a start", "a end", "b start", "b end"]
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(min_limit=0)
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(min_limit=4, max_limit=2)
+
+
+def test_host_limiters_keep_one_limiter_per_host():
+    limiters = HostLimiters(lambda: AdaptiveLimiter(max_limit=4))
+    a = limiters.for_url("http://a:25510/v2/hist/stock/quote")
+
+    assert limiters.for_url("http://a:25510/v2/list/roots") is a
+    assert limiters.for_url("http://b:25510/v2/list/roots") is not a
+    assert limiters.current_limits() == {"a:25510": 1, "b:25510": 1}
+
+
+@pytest.mark.parametrize(
+    "status, overloaded",
+    [(200, False), (404, False), (472, False), (429, True), (503, True)],
+)
+def test_overload_status(status, overloaded):
+    assert is_overload_status(status) == overloaded
@@ -0,0 +1,74 @@
+import pytest
+
+from betedge_data.manifest import LakeManifest, ManifestEntry
+from betedge_processing.loading import EOD_BASE_KEY, manifest_eod_keys, scan_eod
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    store = LakeManifest(str(tmp_path / "manifest.db"))
+    for root, yearmo in (
+        ("SPY", 202312),
+        ("SPY", 202401),
+        ("SPY", 202402),
+        ("QQQ", 202401),
+    ):
+        for name in ("data.parquet", "underlying.parquet"):
+            key = f"{EOD_BASE_KEY}/{root}/{yearmo // 100}/{yearmo % 100:02d}/{name}"
+            dates = [yearmo * 100 + 2, yearmo * 100 + 28]
+            store.record(
+                ManifestEntry(
+                    key,
+                    root,
+                    "option_eod",
+                    "monthly",
+                    "1d",
+                    dates[0],
+                    dates[-1],
+                    1,
+                    1,
+                    1.0,
+                    dates,
+                )
+            )
+    store.record(
+        ManifestEntry(
+            "historical-options/quote/monthly/1h/SPY/2024/01/data.parquet",
+            "SPY",
+            "option_quote",
+            "monthly",
+            "1h",
+            20240102,
+            20240131,
+            1,
+            1,
+            1.0,
+            [],
+        )
+    )
+    yield store
+    store.close()
+
+
+def test_month_range_from_the_manifest(manifest):
+    assert manifest_eod_keys(manifest, "SPY", 202401, 202402) == [
+        f"{EOD_BASE_KEY}/SPY/2024/01/data.parquet",
+        f"{EOD_BASE_KEY}/SPY/2024/02/data.parquet",
+    ]
+    assert manifest_eod_keys(manifest, "SPY", 202312, underlying=True) == [
+        f"{EOD_BASE_KEY}/SPY/2023/12/underlying.parquet"
+    ]
+
+
+def test_every_month_from_the_manifest(manifest):
+    assert len(manifest_eod_keys(manifest, "SPY")) == 3
+    assert manifest_eod_keys(manifest, "QQQ") == [
+        f"{EOD_BASE_KEY}/QQQ/2024/01/data.parquet"
+    ]
+
+
+def test_scan_without_recorded_objects_raises(manifest):
+    with pytest.raises(FileNotFoundError):
+        scan_eod("IWM", 202401, manifest=manifest)
@@ -0,0 +1,37 @@
+import pytest
+
+from betedge_data.manifest import LakeManifest, ManifestEntry
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    store = LakeManifest(str(tmp_path / "manifest.db"))
+    yield store
+    store.close()
+
+
+def _entry(key: str, root: str = "SPY", dates=(20240102,)) -> ManifestEntry:
+    return ManifestEntry(
+        key,
+        root,
+        "option_eod",
+        "monthly",
+        "1d",
+        dates[0],
+        dates[-1],
+        1,
+        1,
+        1.0,
+        list(dates),
+    )
+
+
+def test_recorded_keys_in_batches(manifest):
+    keys = [f"a/{i}/data.parquet" for i in range(1200)]
+    for key in keys[::2]:
+        manifest.record(_entry(key))
+
+    assert manifest.recorded(keys) == set(keys[::2])
+    assert manifest.recorded([]) == set()
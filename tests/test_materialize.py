@@ -0,0 +1,132 @@
+import io
+import sqlite3
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from betedge_data.contracts import ContractDimension, contract_key
+from betedge_processing.materialize import (
+    SilverWatermarks,
+    Watermark,
+    code_version,
+    plan_silver,
+)
+
+pytestmark = pytest.mark.unit
+
+BASE_KEY = "historical-options/eod/monthly/1d"
+OPTION_KEY = f"{BASE_KEY}/SPY/2024/01/data.parquet"
+
+
+def _put(minio_client, bucket: str, key: str, table: pa.Table) -> None:
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    minio_client.put_object(bucket, key, io.BytesIO(buffer.getvalue()), buffer.tell())
+
+
+def _contracts(dimension: ContractDimension, *strikes: int) -> None:
+    dimension.encode(
+        pa.table(
+            {
+                "root": pa.array(["SPY"] * len(strikes), pa.string()),
+                "expiration": pa.array([20240119] * len(strikes), pa.int32()),
+                "strike": pa.array(strikes, pa.int64()),
+                "right": pa.array(["C"] * len(strikes), pa.string()),
+            }
+        )
+    )
+    dimension.save()
+
+
+def _option(contract_ids) -> pa.Table:
+    return pa.table({"contract_id": pa.array(contract_ids, pa.int32())})
+
+
+@pytest.fixture
+def watermarks(tmp_path):
+    store = SilverWatermarks(str(tmp_path / "watermarks.db"))
+    yield store
+    store.close()
+
+
+def _plan(minio_client, bucket):
+    partitions, _ = plan_silver(minio_client, bucket, BASE_KEY, ["SPY"])
+    assert len(partitions) == 1
+    return partitions[0]
+
+
+def _record(watermarks, partition, max_contract_id: int) -> None:
+    watermarks.record(
+        Watermark(
+            partition.silver_key,
+            partition.sources,
+            code_version(),
+            1,
+            contract_count=partition.contract_count,
+            max_contract_id=max_contract_id,
+        )
+    )
+
+
+def test_new_contracts_do_not_make_partitions_stale(minio_client, bucket, watermarks):
+    dimension = ContractDimension("SPY", minio_client, bucket, contract_key("SPY"))
+    _contracts(dimension, 480_000, 490_000)
+    _put(minio_client, bucket, OPTION_KEY, _option([0, 1, 2]))
+
+    partition = _plan(minio_client, bucket)
+    assert partition.contract_count == 2
+    assert contract_key("SPY") not in partition.sources
+    assert not watermarks.is_current(partition)
+    _record(watermarks, partition, max_contract_id=2)
+    assert watermarks.is_current(partition)
+
+    # A later ingest of other contracts grows the dimension only
+    _contracts(dimension, 500_000)
+    assert watermarks.is_current(_plan(minio_client, bucket))
+
+    # A rewritten option object is a changed source
+    _put(minio_client, bucket, OPTION_KEY, _option([0, 1, 2, 3]))
+    assert not watermarks.is_current(_plan(minio_client, bucket))
+
+
+def test_partition_missing_contracts_is_stale_once_the_dimension_grew(
+    minio_client, bucket, watermarks
+):
+    dimension = ContractDimension("SPY", minio_client, bucket, contract_key("SPY"))
+    _contracts(dimension, 480_000)
+    _put(minio_client, bucket, OPTION_KEY, _option([0, 1, 2]))
+
+    # Computed while the dimension held id 1 of the object's ids 1 and 2
+    partition = _plan(minio_client, bucket)
+    _record(watermarks, partition, max_contract_id=2)
+    assert watermarks.is_current(partition)
+
+    _contracts(dimension, 490_000)
+    assert not watermarks.is_current(_plan(minio_client, bucket))
+
+
+def test_watermark_round_trip(watermarks):
+    watermark = Watermark(
+        "silver/a", {"a": "etag"}, "2+base", 10, 1.0, contract_count=3
+    )
+    watermarks.record(watermark)
+    assert watermarks.get("silver/a") == watermark
+    assert watermarks.get("silver/b") is None
+
+
+def test_watermarks_of_an_older_database_are_read(tmp_path):
+    path = str(tmp_path / "watermarks.db")
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "CREATE TABLE watermarks (silver_key TEXT PRIMARY KEY, sources TEXT NOT "
+            "NULL, code_version TEXT NOT NULL, byte_size INTEGER NOT NULL, "
+            "computed_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO watermarks VALUES ('silver/a', '{}', '1', 10, 1.0)")
+    conn.close()
+
+    store = SilverWatermarks(path)
+    assert store.get("silver/a") == Watermark("silver/a", {}, "1", 10, 1.0)
+    store.close()
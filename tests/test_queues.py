@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from queue import Full
+
+import pytest
+
+from betedge_data.queues import AsyncBoundedQueue, BoundedQueue
+
+pytestmark = pytest.mark.unit
+
+
+def test_put_blocks_on_the_byte_budget():
+    queue = BoundedQueue(max_bytes=10, sizeof=len)
+    queue.put(b"x" * 6)
+    queue.put(b"x" * 6)
+    assert queue.bytes == 12
+
+    with pytest.raises(Full):
+        queue.put(b"x", block=False)
+    with pytest.raises(Full):
+        queue.put(b"x", timeout=0.01)
+
+    queue.get()
+    assert queue.bytes == 6
+    queue.put(b"x", block=False)
+
+
+def test_item_larger_than_the_budget_enters_an_empty_queue():
+    queue = BoundedQueue(max_bytes=10, sizeof=len)
+    queue.put(b"x" * 100, block=False)
+
+    assert queue.full()
+    assert queue.get() == b"x" * 100
+    assert queue.bytes == 0
+
+
+def test_maxsize_still_applies():
+    queue = BoundedQueue(maxsize=2)
+    queue.put(1)
+    queue.put(2)
+
+    with pytest.raises(Full):
+        queue.put(3, block=False)
+
+
+def test_get_wakes_every_producer_the_freed_bytes_admit():
+    queue = BoundedQueue(max_bytes=10, sizeof=len)
+    queue.put(b"x" * 10)
+    threads = [threading.Thread(target=queue.put, args=(b"x",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+
+    queue.get()
+    for thread in threads:
+        thread.join(timeout=1.0)
+    assert not any(thread.is_alive() for thread in threads)
+    assert queue.qsize() == 3
+
+
+def test_async_put_waits_on_the_byte_budget():
+    async def run() -> None:
+        queue = AsyncBoundedQueue(max_bytes=12, sizeof=lambda item: item or 0)
+        await queue.put(8)
+        await queue.put(8)
+        with pytest.raises(asyncio.QueueFull):
+            queue.put_nowait(1)
+
+        waiting = [asyncio.create_task(queue.put(1)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert not any(task.done() for task in waiting)
+
+        # Dropping to 8 bytes admits all three waiting producers
+        assert await queue.get() == 8
+        await asyncio.wait_for(asyncio.gather(*waiting), timeout=1.0)
+        assert queue.bytes == 11
+
+        # The None that stops a stage weighs nothing
+        await queue.put(None)
+        assert queue.bytes == 11
+
+    asyncio.run(run())
+
+
+def test_async_maxsize_still_applies():
+    queue = AsyncBoundedQueue(maxsize=1)
+    queue.put_nowait(1)
+
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait(2)
@@ -0,0 +1,48 @@
+from io import BytesIO, RawIOBase
+
+import pyarrow as pa
+import pyarrow.csv as pv
+import pytest
+
+from betedge_data.processing.theta import reader
+from betedge_data.processing.theta.reader import iter_csv
+
+pytestmark = pytest.mark.unit
+
+CONVERT = pv.ConvertOptions(column_types={"date": pa.int32(), "price": pa.float64()})
+
+
+class Stream(RawIOBase):
+    """Non BytesIO source, read like a streamed response."""
+
+    def __init__(self, data: bytes) -> None:
+        self._buffer = BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        return self._buffer.readinto(b)
+
+
+def _csv(rows: int) -> bytes:
+    lines = ["date,price"] + [f"{20240102 + i % 3},{i}.5" for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_stream_yields_a_table_per_block(monkeypatch):
+    monkeypatch.setattr(reader, "CSV_BLOCK_SIZE", 1 << 10)
+    data = _csv(2000)
+
+    tables = list(iter_csv(Stream(data), CONVERT))
+
+    assert len(tables) > 1
+    (whole,) = iter_csv(BytesIO(data), CONVERT)
+    assert pa.concat_tables(tables).equals(whole)
+
+
+def test_empty_stream_yields_one_empty_table():
+    (table,) = iter_csv(Stream(b"date,price\n"), CONVERT)
+
+    assert table.num_rows == 0
+    assert table.column_names == ["date", "price"]
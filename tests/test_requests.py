@@ -0,0 +1,108 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from betedge_data.client.requests import (
+    DATA_OBJECT,
+    UNDERLYING_OBJECT,
+    LakeLayout,
+    object_key,
+    to_hive_key,
+)
+from betedge_data.contracts import contract_key
+from betedge_data.manifest import LakeManifest, ManifestEntry
+from betedge_data.migrate import migrate_to_hive, plan_hive_migration
+from betedge_data.silver import SILVER_PREFIX
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize(
+    "base_key, root, day",
+    [
+        ("historical-options/quote/monthly/1h", "SPY", None),
+        ("historical-options/eod/daily/1d", "QQQ", "07"),
+        ("historical-stock/quote/monthly/1m", "AAPL", None),
+        ("earnings", None, None),
+        (f"{SILVER_PREFIX}historical-options/quote/monthly/1h", "SPY", None),
+    ],
+)
+@pytest.mark.parametrize("filename", [DATA_OBJECT, UNDERLYING_OBJECT])
+def test_legacy_keys_round_trip_to_hive(base_key, root, day, filename):
+    legacy = object_key(base_key, root, "2024", "03", day, LakeLayout.LEGACY, filename)
+    hive = object_key(base_key, root, "2024", "03", day, LakeLayout.HIVE, filename)
+
+    assert to_hive_key(legacy) == hive
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        "historical-options/quote/monthly/1h/root=SPY/year=2024/month=03/data.parquet",
+        "historical-options/quote/monthly/1h/SPY/2024/03/other.parquet",
+        "historical-options/quote/monthly/1h/SPY/03/data.parquet",
+        "2024/03/data.parquet",
+        contract_key("SPY", LakeLayout.LEGACY),
+    ],
+)
+def test_non_legacy_data_keys_are_left_alone(key):
+    assert to_hive_key(key) is None
+
+
+def test_migration_plan_maps_legacy_objects_only():
+    legacy = object_key("historical-stock/eod/monthly/1d", "AAPL", "2024", "01")
+    hive = object_key(
+        "historical-stock/eod/monthly/1d", "MSFT", "2024", "01", layout="hive"
+    )
+    objects = {
+        legacy: 10,
+        hive: 20,
+        contract_key("SPY", LakeLayout.LEGACY): 30,
+        contract_key("QQQ", LakeLayout.HIVE): 40,
+    }
+
+    class Listing:
+        def list_objects(self, bucket, prefix, recursive):
+            return [
+                SimpleNamespace(object_name=key, size=size, is_dir=False)
+                for key, size in objects.items()
+                if key.startswith(prefix)
+            ]
+
+    plan = plan_hive_migration(Listing(), "bucket")
+
+    assert sorted(plan) == sorted(
+        [
+            (legacy, to_hive_key(legacy), 10),
+            (
+                contract_key("SPY", LakeLayout.LEGACY),
+                contract_key("SPY", LakeLayout.HIVE),
+                30,
+            ),
+        ]
+    )
+
+
+def test_migration_moves_manifest_entries_and_no_data_days(
+    minio_client, bucket, tmp_path
+):
+    legacy = object_key("historical-stock/quote/monthly/1h", "AAPL", "2024", "01")
+    hive = to_hive_key(legacy)
+    minio_client.put_object(bucket, legacy, io.BytesIO(b"data"), 4)
+    manifest = LakeManifest(str(tmp_path / "manifest.sqlite"))
+    manifest.record(
+        ManifestEntry(legacy, "AAPL", None, None, "1h", 20240102, 20240102, 2, 4)
+    )
+    manifest.record_no_data(legacy, [20240103, 20240104])
+
+    summary = migrate_to_hive(
+        minio_client, bucket, delete_source=True, manifest=manifest
+    )
+
+    assert (summary.copied, summary.deleted) == (1, 1)
+    assert manifest.get(legacy) is None
+    assert manifest.get(hive).row_count == 2
+    assert manifest.no_data_dates(legacy) == []
+    assert manifest.no_data_dates(hive) == [20240103, 20240104]
+    manifest.close()
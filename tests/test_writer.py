@@ -0,0 +1,142 @@
+import io
+from typing import List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from betedge_data.client.client import iter_file_jobs
+from betedge_data.client.requests import StockRequest
+from betedge_data.datetime import settled_date
+from betedge_data.job import FileWriteJob, RequestSummary, Schema
+from betedge_data.manifest import LakeManifest
+from betedge_data.writer import LakeWriter
+
+pytestmark = pytest.mark.unit
+
+KEY = "historical-stock/quote/monthly/1h/AAPL/2024/01/data.parquet"
+
+
+def _day(date: int, price: float) -> pa.Table:
+    return pa.table(
+        {
+            "date": pa.array([date, date], pa.int32()),
+            "ms_of_day": pa.array([34_200_000, 37_800_000], pa.int32()),
+            "price": pa.array([price, price], pa.float64()),
+        }
+    )
+
+
+def _write(
+    writer: LakeWriter,
+    days: List[Optional[pa.Table]],
+    item_dates: List[int],
+    merge: bool = False,
+) -> int:
+    """Write a job with an item per day, None for days that returned no data."""
+    job = FileWriteJob(
+        KEY,
+        len(days),
+        schema=Schema.STOCK_QUOTE,
+        item_dates=item_dates,
+        merge_existing=merge,
+    )
+    for index, table in enumerate(days):
+        if table is None:
+            job.skip_item(index)
+        else:
+            job.add_table(table, index)
+    return writer.write(job)
+
+
+def _read(minio_client, bucket: str) -> pa.Table:
+    response = minio_client.get_object(bucket, KEY)
+    try:
+        return pq.read_table(io.BytesIO(response.read()))
+    finally:
+        response.close()
+        response.release_conn()
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = LakeManifest(str(tmp_path / "manifest.sqlite"))
+    yield manifest
+    manifest.close()
+
+
+@pytest.fixture
+def writer(minio_client, bucket, manifest):
+    return LakeWriter(minio_client, bucket, manifest=manifest)
+
+
+def test_merge_replaces_refetched_days(writer, minio_client, bucket):
+    _write(writer, [_day(20240102, 1.0), _day(20240103, 1.0)], [20240102, 20240103])
+    _write(
+        writer,
+        [_day(20240103, 2.0), _day(20240104, 2.0)],
+        [20240103, 20240104],
+        merge=True,
+    )
+
+    merged = _read(minio_client, bucket)
+    assert (
+        merged["date"].to_pylist() == [20240102] * 2 + [20240103] * 2 + [20240104] * 2
+    )
+    assert merged["price"].to_pylist() == [1.0] * 2 + [2.0] * 4
+    assert writer.covered_dates(KEY) == {20240102, 20240103, 20240104}
+
+
+def test_no_data_days_count_as_covered(writer, manifest):
+    _write(
+        writer,
+        [_day(20240102, 1.0), None, _day(20240104, 1.0)],
+        [20240102, 20240103, 20240104],
+    )
+
+    assert manifest.no_data_dates(KEY) == [20240103]
+    assert writer.covered_dates(KEY) == {20240102, 20240103, 20240104}
+
+
+def test_recent_no_data_days_are_not_covered(writer, manifest):
+    today, settled = settled_date(0), settled_date(writer.settle_days)
+    _write(writer, [_day(20240102, 1.0), None, None], [20240102, settled, today])
+
+    # Today may still be published, only the settled day is recorded
+    assert manifest.no_data_dates(KEY) == [settled]
+    assert writer.covered_dates(KEY) == {20240102, settled}
+
+
+def test_full_rewrite_resets_no_data_days(writer, manifest):
+    _write(writer, [_day(20240102, 1.0), None], [20240102, 20240103])
+    _write(writer, [None, _day(20240104, 1.0)], [20240103, 20240104], merge=True)
+    assert manifest.no_data_dates(KEY) == [20240103]
+
+    _write(writer, [_day(20240102, 1.0), _day(20240103, 1.0)], [20240102, 20240103])
+    assert manifest.no_data_dates(KEY) == []
+
+
+def test_incremental_jobs_fetch_only_uncovered_days():
+    request = StockRequest(
+        root="AAPL",
+        start_date=20240102,
+        end_date=20240105,
+        endpoint="quote",
+        incremental=True,
+    )
+    summary = RequestSummary(request.id, "StockRequest")
+
+    (jobs,) = iter_file_jobs(
+        request,
+        summary,
+        file_exists=lambda key: True,
+        covered_dates=lambda key: {20240102, 20240103},
+    )
+
+    file_write_job = jobs[0].file_write_job
+    assert file_write_job.merge_existing
+    assert file_write_job.item_dates == [20240104, 20240105]
+    assert len(jobs) == 2
+    assert "start_date=20240104" in jobs[0].url
+    assert "start_date=20240105" in jobs[1].url
+    assert summary.days_skipped == 2